@@ -5,22 +5,104 @@ from tools.openai_generator import OpenAISpecGenerator
 from tools.gemini_generator import GeminiCodeGenerator
 from tools.claude_generator import ClaudeCodeGenerator
 from tools.openai_hybrid_generator import OpenAIHybridCodeGenerator
+from tools.racing_generator import RacingCodeGenerator
 from tools.tool_loader import ToolLoader
+from tools.utils.arg_validator import unknown_tool_result
+from tools.utils.llm_cache import CachedChatClient
+from tools.utils.model_router import ModelRouter, TASK_CLASSIFY, TASK_PLAN, TASK_SUMMARIZE
+from tools.utils.context_manager import ContextManager
+from tools.utils.tool_cache import GeneratedToolCache
+from tools.utils.SystemUtils import ConfigLoader
 import json
 import os
+import re
+import time
 from tools.utils.log_util import LoggingMixin 
 
 
+# 의도 분류만을 위한 매우 구체적이고 단순한 프롬프트
+GATEKEEPER_SYSTEM_PROMPT = """
+            당신은 사용자 질문의 핵심 의도가 '대한민국의 행정 또는 금융 신청 업무'와 관련 있는지 판단하는 분류 전문가입니다.
+            사용자의 궁극적인 목표가 대출, 지원금, 계좌 개설, 서류 발급 등과 관련 있다면 'YES'입니다.
+
+            **판단 예시:**
+            - 질문: "IT 스타트업을 차릴 건데, 사업자금 대출 알려줘." -> YES
+            - 질문: "가게 운영자금이 부족해요." -> YES
+            - 질문: "청년도약계좌 만들고 싶어요." -> YES
+            - 질문: "오늘 날씨 어때?" -> NO
+            - 질문: "낚시하는 법 알려줘" -> NO
+
+            다른 어떤 설명도 하지 말고, 오직 'YES' 또는 'NO'로만 대답하세요.
+        """
+
+# 에이전트 SOP 시스템 프롬프트
+# 프롬프트 캐싱이 적용되도록 요청별 데이터(사용자 ID, 질문)는 절대 이 안에 넣지 않는다
+AGENT_SYSTEM_PROMPT = """
+                ### 역할 정의 ###
+                당신은 'AI-Linker'입니다. 당신의 유일한 임무는 '대한민국의 행정 및 금융 신청 업무'를 자동화하여 사용자를 돕는 것입니다.
+                당신에게 전달된 모든 사용자 요청은 이미 관련성 검사를 통과했습니다. 당신은 질문의 의도를 의심할 필요 없이, 오직 아래의 업무 수행 계획에 따라 목표를 완수하는 데만 집중하세요.
+                당신은 오직 '사용자 ID'를 통해서만 사용자를 식별하며, 절대 실제 개인정보를 묻거나 다루지 않습니다.
+                도구를 사용할 때는, 반드시 [사용자 ID] 컨텍스트로 제공된 값을 그대로 사용해야 합니다.
+                절대로 임의의 ID나 예시 값을 만들어서 사용하면 안 됩니다.
+
+
+                ### **[매우 중요한 업무 수행 계획 (SOP)]** ###
+                당신은 반드시 다음의 논리적 순서에 따라 단계별로 계획을 세우고 도구를 사용해야 합니다.
+
+                **0. 지식 동기화:**
+               - 가장 먼저, `synchronize_knowledge_base` 도구를 사용해 `latest_policies.json` 파일과 당신의 지식을 동기화하여 최신 상태를 유지합니다.
+
+                **1. 정보 검색 단계:**
+                - 가장 먼저, 사용자의 질문 의도를 파악하여 `search_knowledge_base` 도구를 사용해 관련 정책 정보를 검색합니다.
+                - 만약 검색 결과가 "관련 정보를 찾지 못했습니다" 라면, 더 이상 다른 도구를 사용하지 말고 사용자에게 이 사실을 알리고 프로세스를 종료합니다.
+
+                **2. 사업자 상태 확인:**
+                - 먼저, `사용자 ID`를 `verify_business_registration` 도구에 전달하여 국세청 상태를 확인합니다.
+                - 상태가 정상이 아니면 프로세스를 중단합니다.
+
+                **3. 서류 수집 및 검증 단계:**
+                - 정보 검색에 성공했다면, 결과에 포함된 **`metadata`의 `required_docs` 리스트**를 확인합니다.
+                - `required_docs` 리스트 **전체**와 `사용자 ID`를 `fetch_and_validate_documents` 도구에 **한 번에** 전달하여, 모든 서류를 동시에 가져오고 검증합니다.
+                - 결과의 `all_valid`가 true가 아니면, 실패한 서류(`documents`)를 사용자에게 알리고 프로세스를 중단합니다.
+                - (`fetch_and_validate_documents` 도구를 사용할 수 없는 경우에만) 각 서류마다 `fetch_document_from_mcp`로 서류를 가져온 직후 `validate_document`로 검증합니다.
+
+                **4. 최종 제출 단계:**
+                - 모든 서류의 수집 및 검증이 성공적으로 완료되었다면, 확보한 모든 `doc_token`들(`fetch_and_validate_documents` 결과의 `doc_tokens`)을 모아 `submit_application` 도구를 호출하여 최종 제출을 완료합니다.
+
+                **5. [매우 중요] 작업 완료:**
+                - **'submit_application' 도구 호출이 성공적으로 끝난 직후**, 당신의 다음 행동은 **반드시 `finish_task` 도구를 호출**하여 최종 요약 메시지와 함께 작업을 종료해야 합니다.
+                - 'submit_application'의 결과(예: 신청ID 등)를 'finish_task'의 'summary' 파라미터에 포함하여 사용자에게 최종 보고하고 작업을 종료해야 합니다.
+
+                ### **[매우 중요한 출력 형식 규칙]** ###
+                - 당신이 도구를 사용해야 한다고 판단했을 때, 다른 자연어 설명은 일절 포함하지 마십시오.
+                - 반드시 `tool_calls` JSON 객체 형식으로만 응답해야 합니다.
+                """
+
+# 도구 레지스트리 버전별로 한 번만 만들어두는 고정 prefix {registry_version: (system_message, api_tools)}
+_PROMPT_PREFIX_CACHE = {}
+
+
 # self._log 는 'print'와 logging 을 포함하는 함수이다.
 # logging.을 통해 외부 api response 로 과정을 보여준다
 
 class AIAgent(LoggingMixin):
-    def __init__(self, user_id: str, rag_system, user_database, _client):
+    def __init__(self, user_id: str, rag_system, user_database, _client, response_cache=None, event_sink=None):
         self.rag_system = rag_system
+        # 진행 이벤트를 받을 콜백 (event: str, data: dict). 스트리밍 API 에서 사용
+        self.event_sink = event_sink
         self.user_id = user_id
         self.USER_DB = user_database
         self.user = self.USER_DB.get(user_id, {"user_id": user_id})
         self.client = _client
+        # 응답 캐시가 주어지면 지식 베이스 버전/사용자 범위가 적용된 캐시 계층으로 감싼다
+        if response_cache is not None:
+            self.client = CachedChatClient(_client, response_cache, user_id=user_id,
+                                           kb_version_fn=lambda: getattr(self.rag_system, "version", None))
+        self.router = ModelRouter()
+        # 단계가 늘어나도 프롬프트 토큰이 예산을 넘지 않도록 오래된 도구 출력을 요약
+        self.context_manager = ContextManager(
+            token_budget=int(ConfigLoader().get_setting('CONTEXT', 'token_budget', env_key='AGENT_TOKEN_BUDGET', default='8000'))
+        )
         self._reload_tools()
 
         self.spec_generator = OpenAISpecGenerator()
@@ -29,7 +111,13 @@ class AIAgent(LoggingMixin):
         # 코드 생성에 Claude 이용
         # self.code_generator = ClaudeCodeGenerator()
         # 코드 생성에 OpenAI 이용
-        self.code_generator = OpenAIHybridCodeGenerator()
+        # self.code_generator = OpenAIHybridCodeGenerator()
+        # 설정된 생성기들([GENERATORS] providers)을 경쟁시켜 가장 먼저 테스트를 통과한 코드 사용
+        # (새 도구가 필요할 때 처음 만들고, 프로세스 전체에서 공유한다 → code_generator 속성)
+
+    @property
+    def code_generator(self) -> RacingCodeGenerator:
+        return RacingCodeGenerator.shared()
 
 
     # Tool 을 다시 불러오는 함수
@@ -44,46 +132,90 @@ class AIAgent(LoggingMixin):
 
         self.tools = self.tool_loader.tools
         self.available_tools = {tool.name: tool.execute for tool in self.tools}
-        self.api_tools = [
-            {"type": "function", "function": {
-                "name": tool.name, "description": tool.description, "parameters": tool.parameters
-            }} for tool in self.tools
-        ]
+        self.tool_validators = self.tool_loader.validators
+        self.registry_version = self.tool_loader.registry_version
+        self._system_message, self.api_tools = self._get_prompt_prefix()
 
         print(f"[AI Agent] 현재 사용 가능한 도구: {[tool.name for tool in self.tools]}")
 
 
+    # 프롬프트 캐싱을 위한 고정 prefix
+    # 시스템 프롬프트와 도구 명세를 결정적인 순서로 만들고, 도구 레지스트리 버전마다 한 번만 생성한다
+    def _get_prompt_prefix(self) -> tuple:
+        prefix = _PROMPT_PREFIX_CACHE.get(self.registry_version)
+        if prefix is None:
+            system_message = {"role": "system", "content": AGENT_SYSTEM_PROMPT}
+            api_tools = [ToolLoader.tool_schema(tool) for tool in self.tools]
+            prefix = (system_message, api_tools)
+            _PROMPT_PREFIX_CACHE[self.registry_version] = prefix
+        return prefix
+
+
+    # 구조화된 진행 이벤트 발행 (event_sink 가 없으면 아무것도 하지 않음)
+    def _emit(self, event: str, **data):
+        if self.event_sink is None:
+            return
+        try:
+            self.event_sink(event, data)
+        except Exception as e:
+            print(f"   [AI Agent] 이벤트 전달 실패({event}): {e}")
+
+
+    # 최종 답변을 token 이벤트로 흘려보낸 뒤 결과 dict 를 만든다
+    # (최종 답변은 finish_task 인자 등으로 한 번에 도착하므로, 도착 즉시 단어 단위로 나누어 보낸다)
+    def _finalize(self, final_result: dict) -> dict:
+        for chunk in re.findall(r"\S+\s*", final_result.get("message") or ""):
+            self._emit("token", text=chunk)
+        self._emit("final", status=final_result.get("status"), message=final_result.get("message"), usage=self.usage_stats)
+        return {"final_result": final_result, "execution_log": self.execution_log, "usage": self.usage_stats}
+
+
+    # 응답의 usage 에서 토큰 사용량과 캐시 적중 토큰 수를 누적한다
+    def _record_usage(self, response, label: str):
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+
+        self.usage_stats["calls"] += 1
+        self.usage_stats["prompt_tokens"] += usage.prompt_tokens or 0
+        self.usage_stats["cached_tokens"] += cached_tokens
+        self.usage_stats["completion_tokens"] += usage.completion_tokens or 0
+        print(f"   [Usage] {label}: prompt={usage.prompt_tokens}, cached={cached_tokens}, completion={usage.completion_tokens}")
+
+
+    # 계획 단계 응답 검증: 존재하는 도구를 올바른 JSON 인자로 호출했는지 확인
+    def _is_valid_plan(self, response) -> bool:
+        for tool_call in response.choices[0].message.tool_calls or []:
+            if tool_call.function.name not in self.available_tools:
+                return False
+            json.loads(tool_call.function.arguments or "{}")
+        return True
+
+
     # GateKeeper Filter 함수
     # LLM이 사람을 돕도록 System prompt 가 있어 서비스 외 질문에도 답변을 해버린다
     # 이러한 현상을 해결하기 위해 맨 앞에서 서비스 의도 질문인지를 분류해버림
     def _is_query_in_scope(self, query: str) -> bool:
         self._log("   [Gatekeeper] 사용자 질문의 의도를 분류합니다...")
 
-        # 의도 분류만을 위한 매우 구체적이고 단순한 프롬프트
-        system_prompt = """
-            당신은 사용자 질문의 핵심 의도가 '대한민국의 행정 또는 금융 신청 업무'와 관련 있는지 판단하는 분류 전문가입니다.
-            사용자의 궁극적인 목표가 대출, 지원금, 계좌 개설, 서류 발급 등과 관련 있다면 'YES'입니다.
 
-            **판단 예시:**
-            - 질문: "IT 스타트업을 차릴 건데, 사업자금 대출 알려줘." -> YES
-            - 질문: "가게 운영자금이 부족해요." -> YES
-            - 질문: "청년도약계좌 만들고 싶어요." -> YES
-            - 질문: "오늘 날씨 어때?" -> NO
-            - 질문: "낚시하는 법 알려줘" -> NO
-
-            다른 어떤 설명도 하지 말고, 오직 'YES' 또는 'NO'로만 대답하세요.
-        """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o", # 또는 더 저렴한 gpt-3.5-turbo 사용 가능
+            # 단순 분류이므로 작은 모델을 사용하고, 답이 애매하면 상위 모델로 재시도
+            response = self.router.create(
+                self.client, TASK_CLASSIFY,
+                validate=lambda r: r.choices[0].message.content.strip().upper() in ("YES", "NO"),
+                min_confidence=0.8,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": GATEKEEPER_SYSTEM_PROMPT},
                     {"role": "user", "content": query}
                 ],
                 max_tokens=2, # 답변을 'YES' 또는 'NO'로 제한
                 temperature=0.0
             )
+            self._record_usage(response, "gatekeeper")
             decision = response.choices[0].message.content.strip().upper()
             print(f"   [Gatekeeper] 판단 결과: {decision}")
             return decision == "YES"
@@ -104,19 +236,21 @@ class AIAgent(LoggingMixin):
             return "파일을 찾을 수 없습니다."
 
         prompt = f"다음 파이썬 코드는 'ToolBase'를 상속받아야 하지만, 인스턴스화에 실패했습니다. 코드의 문제점을 한 문장으로 요약해주세요.\n\n{faulty_code}"
-        response = self.client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": prompt}])
+        response = self.router.create(self.client, TASK_SUMMARIZE, messages=[{"role": "user", "content": prompt}])
         return response.choices[0].message.content
 
 
     # 실제 에이전트 실행
     def run(self, initial_query: str) -> dict:
         self.execution_log = []
+        self.usage_stats = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
 
         print(f"tool_loader : {self.tool_loader}")
         print(f"tools : {self.tools}")
         print(f"정의된 Tool들 : {self.api_tools}")
         print(f"사용가능 Tool들 : {self.available_tools}")
         self._log(f"[Alarm]{'#'*2} AI Agent Process Start (Query: '{initial_query}') {'#'*2}")
+        self._emit("run_start", user_id=self.user_id, query=initial_query)
 
         # LLM 에 민감정보를 던지지 않기 위해 임의의 id를 내부 Database 에서 조회한다
         contextual_query = f"""
@@ -133,13 +267,10 @@ class AIAgent(LoggingMixin):
             self._log(f"[AI-Linker 최종 답변] {refusal_message}")
             self._log(f"[Alarm]{'#'*2} AI Agent Process Finished (Out of Scope) {'#'*2}")
             # return # 프로세스 즉시 종료
-            return {
-                "final_result": {
-                    "status": "rejected",
-                    "message": refusal_message
-                },
-                "execution_log": self.execution_log
-            }
+            return self._finalize({
+                "status": "rejected",
+                "message": refusal_message
+            })
 
 
         final_result = {"status": "error", "message": "에이전트가 작업을 완료하지 못했습니다."}
@@ -153,49 +284,9 @@ class AIAgent(LoggingMixin):
 
 
         # --- 이 아래는 '문지기'를 통과한 경우에만 실행됩니다 ---
+        # 고정 prefix(시스템 프롬프트 + 도구 명세) 뒤에 요청별 데이터만 덧붙인다
         messages = [
-            {"role": "system",
-             "content": 
-"""
-                ### 역할 정의 ###
-                당신은 'AI-Linker'입니다. 당신의 유일한 임무는 '대한민국의 행정 및 금융 신청 업무'를 자동화하여 사용자를 돕는 것입니다.
-                당신에게 전달된 모든 사용자 요청은 이미 관련성 검사를 통과했습니다. 당신은 질문의 의도를 의심할 필요 없이, 오직 아래의 업무 수행 계획에 따라 목표를 완수하는 데만 집중하세요.
-                당신은 오직 '사용자 ID'를 통해서만 사용자를 식별하며, 절대 실제 개인정보를 묻거나 다루지 않습니다.
-                도구를 사용할 때는, 반드시 [사용자 ID] 컨텍스트로 제공된 값을 그대로 사용해야 합니다.
-                절대로 임의의 ID나 예시 값을 만들어서 사용하면 안 됩니다.
-
-
-                ### **[매우 중요한 업무 수행 계획 (SOP)]** ###
-                당신은 반드시 다음의 논리적 순서에 따라 단계별로 계획을 세우고 도구를 사용해야 합니다.
-
-                **0. 지식 동기화:**
-               - 가장 먼저, `synchronize_knowledge_base` 도구를 사용해 `latest_policies.json` 파일과 당신의 지식을 동기화하여 최신 상태를 유지합니다.
-
-                **1. 정보 검색 단계:**
-                - 가장 먼저, 사용자의 질문 의도를 파악하여 `search_knowledge_base` 도구를 사용해 관련 정책 정보를 검색합니다.
-                - 만약 검색 결과가 "관련 정보를 찾지 못했습니다" 라면, 더 이상 다른 도구를 사용하지 말고 사용자에게 이 사실을 알리고 프로세스를 종료합니다.
-
-                **2. 사업자 상태 확인:**
-                - 먼저, `사용자 ID`를 `verify_business_registration` 도구에 전달하여 국세청 상태를 확인합니다.
-                - 상태가 정상이 아니면 프로세스를 중단합니다.
-
-                **3. 서류 수집 및 검증 단계:**
-                - 정보 검색에 성공했다면, 결과에 포함된 **`metadata`의 `required_docs` 리스트**를 확인합니다.
-                - 리스트에 있는 **모든 서류에 대해**, `fetch_document_from_mcp` 도구를 **하나씩 순서대로 호출**하여 서류를 가져옵니다.
-                - 각 서류를 가져온 직후, 즉시 `validate_document` 도구를 사용하여 해당 서류가 유효한지 검증합니다.
-
-                **4. 최종 제출 단계:**
-                - 모든 서류의 수집 및 검증이 성공적으로 완료되었다면, 확보한 모든 `doc_token`들을 모아 `submit_application` 도구를 호출하여 최종 제출을 완료합니다.
-
-                **5. [매우 중요] 작업 완료:**
-                - **'submit_application' 도구 호출이 성공적으로 끝난 직후**, 당신의 다음 행동은 **반드시 `finish_task` 도구를 호출**하여 최종 요약 메시지와 함께 작업을 종료해야 합니다.
-                - 'submit_application'의 결과(예: 신청ID 등)를 'finish_task'의 'summary' 파라미터에 포함하여 사용자에게 최종 보고하고 작업을 종료해야 합니다.
-
-                ### **[매우 중요한 출력 형식 규칙]** ###
-                - 당신이 도구를 사용해야 한다고 판단했을 때, 다른 자연어 설명은 일절 포함하지 마십시오.
-                - 반드시 `tool_calls` JSON 객체 형식으로만 응답해야 합니다.
-                """
-            },
+            self._system_message,
             # {"role": "user", "content": initial_query}
             {"role": "user", "content": contextual_query} # user_id 로 되어있는 부분을 이용하도록 유도
         ]
@@ -207,10 +298,14 @@ class AIAgent(LoggingMixin):
 
         for i in range(7): # 최대 7단계 실행
             self._log(f". [STEP] Agent Step {i+1}")
+            self._emit("step", step=i+1)
+            messages = self.context_manager.compact(messages)
 
-            response = self.client.chat.completions.create(
-                model="gpt-4o", messages=messages, tools=self.api_tools, tool_choice="auto"
+            response = self.router.create(
+                self.client, TASK_PLAN, validate=self._is_valid_plan,
+                messages=messages, tools=self.api_tools, tool_choice="auto"
             )
+            self._record_usage(response, f"step {i+1}")
             response_message = response.choices[0].message
             messages.append(response_message)
 
@@ -220,15 +315,32 @@ class AIAgent(LoggingMixin):
                 # [개선] AI가 작업을 완료하지 못했다고 판단되면, 자기 개선 로직 실행
                 self._log("  [Thought] 현재 도구로는 이 요청을 완료할 수 없습니다. 새로운 도구가 필요한지 확인합니다.")
 
-                # 1. OpenAI가 명세서 생성
-                existing_tool_names = [t.name for t in self.tools]
-                new_tool_spec = self.spec_generator.generate_spec(initial_query, existing_tool_names)
+                # 1. OpenAI가 명세서 생성 (같은 질문·같은 도구 목록에 대한 이전 판단이 있으면 재사용)
+                success = False
+                tool_cache = GeneratedToolCache()
+                decision = tool_cache.get_decision(initial_query, self.registry_version)
+                if decision is not None:
+                    new_tool_spec = decision["spec"]
+                    self._log("  [AI Agent] 이전에 같은 요청에 대해 내린 도구 생성 판단을 재사용합니다.")
+                else:
+                    existing_tool_names = [t.name for t in self.tools]
+                    new_tool_spec = self.spec_generator.generate_spec(initial_query, existing_tool_names)
+                    if not new_tool_spec:
+                        tool_cache.put_decision(initial_query, self.registry_version, None)
 
                 if new_tool_spec:
                     print(f". [AI Agent] 필요한 새 도구의 명세서를 생성했습니다. (new_tool_spec : {new_tool_spec})")
 
                     # 2. OpenAI기반 하이브리드(rule기반 + LLM기반) 명세서 기반으로 코드 생성 및 등록
-                    success = self.code_generator.create_and_register_tool(new_tool_spec)
+                    # (테스트를 통과한 도구는 생성 도구 캐시에 있으므로, 판단을 재사용할 때는 코드 생성도 생략된다)
+                    try:
+                        success = self.code_generator.create_and_register_tool(new_tool_spec)
+                    except ValueError as e:
+                        # 사용 가능한 코드 생성기가 없음 (API 키 미설정 등)
+                        self._log(f"  [AI Agent] 코드 생성기를 준비할 수 없습니다: {e}")
+                        success = False
+                    if success and decision is None:
+                        tool_cache.put_decision(initial_query, self.registry_version, new_tool_spec)
                 else:
                     self._log("  [AI Agent] 추가 도구가 필요 없다고 판단. 최종 답변을 출력합니다.")
                     self._log(f"   [Final Answer] {response_message.content}")
@@ -241,17 +353,20 @@ class AIAgent(LoggingMixin):
                     self._log("  [AI Agent] 새 도구 제작에 실패하여, 작업을 중단합니다.")
 
                 # return
-                return {"final_result": final_result, "execution_log": self.execution_log}
+                return self._finalize(final_result)
 
 
             # 기존 Tool Calling 로직
             for tool_call in response_message.tool_calls:
                 function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
+                try:
+                    function_args = json.loads(tool_call.function.arguments or "{}")
+                except json.JSONDecodeError:
+                    function_args = tool_call.function.arguments # 검증기가 invalid_json 오류로 돌려준다
                 
                 # AI가 '작업 완료' 신호를 보낸 경우 -> 완전 종료
                 if function_name == "finish_task":
-                    summary = function_args.get('summary', '작업이 완료되었습니다.')
+                    summary = (function_args.get('summary') if isinstance(function_args, dict) else None) or '작업이 완료되었습니다.'
                     self._log(f"   [Thought] 모든 작업이 완료되었다고 판단했습니다.")
                     self._log(f"   [Final Answer] {summary}")
 
@@ -263,19 +378,33 @@ class AIAgent(LoggingMixin):
                     should_break_loop = True
                     break
 
-                function_to_call = self.available_tools[function_name]
-
-                # parameter 를 넘기지 않는 경우 해결
-                # 하드 코딩하는 것이 최선의 방안인가?
-                if not function_args :
-                    tool_output = function_to_call(user=self.user)
-                else :
+                function_to_call = self.available_tools.get(function_name)
+
+                # 인자 검증/타입 변환 + 도구가 선언한 컨텍스트 값(user 등) 주입
+                # 검증에 실패하면 도구를 실행하지 않고 오류 목록을 같은 단계의 tool 결과로 돌려준다
+                validator = self.tool_validators.get(function_name)
+                unknown_tool = function_to_call is None or validator is None
+                if not unknown_tool:
+                    function_args, arg_errors = validator.validate(function_args, context={"user": self.user})
+                self._emit("tool_start", step=i+1, tool=function_name, call_id=tool_call.id)
+                started = time.perf_counter()
+                if unknown_tool:
+                    # 등록되지 않은 도구 이름 (환각 등) → 같은 단계의 tool 결과로 오류를 돌려준다
+                    self._log(f"   [AI Agent] 등록되지 않은 도구 호출: '{function_name}'")
+                    tool_output = unknown_tool_result(function_name, self.available_tools)
+                elif arg_errors:
+                    self._log(f"   [AI Agent] '{function_name}' 인자 오류: {arg_errors}")
+                    tool_output = validator.error_result(arg_errors)
+                else:
                     tool_output = function_to_call(**function_args)
+                self._emit("tool_finish", step=i+1, tool=function_name, call_id=tool_call.id,
+                           duration_ms=round((time.perf_counter() - started) * 1000, 1))
 
                 messages.append({"tool_call_id": tool_call.id, "role": "tool", "name": function_name, "content": tool_output})
             
             if 'should_break_loop' in locals() and should_break_loop:
                 break
 
+        print(f"   [Usage] 총계: {self.usage_stats}")
         print(f"[Alarm]{'#'*2} AI Agent Process Finished {'#'*2}")
-        return {"final_result": final_result, "execution_log": self.execution_log}
\ No newline at end of file
+        return self._finalize(final_result)
\ No newline at end of file
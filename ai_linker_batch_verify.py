@@ -0,0 +1,79 @@
+# 사용자 전체의 사업자 상태를 미리 검증해두는 배치 작업
+# 에이전트 실행 중 국세청 API 호출이 임계 경로에 놓이지 않도록, 주기적으로(예: cron) 실행한다
+#
+# 사용 예) python ai_linker_batch_verify.py --batch-size 100
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import requests
+from tools.utils.nts_client import NtsBusinessClient, NTS_MAX_BATCH
+from tools.utils.business_status import BusinessStatusStore, DEFAULT_STATUS_FILE, DEFAULT_TTL_SECONDS
+from tools.utils.userstore import SQLiteUserStore, DEFAULT_USER_DB_PATH
+
+
+def run_batch_verification(user_database, store: BusinessStatusStore, client: NtsBusinessClient,
+                           batch_size: int = NTS_MAX_BATCH, only_stale: bool = True) -> dict:
+    """USER_DATABASE(dict 또는 UserStore) 의 모든 사업자번호를 batch_size 단위로 검증하여 store 에 기록한다"""
+    business_ids = []
+    for user_id, user in user_database.items():
+        business_id = (user or {}).get('business_id')
+        if not business_id:
+            continue
+        if only_stale and store.get_fresh(business_id):
+            continue
+        business_ids.append(business_id)
+
+    # 여러 사용자가 같은 사업자번호를 공유할 수 있으므로 중복 제거 (순서 유지)
+    business_ids = list(dict.fromkeys(business_ids))
+    print(f"[BatchVerify] 검증 대상 사업자번호: {len(business_ids)}개 (batch_size={batch_size})")
+
+    summary = {"requested": len(business_ids), "verified": 0, "failed_batches": 0}
+    for start in range(0, len(business_ids), batch_size):
+        chunk = business_ids[start:start + batch_size]
+        try:
+            statuses = client.fetch_status(chunk)
+        except requests.exceptions.RequestException as e:
+            print(f"[BatchVerify Error] {start}~{start + len(chunk)} 구간 조회 실패: {e}")
+            summary["failed_batches"] += 1
+            continue
+
+        store.put_many(statuses)
+        summary["verified"] += len(statuses)
+        print(f"[BatchVerify] {start + len(chunk)}/{len(business_ids)} 처리 완료")
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI-Linker 사업자 상태 일괄 사전검증")
+    parser.add_argument("--user-db", default=os.environ.get("USER_DB_PATH", DEFAULT_USER_DB_PATH), help="SQLite 사용자 DB 경로")
+    parser.add_argument("--user-data", default="user_data.json", help="사용자 DB 가 비어 있을 때 등록할 JSON 파일 경로")
+    parser.add_argument("--output", default=DEFAULT_STATUS_FILE, help="검증 결과 저장 파일 경로")
+    parser.add_argument("--batch-size", type=int, default=NTS_MAX_BATCH, help=f"API 1회 호출당 사업자번호 수 (최대 {NTS_MAX_BATCH})")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL_SECONDS, help="검증 결과 유효기간(초)")
+    parser.add_argument("--all", action="store_true", help="유효한 결과가 있어도 모두 다시 검증")
+    args = parser.parse_args()
+
+    try:
+        user_database = SQLiteUserStore(args.user_db)
+        if user_database.is_empty():
+            user_database.import_json(args.user_data)
+        client = NtsBusinessClient()
+    except (FileNotFoundError, json.JSONDecodeError, ValueError, sqlite3.Error) as e:
+        print(f"[CRITICAL] 배치 사전검증 초기화 실패: {e}")
+        sys.exit(1)
+
+    store = BusinessStatusStore(filepath=args.output, ttl_seconds=args.ttl)
+    summary = run_batch_verification(
+        user_database, store, client,
+        batch_size=max(1, min(args.batch_size, NTS_MAX_BATCH)),
+        only_stale=not args.all
+    )
+    print(f"[BatchVerify] 완료: {summary}")
+
+
+if __name__ == "__main__":
+    main()
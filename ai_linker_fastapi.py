@@ -4,17 +4,31 @@ from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import uvicorn
 import json
+import os
+import sqlite3
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from tools.utils.hybriddb import VectorDB_hybrid
 import logging 
+import asyncio
+import threading
 from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
 
 # --- 기존 AI-Linker 모듈 import ---
 from ai_linker_agent import AIAgent
-from tools.utils.ragsystem import RAG_System
+from tools.utils.ragsystem import RAG_System, DOCUMENT_FIELDS
 from tools.utils.SystemUtils import ConfigLoader 
-from fastapi import FastAPI, HTTPException, Security, Depends
+from tools.utils.userstore import SQLiteUserStore, DEFAULT_USER_DB_PATH
+from tools.utils.llm_cache import LLMResponseCache, make_embed_fn
+from tools.utils.resilience import request_deadline
+from tools.utils.event_stream import AgentEventStream
+from tools.utils.job_queue import JobQueue, JobQueueFull, SQLiteJobStore, DEFAULT_JOB_DB_PATH, JOB_QUEUED, JOB_RUNNING
+from tools.utils.admission import AdmissionController, AdmissionRejected
+from tools.utils.single_flight import SingleFlight, IdempotencyConflict, normalize_query
+from tools.utils.warmup import WarmupTracker, warm_embedding_model, open_provider_connection
+from fastapi import FastAPI, HTTPException, Security, Depends, Query, Request, Header, Response
+from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.security import APIKeyHeader
 
 
@@ -43,27 +57,34 @@ class AgentResponse(BaseModel):
     final_result: Dict[str, Any]
     execution_log: List[str]
 
+class JobRequest(AgentRequest):
+    webhook_url: Optional[str] = None
+
 # --- 시스템 초기화 ---
 # [개선] 전역 변수로 핵심 객체들을 선언
 config = None
 rag_system = None
 USER_DATABASE = None
 openai_client = None
+llm_response_cache = None
+AGENT_DEADLINE_SECONDS = 120
 
 try:
     print("AI-Linker 시스템을 초기화합니다...")
     config = ConfigLoader()
     openai_client = config.get_openai_client()
+    AGENT_DEADLINE_SECONDS = float(config.get_setting('RESILIENCE', 'request_deadline', env_key='AGENT_REQUEST_DEADLINE', default='120'))
         
-    # user_data.json 파일에서 사용자 DB 로드
-    with open('user_data.json', 'r', encoding='utf-8') as f:
-        USER_DATABASE = json.load(f)
-    print(f"사용자 DB 로드 완료. ({len(USER_DATABASE)}명)")
+    # 사용자 DB (SQLite) 연결. 비어 있으면 기존 user_data.json 을 일괄 등록한다
+    USER_DATABASE = SQLiteUserStore(os.environ.get('USER_DB_PATH', DEFAULT_USER_DB_PATH))
+    if USER_DATABASE.is_empty():
+        USER_DATABASE.import_json('user_data.json')
+    print(f"사용자 DB 연결 완료. ({USER_DATABASE.db_path})")
 
     # rag_data.json 파일에서 RAG 지식 베이스 로드
     rag_system = RAG_System()
     # Hybrid Database 장착
-    rag_system.set_database = VectorDB_hybrid()
+    rag_system.set_database(VectorDB_hybrid())
 
     
     with open('rag_data.json', 'r', encoding='utf-8') as f:
@@ -78,10 +99,13 @@ try:
         )
     rag_system.db.build_index()
     print(f"RAG 지식 베이스 로드 완료. ({len(policies)}개 정책)")
+
+    # LLM 응답 캐시 (RAG DB 에 시맨틱 모델이 있으면 유사 질문 매칭도 사용)
+    llm_response_cache = LLMResponseCache(embed_fn=make_embed_fn(rag_system))
     
     print("시스템 초기화 완료.")
 
-except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+except (FileNotFoundError, json.JSONDecodeError, KeyError, sqlite3.Error) as e:
     print(f"[CRITICAL] 시스템 초기화 실패: {e}")
     print("서버를 시작할 수 없습니다. 설정 또는 데이터 파일을 확인하세요.")
     sys.exit(1) # [개선] 프로그램 종료
@@ -97,81 +121,318 @@ async def get_api_key(key: str = Security(api_key_header)):
             status_code=403, detail="Could not validate credentials"
         )
 
+# 요청 하나를 처리할 에이전트 생성 (전역 핵심 객체 공유)
+def _create_agent(user_id: str, event_sink=None) -> AIAgent:
+    return AIAgent(
+        user_id=user_id,
+        rag_system=rag_system,         # 전역 rag_system 객체 전달
+        user_database=USER_DATABASE,   # 전역 USER_DATABASE 객체 전달
+        _client=openai_client,         # 전역 openai_client 객체 전달
+        response_cache=llm_response_cache,
+        event_sink=event_sink
+    )
+
+
+# --- 비동기 작업 큐 ---
+# 작업 하나 = 에이전트 실행 한 번. worker 스레드에서 호출된다
+def _run_job(job: dict) -> dict:
+    agent = _create_agent(job["user_id"])
+    with request_deadline(AGENT_DEADLINE_SECONDS):
+        result = agent.run(job["query"])
+    return {
+        "final_result": result.get("final_result", {}),
+        "execution_log": result.get("execution_log", []),
+        "usage": result.get("usage", {})
+    }
+
+job_queue = JobQueue(
+    SQLiteJobStore(os.environ.get('JOB_DB_PATH', DEFAULT_JOB_DB_PATH)),
+    runner=_run_job,
+    workers=int(config.get_setting('JOBS', 'workers', env_key='JOB_WORKERS', default='4')),
+    max_queued=int(config.get_setting('JOBS', 'max_queued', env_key='JOB_MAX_QUEUED', default='1000')),
+    lease_seconds=float(config.get_setting('JOBS', 'lease_seconds', env_key='JOB_LEASE_SECONDS', default='60')),
+    max_attempts=int(config.get_setting('JOBS', 'max_attempts', env_key='JOB_MAX_ATTEMPTS', default='3'))
+)
+job_queue.start()
+
+# --- /run-agent 입장 제어 ---
+admission = AdmissionController(
+    max_concurrent=int(config.get_setting('ADMISSION', 'max_concurrent', env_key='ADMISSION_MAX_CONCURRENT', default='8')),
+    per_key_limit=int(config.get_setting('ADMISSION', 'per_key_limit', env_key='ADMISSION_PER_KEY_LIMIT', default='4')),
+    per_user_limit=int(config.get_setting('ADMISSION', 'per_user_limit', env_key='ADMISSION_PER_USER_LIMIT', default='1')),
+    max_waiting=int(config.get_setting('ADMISSION', 'max_waiting', env_key='ADMISSION_MAX_WAITING', default='32')),
+    wait_timeout=float(config.get_setting('ADMISSION', 'wait_timeout', env_key='ADMISSION_WAIT_TIMEOUT', default='10'))
+)
+
+# --- 중복 요청 병합 / Idempotency-Key 재응답 ---
+single_flight = SingleFlight(
+    replay_ttl=float(config.get_setting('ADMISSION', 'idempotency_ttl', env_key='IDEMPOTENCY_TTL', default='300'))
+)
+
+# --- /run-agent/stream 에이전트 실행용 worker 스레드 (동시 실행 상한) ---
+stream_executor = ThreadPoolExecutor(
+    max_workers=int(config.get_setting('ADMISSION', 'max_concurrent', env_key='ADMISSION_MAX_CONCURRENT', default='8')),
+    thread_name_prefix="agent-stream"
+)
+# 입장 슬롯을 잡고 있는 스트리밍 실행 task (GC 되지 않도록 참조 유지)
+_stream_tasks = set()
+
+# --- 시작 warm-up (/readyz 는 완료 후에만 ready) ---
+warmup = WarmupTracker()
+if config.get_setting('WARMUP', 'enabled', env_key='WARMUP_ENABLED', default='true').strip().lower() in ("1", "true", "yes", "on"):
+    # 임베딩 모델 더미 배치 → 도구 로드/인자 검증기/도구 명세 prefix 생성(에이전트 1회 생성) → 제공자 연결
+    warmup.add_step("embedding_model", lambda: warm_embedding_model(
+        rag_system.db, batch_size=int(config.get_setting('WARMUP', 'batch_size', env_key='WARMUP_BATCH_SIZE', default='8'))))
+    warmup.add_step("tool_registry", lambda: _create_agent("__warmup__"))
+    if config.get_setting('WARMUP', 'connect_providers', env_key='WARMUP_CONNECT_PROVIDERS', default='true').strip().lower() in ("1", "true", "yes", "on"):
+        warmup.add_step("openai_connection", lambda: open_provider_connection(openai_client), required=False)
+warmup.start()
+
 # API 처리
 @app.post("/run-agent", response_model=AgentResponse)
-async def run_agent_process(request: AgentRequest, api_key: str = Depends(get_api_key)):
+async def run_agent_process(request: AgentRequest, response: Response, api_key: str = Depends(get_api_key),
+                            idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     print(f"수신된 요청: user_id={request.user_id}, query='{request.query}'")
-    
+
+    if request.user_id not in USER_DATABASE:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+
+    # Idempotency-Key 가 있으면 그 키로, 없으면 (사용자, 정규화된 질문) 으로 진행 중인 실행을 합친다
+    fingerprint = (request.user_id, normalize_query(request.query))
+    if idempotency_key:
+        flight_key = ("idempotency", api_key, idempotency_key)
+    else:
+        flight_key = ("query",) + fingerprint
+
+    async def execute():
+        # 동시 실행 한도 안에서만 시작하고, 에이전트 실행은 이벤트 루프 밖(스레드)에서 처리한다
+        async with admission.admit(api_key, request.user_id):
+            final_result_dict, captured_logs = await asyncio.to_thread(_run_agent_with_logs, request.user_id, request.query)
+        return AgentResponse(
+            status="success",
+            final_result=final_result_dict.get("final_result", {}),
+            execution_log=captured_logs
+        )
+
     try:
-        if request.user_id not in USER_DATABASE:
-            raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
-            
-        # 1. 이 요청만을 위한 임시 '로그 수집기'(Stream) 생성
-        log_stream = StringIO()
-        
-        # 2. 모든 로그 메시지가 이 수집기로 향하도록 로거(Logger) 설정
-        # (기존 핸들러를 잠시 비활성화하고, 우리 수집기를 유일한 대상으로 설정)
-        linker_logger = logging.getLogger('ai_linker')
-        linker_logger.setLevel(logging.INFO)
+        if idempotency_key:
+            replay = single_flight.get_replay(flight_key, fingerprint)
+            if replay is not None:
+                response.headers["Idempotent-Replayed"] = "true"
+                return replay
 
-        original_handlers = linker_logger.handlers[:]
-        
-        stream_handler = logging.StreamHandler(log_stream)
-        formatter = logging.Formatter('%(message)s')
-        stream_handler.setFormatter(formatter)
-        
-        linker_logger.handlers = [stream_handler]
-        
-        try:
-            agent = AIAgent(
-                user_id=request.user_id,
-                rag_system=rag_system,         # 전역 rag_system 객체 전달
-                user_database=USER_DATABASE,   # 전역 USER_DATABASE 객체 전달
-                _client=openai_client          # 전역 openai_client 객체 전달
-            )
-
-            final_result_dict = agent.run(request.query)
-
-            captured_logs = log_stream.getvalue().strip().split('\n')
-            
-            return AgentResponse(
-                status="success",
-                final_result=final_result_dict.get("final_result", {}),
-                execution_log=captured_logs
-            )
-        finally:
-            # 4. 요청 처리가 끝나면, 원래의 로거 설정으로 복원
-            linker_logger.handlers = original_handlers
+        result, shared = await single_flight.run(flight_key, fingerprint, execute, remember=bool(idempotency_key))
+        if shared:
+            response.headers["X-Coalesced"] = "true"
+        return result
 
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         print(f"에이전트 실행 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail=f"내부 서버 오류: {e}")
 
 
+# 에이전트를 실행하고 이 실행의 로그만 수집한다 (worker 스레드에서 호출)
+def _run_agent_with_logs(user_id: str, query: str) -> tuple:
+    # 1. 이 요청만을 위한 임시 '로그 수집기'(Stream) 생성
+    log_stream = StringIO()
+
+    # 2. 현재 스레드에서 발생한 로그만 이 수집기로 모은다
+    # (여러 요청이 동시에 실행되므로 로거의 핸들러를 통째로 바꾸지 않는다)
+    linker_logger = logging.getLogger('ai_linker')
+    linker_logger.setLevel(logging.INFO)
+
+    thread_id = threading.get_ident()
+    stream_handler = logging.StreamHandler(log_stream)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    stream_handler.addFilter(lambda record: record.thread == thread_id)
+    linker_logger.addHandler(stream_handler)
+
+    try:
+        agent = _create_agent(user_id)
+
+        # 요청 하나의 모든 LLM 호출이 같은 deadline 예산을 나눠 쓴다
+        with request_deadline(AGENT_DEADLINE_SECONDS):
+            final_result_dict = agent.run(query)
+
+        return final_result_dict, log_stream.getvalue().strip().split('\n')
+    finally:
+        # 3. 요청 처리가 끝나면 수집기를 제거
+        linker_logger.removeHandler(stream_handler)
+
+
+# liveness: 프로세스가 요청에 응답할 수 있는지만 확인 (인증 없음)
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+# readiness: warm-up 이 끝나기 전에는 503 을 돌려 로드밸런서가 트래픽을 보내지 않게 한다 (인증 없음)
+@app.get("/readyz")
+async def readyz():
+    status = warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+# 입장 제어 현황 (동시 실행 수, 대기열 길이, 한도, 거절 횟수) 및 작업 큐 현황
+@app.get("/metrics")
+async def get_metrics(api_key: str = Depends(get_api_key)):
+    return {
+        "admission": admission.metrics(),
+        "single_flight": single_flight.stats,
+        "jobs": {status: job_queue.store.count(status) for status in (JOB_QUEUED, JOB_RUNNING)}
+    }
+
+
+# 에이전트 실행을 작업으로 등록하고 job_id 를 즉시 반환 (결과는 /jobs/{job_id} 또는 webhook 으로 확인)
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest, api_key: str = Depends(get_api_key)):
+    if request.user_id not in USER_DATABASE:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+    try:
+        job = job_queue.submit(request.user_id, request.query, request.webhook_url)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    print(f"작업 등록: job_id={job['job_id']}, user_id={request.user_id}")
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+
+# 작업 상태와 결과 조회
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, api_key: str = Depends(get_api_key)):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
+
+
+# 진행 상황 스트리밍 (Server-Sent Events)
+# 단계 시작, 도구 호출 시작/종료(소요 시간), 최종 답변(token), 종료 이벤트를 실시간으로 보낸다.
+# 에이전트는 별도 스레드에서 실행되고, 클라이언트가 느리거나 끊기면 AgentEventStream 이 이벤트를 조절/폐기한다.
+@app.post("/run-agent/stream")
+async def run_agent_stream(request: AgentRequest, http_request: Request, api_key: str = Depends(get_api_key)):
+    print(f"수신된 스트리밍 요청: user_id={request.user_id}, query='{request.query}'")
+    if request.user_id not in USER_DATABASE:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+
+    stream = AgentEventStream()
+
+    def worker():
+        try:
+            agent = _create_agent(request.user_id, event_sink=stream.emit)
+            with request_deadline(AGENT_DEADLINE_SECONDS):
+                result = agent.run(request.query)
+            stream.emit("result", {"final_result": result.get("final_result", {}), "usage": result.get("usage", {})})
+        except Exception as e:
+            print(f"에이전트 실행 중 오류 발생: {e}")
+            stream.emit("error", {"message": f"내부 서버 오류: {e}"})
+        finally:
+            stream.close()
+
+    # /run-agent 와 같은 입장 제어를 적용한다. 입장이 허락된 뒤에만 스트림을 연다 (거절 시 429/503 + Retry-After)
+    # 입장 슬롯은 에이전트 실행이 끝날 때까지 백그라운드 task 가 잡고 있는다
+    loop = asyncio.get_running_loop()
+    admitted = loop.create_future()
+
+    async def run_admitted():
+        try:
+            async with admission.admit(api_key, request.user_id):
+                admitted.set_result(True)
+                # 요청마다 스레드를 만들지 않고 크기가 제한된 executor 에서 실행한다
+                await loop.run_in_executor(stream_executor, worker)
+        except AdmissionRejected as e:
+            admitted.set_exception(e)
+
+    task = asyncio.create_task(run_admitted())
+    _stream_tasks.add(task)
+    task.add_done_callback(_stream_tasks.discard)
+    try:
+        await admitted
+    except asyncio.CancelledError:
+        task.cancel() # 입장 대기 중에 클라이언트가 떠나면 실행하지 않는다
+        raise
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
+
+    return StreamingResponse(
+        stream.sse(http_request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# /rag-content 공통 파라미터 해석
+def _parse_rag_query(fields: Optional[str], filters: Optional[List[str]]) -> tuple:
+    """
+    fields  : 'ids' 또는 content,metadata 중 쉼표로 구분한 조합 (기본: content,metadata)
+    filters : 'key:value' 형식의 metadata 조건 목록 (모두 만족해야 함)
+    """
+    if rag_system is None:
+        raise HTTPException(status_code=500, detail="RAG 시스템이 초기화되지 않았습니다.")
+
+    if not fields:
+        selected = DOCUMENT_FIELDS
+    elif fields.strip() == "ids":
+        selected = ()
+    else:
+        selected = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = [f for f in selected if f not in DOCUMENT_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 필드입니다: {unknown}")
+
+    parsed_filters = {}
+    for item in filters or []:
+        key, sep, value = item.partition(":")
+        if not sep or not key:
+            raise HTTPException(status_code=400, detail=f"filter 는 'key:value' 형식이어야 합니다: {item}")
+        parsed_filters[key] = value
+    return selected, parsed_filters
+
+
 #  RAG 시스템 내용 조회 API
 @app.get("/rag-content")
-async def get_rag_content():
+async def get_rag_content(cursor: Optional[str] = None, limit: int = Query(50, ge=1, le=500),
+                          fields: Optional[str] = None, filter: Optional[List[str]] = Query(None)):
     """
-    현재 RAG 지식 베이스에 저장된 모든 정책 문서의 내용을 반환합니다.
+    RAG 지식 베이스의 정책 문서를 doc_id 순으로 페이지 단위로 반환합니다.
+    다음 페이지는 응답의 next_cursor 를 cursor 로 전달하여 조회합니다. (마지막 페이지면 null)
     """
-    if not rag_system:
-        raise HTTPException(status_code=500, detail="RAG 시스템이 초기화되지 않았습니다.")
-    
-    content = rag_system.get_all_documents_as_dict()
-    return {"rag_documents": content}
+    selected, parsed_filters = _parse_rag_query(fields, filter)
+    documents, next_cursor = rag_system.list_documents(cursor=cursor, limit=limit, fields=selected, filters=parsed_filters)
+    return {"rag_documents": documents, "next_cursor": next_cursor}
+
+
+#  RAG 시스템 전체 내보내기 API (NDJSON 스트리밍)
+@app.get("/rag-content/export")
+async def export_rag_content(fields: Optional[str] = None, filter: Optional[List[str]] = Query(None)):
+    """
+    RAG 지식 베이스 전체를 한 줄에 문서 하나씩(NDJSON) 스트리밍합니다.
+    전체를 메모리에 모으지 않고 문서 저장소에서 바로 한 건씩 내보냅니다.
+    """
+    selected, parsed_filters = _parse_rag_query(fields, filter)
+
+    def generate():
+        for item in rag_system.iter_documents(fields=selected, filters=parsed_filters):
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
 # 등록된 사용자 목록 조회 API
 @app.get("/users")
-async def get_user_list():
+async def get_user_list(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
     """
-    현재 시스템에 등록된 모든 사용자의 ID 목록을 반환합니다.
+    시스템에 등록된 사용자의 ID 목록을 페이지 단위로 반환합니다.
+    다음 페이지는 응답의 next_cursor 를 cursor 로 전달하여 조회합니다. (마지막 페이지면 null)
     """
-    if not USER_DATABASE:
+    if USER_DATABASE is None:
         raise HTTPException(status_code=500, detail="사용자 DB가 초기화되지 않았습니다.")
     
-    user_ids = list(USER_DATABASE.keys())
-    return {"user_ids": user_ids}
+    user_ids, next_cursor = USER_DATABASE.list_user_ids(cursor=cursor, limit=limit)
+    return {"user_ids": user_ids, "next_cursor": next_cursor}
 
 # 로컬 테스트용 실행 코드
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+# 임베딩 인코더 백엔드 비교 벤치마크
+# 백엔드(fp32 / int8)별로 문서 인코딩 처리량(docs/sec)과 단건 질의 인코딩 지연(p50/p95)을 재고,
+# 기준 백엔드(첫 번째) 벡터와의 코사인 유사도와 검색 top-1 일치율로 기존 인덱스와의 호환성을 확인한다.
+# 문서는 rag_data.json / latest_policies.json 의 문장을 조합해 길이가 다양한 코퍼스로 만든다.
+#
+# 사용 예) python benchmarks/encoder_benchmark.py --backends fp32,int8 --threads 4 --batch-size 32
+#         python benchmarks/encoder_benchmark.py --no-bucket --num-docs 1024 --json encoder_benchmark.json
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+from tools.utils.encoders import create_encoder, ENCODER_BACKENDS
+
+QUERIES = (
+    "소상공인 정책자금 대출 신청하고 싶어요",
+    "매출이 줄어서 긴급 자금이 필요합니다",
+    "사업자등록증명원이 필요한 지원사업",
+    "혁신성장 기술평가 대출 조건 알려줘",
+)
+
+
+def load_sentences() -> list:
+    sentences = []
+    with open(os.path.join(PROJECT_ROOT, "rag_data.json"), "r", encoding="utf-8") as f:
+        for doc in json.load(f):
+            sentences.append(doc["content"])
+    policies_path = os.path.join(PROJECT_ROOT, "latest_policies.json")
+    if os.path.exists(policies_path):
+        with open(policies_path, "r", encoding="utf-8") as f:
+            for policy in json.load(f):
+                sentences.append(f"{policy.get('title', '')}: {policy.get('summary', '')}")
+                sentences.append(f"필요 서류: {', '.join(policy.get('required_docs', []))}")
+    return [s for s in sentences if s.strip()]
+
+
+def build_corpus(num_docs: int, seed: int = 0) -> list:
+    """문장 1~8개를 이어 붙여 길이가 다양한 문서를 만든다 (길이 기반 배치 효과 확인용)"""
+    rng = random.Random(seed)
+    sentences = load_sentences()
+    return [" ".join(rng.choice(sentences) for _ in range(rng.randint(1, 8))) for _ in range(num_docs)]
+
+
+def benchmark_backend(backend: str, corpus: list, args) -> dict:
+    started = time.perf_counter()
+    encoder = create_encoder(backend=backend, threads=args.threads, batch_size=args.batch_size,
+                             bucket_by_length=not args.no_bucket)
+    load_seconds = time.perf_counter() - started
+
+    # warm-up (첫 호출의 커널 준비 비용 제외)
+    encoder.encode(corpus[:args.batch_size])
+    encoder.encode([QUERIES[0]])
+
+    started = time.perf_counter()
+    doc_vectors = encoder.encode(corpus)
+    encode_seconds = time.perf_counter() - started
+
+    latencies = []
+    query_vectors = []
+    for i in range(args.queries):
+        query = QUERIES[i % len(QUERIES)]
+        started = time.perf_counter()
+        vector = encoder.encode([query])
+        latencies.append((time.perf_counter() - started) * 1000)
+        if i < len(QUERIES):
+            query_vectors.append(vector[0])
+
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "docs_per_sec": round(len(corpus) / encode_seconds, 1),
+        "query_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "query_p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "dimension": int(doc_vectors.shape[1]),
+        "_doc_vectors": doc_vectors,
+        "_query_vectors": np.asarray(query_vectors, dtype="float32"),
+    }
+
+
+def compare(reference: dict, result: dict) -> dict:
+    """기준 백엔드 대비 문서 벡터 코사인 유사도와 질의별 top-1 문서 일치율"""
+    if reference["dimension"] != result["dimension"]:
+        return {"cosine_mean": None, "cosine_min": None, "top1_agreement": 0.0}
+    cosine = np.sum(reference["_doc_vectors"] * result["_doc_vectors"], axis=1)
+    ref_top1 = np.argmax(reference["_query_vectors"] @ reference["_doc_vectors"].T, axis=1)
+    top1 = np.argmax(result["_query_vectors"] @ result["_doc_vectors"].T, axis=1)
+    return {
+        "cosine_mean": round(float(cosine.mean()), 4),
+        "cosine_min": round(float(cosine.min()), 4),
+        "top1_agreement": round(float(np.mean(ref_top1 == top1)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI-Linker 임베딩 인코더 백엔드 벤치마크")
+    parser.add_argument("--backends", default=",".join(ENCODER_BACKENDS), help="비교할 백엔드 (첫 번째가 호환성 기준)")
+    parser.add_argument("--threads", type=int, default=0, help="torch 스레드 수 (0 이면 기본값)")
+    parser.add_argument("--batch-size", type=int, default=32, help="인코딩 배치 크기")
+    parser.add_argument("--no-bucket", action="store_true", help="길이 기반 배치를 끄고 입력 순서대로 배치")
+    parser.add_argument("--num-docs", type=int, default=512, help="인코딩할 문서 수")
+    parser.add_argument("--queries", type=int, default=100, help="질의 지연 측정 횟수")
+    parser.add_argument("--json", dest="json_path", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.num_docs)
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    print(f"[EncoderBenchmark] 문서 {len(corpus)}개, 질의 {args.queries}회, backends={backends}, "
+          f"threads={args.threads or 'default'}, batch_size={args.batch_size}, bucket_by_length={not args.no_bucket}")
+
+    results = []
+    for backend in backends:
+        result = benchmark_backend(backend, corpus, args)
+        result.update(compare(results[0] if results else result, result))
+        results.append(result)
+
+    print(f"{'backend':8} {'load(s)':>8} {'docs/sec':>10} {'p50(ms)':>9} {'p95(ms)':>9} {'cos_mean':>9} {'cos_min':>8} {'top1':>5}")
+    for r in results:
+        print(f"{r['backend']:8} {r['load_seconds']:>8} {r['docs_per_sec']:>10} {r['query_p50_ms']:>9} {r['query_p95_ms']:>9} "
+              f"{r['cosine_mean']!s:>9} {r['cosine_min']!s:>8} {r['top1_agreement']:>5}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([{k: v for k, v in r.items() if not k.startswith("_")} for r in results], f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# 모듈 import 시간 예산 점검 (python -X importtime 기반)
+# 샌드박스 worker, 작업 queue worker 등 새 프로세스는 시작할 때마다 import 비용을 치른다.
+# 각 모듈을 새 인터프리터에서 import 하여 누적 import 시간을 재고,
+#  - 예산(ms)을 넘거나
+#  - 지연 import 해야 할 무거운 패키지(제공자 SDK, torch/faiss 등)를 끌어오면
+# 실패로 표시한다. 예산 초과가 하나라도 있으면 exit code 1.
+#
+# 사용 예) python benchmarks/import_budget.py
+#         python benchmarks/import_budget.py --top 15 --json import_budget.json
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# {모듈: 누적 import 시간 예산(ms)}
+IMPORT_BUDGETS_MS = {
+    "tools.base": 20,
+    "tools.utils.SystemUtils": 60,
+    "tools.utils.sandbox_pool": 80,
+    "tools.utils.ragsystem": 60,
+    "tools.utils.hybriddb": 250,
+    "tools.utils.semanticdb": 250,
+    "tools.tool_loader": 300,
+    "tools.search_knowledge_base_tool": 60,
+}
+
+# 위 모듈들을 import 하는 것만으로는 로드되면 안 되는 패키지 (첫 사용 시 import)
+LAZY_PACKAGES = (
+    "openai", "anthropic", "google.generativeai",
+    "torch", "faiss", "sentence_transformers", "sklearn",
+)
+
+
+def measure(module: str) -> dict:
+    """새 인터프리터에서 module 을 import 하고 -X importtime 출력을 해석한다"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    imports = []
+    errors = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[0].isdigit():
+            continue # 헤더 줄
+        imports.append({"self_us": int(parts[0]), "cumulative_us": int(parts[1]), "name": parts[2]})
+
+    names = {entry["name"] for entry in imports}
+    total_us = next((e["cumulative_us"] for e in imports if e["name"] == module), None)
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "error": "\n".join(errors[-3:]) if proc.returncode else None,
+        "total_ms": round(total_us / 1000, 1) if total_us is not None else None,
+        "lazy_violations": sorted(p for p in LAZY_PACKAGES if p in names),
+        "imports": imports,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI-Linker 모듈 import 시간 예산 점검")
+    parser.add_argument("modules", nargs="*", help="점검할 모듈 (기본: 예산이 정의된 모든 모듈)")
+    parser.add_argument("--top", type=int, default=5, help="모듈별로 출력할 가장 느린 하위 import 수")
+    parser.add_argument("--json", dest="json_path", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    modules = args.modules or list(IMPORT_BUDGETS_MS)
+    results = []
+    failed = False
+    for module in modules:
+        result = measure(module)
+        budget = IMPORT_BUDGETS_MS.get(module)
+        result["budget_ms"] = budget
+
+        if not result["ok"]:
+            status = "ERROR"
+            failed = True
+        elif result["lazy_violations"] or (budget is not None and result["total_ms"] > budget):
+            status = "OVER"
+            failed = True
+        else:
+            status = "OK"
+        result["status"] = status
+
+        print(f"[ImportBudget] {status:5} {module}: {result['total_ms']} ms (예산 {budget} ms)")
+        if result["error"]:
+            print(f"    {result['error']}")
+        if result["lazy_violations"]:
+            print(f"    지연 import 대상이 로드됨: {', '.join(result['lazy_violations'])}")
+        slowest = sorted((e for e in result["imports"] if e["name"] != module), key=lambda e: -e["cumulative_us"])
+        for entry in slowest[:args.top]:
+            print(f"    {entry['cumulative_us'] / 1000:8.1f} ms  {entry['name']}")
+        results.append(result)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([{k: v for k, v in r.items() if k != "imports"} for r in results], f, ensure_ascii=False, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
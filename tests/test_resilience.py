@@ -0,0 +1,71 @@
+# ResilientCaller / CircuitBreaker 회귀 테스트
+# 실행) python -m pytest -q tests  또는  python -m unittest discover tests
+
+import os
+import sys
+import time
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from tools.utils.resilience import (
+    CircuitBreaker, ResilientCaller, CircuitOpenError, DeadlineExceeded, request_deadline, is_retryable,
+)
+
+
+def _half_open_caller() -> ResilientCaller:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    return ResilientCaller("test", max_retries=0, hedge=False, breaker=breaker)
+
+
+class CircuitProbeTest(unittest.TestCase):
+    def test_expired_deadline_does_not_leak_half_open_probe(self):
+        caller = _half_open_caller()
+        with request_deadline(0.01):
+            time.sleep(0.02)
+            with self.assertRaises(DeadlineExceeded):
+                caller.call(lambda timeout: "ok")
+        self.assertFalse(caller.breaker._probe_in_flight)
+        # 다음 호출은 시험 호출로 허용되어 성공하고 circuit 이 닫혀야 한다
+        self.assertEqual(caller.call(lambda timeout: "ok"), "ok")
+        self.assertEqual(caller.breaker.state, "closed")
+
+    def test_local_refusal_in_probe_releases_probe_without_recording(self):
+        caller = _half_open_caller()
+
+        def refuse(timeout):
+            raise DeadlineExceeded("rate limiter 대기 거절")
+
+        with self.assertRaises(DeadlineExceeded):
+            caller.call(refuse)
+        self.assertFalse(caller.breaker._probe_in_flight)
+        self.assertEqual(caller.breaker.state, "half-open")
+        self.assertEqual(caller.call(lambda timeout: "ok"), "ok")
+
+    def test_local_refusals_do_not_open_circuit(self):
+        caller = ResilientCaller("test", max_retries=3, hedge=False, breaker=CircuitBreaker(failure_threshold=3))
+
+        def refuse(timeout):
+            raise DeadlineExceeded("rate limiter 대기 거절")
+
+        for _ in range(5):
+            with self.assertRaises(DeadlineExceeded):
+                caller.call(refuse)
+        self.assertEqual(caller.breaker.state, "closed")
+        self.assertFalse(is_retryable(DeadlineExceeded()))
+        self.assertFalse(is_retryable(CircuitOpenError()))
+
+    def test_open_circuit_rejects_calls(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        caller = ResilientCaller("test", hedge=False, breaker=breaker)
+        with self.assertRaises(CircuitOpenError):
+            caller.call(lambda timeout: "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,10 @@
 from abc import ABC, abstractmethod
 
 class ToolBase(ABC):
+    # LLM 이 아니라 에이전트 컨텍스트에서 채워 넣을 인자 이름 (예: ("user",))
+    # 여기에 선언한 인자는 LLM 에 보내는 도구 명세에서 빠지고, 호출 시 에이전트가 주입한다
+    context_params = ()
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -1,9 +1,10 @@
 import os
-import sys
-import subprocess
-import json
 import re
 from abc import ABC, abstractmethod
+from .utils.sandbox_pool import get_sandbox_pool
+from .utils.code_validator import validate_tool_code
+from .utils.tool_cache import GeneratedToolCache
+from .utils.isolated_tool import write_generated_tool
 
 SAFE_NAME_PATTERN = re.compile(r'[^a-zA-Z0-9_]')
 
@@ -47,118 +48,97 @@ def normalize_tool_spec(spec: dict) -> dict:
 class BaseToolGenerator(ABC):
     """도구 생성기의 공통 기능을 정의하는 추상 클래스"""
 
+    # 정적 검증에 실패했을 때 오류 목록을 전달하여 다시 생성하는 최대 횟수
+    max_fix_attempts = 2
+
     @abstractmethod
-    def generate_code(self, tool_spec: dict) -> str:
-        """tool_spec을 받아 최종 파이썬 코드 문자열을 생성"""
+    def generate_code(self, tool_spec: dict, feedback: list = None) -> str:
+        """
+        tool_spec을 받아 최종 파이썬 코드 문자열을 생성
+        feedback 이 있으면 직전 코드의 정적 검증 오류 목록이며, 해당 부분을 고쳐 다시 생성한다
+        """
         raise NotImplementedError
 
     def _test_generated_code(self, code: str, tool_name: str, tool_spec: dict, tool_directory: str = "tools") -> bool:
         """
-        생성된 코드를 샌드박스에서 문법+런타임 검증:
-          1) 임시 파일로 저장 (tools/temp_test_{name}.py)
-          2) PYTHONPATH 추가 후 import 테스트
+        생성된 코드를 샌드박스 worker 풀에서 문법+런타임 검증:
+          1) 미리 띄워둔 worker 에 코드를 pipe 로 전달 (임시 파일 없이 'tools.temp_test_{name}' 모듈로 로드)
+          2) CPU/메모리/wall-clock 제한을 건 fork 자식에서 실행
           3) **tool_spec 기반** 더미 kwargs 구성 → execute(**kwargs) 호출 → json.loads 검증
         """
         print(f"  [Generator] 생성된 '{tool_name}' 코드를 샌드박스에서 테스트합니다...")
 
-        # 디렉토리 보장
-        os.makedirs(tool_directory, exist_ok=True)
-        test_module_name = f"temp_test_{tool_name}"
-        test_filepath = os.path.join(tool_directory, f"{test_module_name}.py")
-
-        try:
-            with open(test_filepath, "w", encoding="utf-8") as f:
-                f.write(code)
-
-            # tool_spec을 런타임 테스터로 전달
-            spec_json = json.dumps(tool_spec, ensure_ascii=False)
-
-            runtime_tester = f"""
-import os, sys, json
-sys.path.insert(0, os.getcwd())
-mod = __import__('{tool_directory}.{test_module_name}', fromlist=['*'])
-
-# ToolBase 서브클래스 탐색
-tool_cls = None
-from {tool_directory}.base import ToolBase
-for name in dir(mod):
-    obj = getattr(mod, name)
-    try:
-        if isinstance(obj, type) and issubclass(obj, ToolBase) and obj is not ToolBase:
-            tool_cls = obj
-            break
-    except Exception:
-        pass
-if tool_cls is None:
-    raise RuntimeError('Tool class not found')
-
-tool = tool_cls()
-
-tool_spec = json.loads({json.dumps(spec_json)})
-params = (tool_spec.get("parameters") or {{}})
-props = (params.get("properties") or {{}})
-required = (params.get("required") or [])
-
-def default_for(prop):
-    t = (prop or {{}}).get("type")
-    if t == "string": return ""
-    if t == "number": return 0.0
-    if t == "integer": return 0
-    if t == "boolean": return False
-    if t == "array": return []
-    if t == "object": return {{}}
-    return None
-
-kwargs = {{}}
-# 필수 먼저
-for k in required:
-    if k in props:
-        kwargs[k] = default_for(props.get(k))
-# 선택도 채움
-for k, v in props.items():
-    if k not in kwargs:
-        kwargs[k] = default_for(v)
-
-out = tool.execute(**kwargs) if kwargs else tool.execute()
-json.loads(out)
-print('OK')
-"""
-            proc = subprocess.run(
-                [sys.executable, "-c", runtime_tester],
-                cwd=os.getcwd(),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            if proc.returncode != 0:
-                print("  [Generator] 테스트 실패 (컴파일/실행 오류):")
-                print(proc.stdout)
-                print(proc.stderr)
-                return False
-            print("  [Generator] 테스트 성공: OK")
-            return True
-        finally:
-            try:
-                os.remove(test_filepath)
-            except Exception:
-                pass
+        result = get_sandbox_pool().run_tool_test(code, f"temp_test_{tool_name}", tool_spec)
+        self.last_test_result = result
+        if not result.get("ok"):
+            print(f"  [Generator] 테스트 실패 (컴파일/실행 오류): {result.get('error')}")
+            if result.get("log"):
+                print(result["log"])
+            if result.get("traceback"):
+                print(result["traceback"])
+            return False
+        print(f"  [Generator] 테스트 성공: OK ({result.get('duration')}s)")
+        return True
 
     def create_and_register_tool(self, tool_spec: dict, tool_directory: str = "tools") -> bool:
         """
         1) 스펙 정규화(이름/required/타입)
+           → 같은/유사한 스펙으로 테스트를 통과한 도구가 캐시에 있으면 그대로 설치하고 종료
         2) 코드 생성
-        3) 샌드박스 문법/런타임 테스트 (spec 기반 더미 인자)
-        4) 통과 시 {tool_name}_tool.py 로 저장
+        3) AST 정적 검증 → 실패 시 오류 목록을 생성기에 전달하여 재생성 (최대 max_fix_attempts 회)
+        4) 샌드박스 문법/런타임 테스트 (spec 기반 더미 인자)
+        5) 통과 시 {tool_name}_tool.py 로 저장하고 캐시에 등록
         """
         tool_spec = normalize_tool_spec(tool_spec)
         raw_name = tool_spec["name"]
         safe_name = raw_name or f"tool_{os.urandom(4).hex()}"
 
-        generated_code = self.generate_code(tool_spec)
-        if self._test_generated_code(generated_code, safe_name, tool_spec, tool_directory=tool_directory):
-            plugin_path = os.path.join(tool_directory, f"{safe_name}_tool.py")
-            with open(plugin_path, 'w', encoding='utf-8') as f:
-                f.write(generated_code)
-            print(f"  [Generator] 새 도구 '{safe_name}'을 '{plugin_path}'에 성공적으로 등록했습니다.")
+        tool_cache = GeneratedToolCache()
+        cached = tool_cache.lookup(tool_spec)
+        if cached:
+            plugin_path = tool_cache.install(cached, tool_directory)
+            print(f"  [Generator] 캐시된 도구 '{cached['name']}'을 '{plugin_path}'에 등록했습니다. (생성 생략)")
             return True
-        return False
+
+        built = self._build_and_test(tool_spec, safe_name, tool_directory)
+        if not built:
+            return False
+
+        plugin_path = write_generated_tool(os.path.join(tool_directory, f"{safe_name}_tool.py"), built["code"])
+        print(f"  [Generator] 새 도구 '{safe_name}'을 '{plugin_path}'에 성공적으로 등록했습니다.")
+        tool_cache.put(tool_spec, built["code"], built["provenance"], built["test_result"])
+        return True
+
+    def _build_and_test(self, tool_spec: dict, safe_name: str, tool_directory: str = "tools", should_stop=None) -> dict | None:
+        """
+        코드 생성 → 정적 검증(+재생성) → 샌드박스 테스트.
+        통과하면 {"code", "provenance", "test_result"}, 실패하면 None.
+        should_stop() 이 True 를 반환하면 다음 단계로 넘어가지 않고 중단한다 (여러 생성기 경쟁 시 패자 정리용)
+        """
+        stopped = should_stop or (lambda: False)
+        if stopped():
+            return None
+
+        generated_code = self.generate_code(tool_spec)
+        for attempt in range(self.max_fix_attempts + 1):
+            if stopped():
+                return None
+            errors = validate_tool_code(generated_code, tool_spec)
+            if not errors:
+                break
+            print(f"  [Generator] 정적 검증 실패 ({len(errors)}건): {[e['code'] for e in errors]}")
+            if attempt == self.max_fix_attempts:
+                return None
+            generated_code = self.generate_code(tool_spec, feedback=errors)
+
+        if stopped() or not self._test_generated_code(generated_code, safe_name, tool_spec, tool_directory=tool_directory):
+            return None
+        return {
+            "code": generated_code,
+            "provenance": {
+                "generator": type(self).__name__,
+                "model": getattr(self, "model_name", None),
+                "fix_attempts": attempt,
+            },
+            "test_result": self.last_test_result,
+        }
@@ -3,6 +3,8 @@
 import json
 from .base_generator import BaseToolGenerator
 from .utils.SystemUtils import ConfigLoader
+from .utils.resilience import get_caller
+from .utils.code_validator import format_feedback
 import time
 import textwrap
 import re
@@ -15,7 +17,7 @@ class ClaudeCodeGenerator(BaseToolGenerator):
         self.client = ConfigLoader().get_claude_client()
         self.model_name = "claude-3-sonnet-20240229"
 
-    def generate_code(self, tool_spec: dict) -> str:
+    def generate_code(self, tool_spec: dict, feedback: list = None) -> str:
         tool_name = tool_spec.get("name", "UnknownTool")
         class_name = "".join(word.capitalize() for word in tool_name.split('_')) + "Tool"
         
@@ -38,19 +40,27 @@ class ClaudeCodeGenerator(BaseToolGenerator):
         ### [최종 출력]
         다른 설명 없이, 위의 모든 규칙을 준수한 최종 파이썬 코드만 응답하세요.
         """
+        if feedback:
+            # 직전 시도의 정적 검증 오류만 고치도록 요청
+            prompt += f"""
+        ### [이전 코드의 오류]
+        {format_feedback(feedback)}
+        위 오류만 수정하고 나머지 로직은 유지하세요.
+        """
 
         
         # time.sleep(10) # API 속도 제한 준수
 
         # [수정] Claude API 호출 방식으로 변경
-        response = self.client.messages.create(
+        response = get_caller("anthropic").call(lambda timeout: self.client.messages.create(
             model=self.model_name,
             max_tokens=2048, # 최대 출력 토큰 수 설정
             temperature=0.0,
             messages=[
                 {"role": "user", "content": prompt}
-            ]
-        )
+            ],
+            timeout=timeout
+        ), latency_key=f"{self.model_name}:codegen")
         
         # [수정] Claude 응답 파싱 방식으로 변경
         execute_body_raw = response.content[0].text.replace("```python", "").replace("```", "").strip()
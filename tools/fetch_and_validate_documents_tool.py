@@ -0,0 +1,75 @@
+from .base import ToolBase
+import time, json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# 클래스를 직접 import 하면 ToolLoader 가 같은 도구를 중복 등록하므로 모듈 단위로 import 한다
+from . import fetch_document_from_mcp_tool, validate_document_tool
+from tools.utils.log_util import LoggingMixin
+# self._log 는 'print'와 logging 을 포함하는 함수이다.
+# logging.을 통해 외부 api response 로 과정을 보여준다
+
+# fetch_document_from_mcp / validate_document 를 서류마다 한 번씩 호출하면
+# 서류 수만큼 LLM 단계와 기관 왕복 시간이 직렬로 쌓인다.
+# 이 도구는 required_docs 전체를 한 번에 받아 기관별로 동시에 요청하고, 도착한 서류부터 바로 검증한다.
+
+class FetchAndValidateDocumentsTool(LoggingMixin, ToolBase) :
+    name = "fetch_and_validate_documents"
+    description = "정책의 required_docs 목록에 있는 모든 서류를 MCP를 통해 동시에 가져오고, 각 서류를 도착 즉시 검증하여 통합 결과를 반환합니다."
+    parameters = {
+        "type": "object",
+        "properties": {
+            "required_docs": {"type": "array", "items": {"type": "string"}, "description": "검색 결과 metadata 의 required_docs 목록 (서류 이름들)"},
+            "user_id": {"type": "string", "description": "요청하는 사용자의 ID"}
+        },
+        "required": ["required_docs", "user_id"]
+    }
+
+    MAX_WORKERS = 8 # 동시에 요청할 최대 기관 수
+
+    def __init__(self) :
+        self.fetcher = fetch_document_from_mcp_tool.FetchDocumentFromMcpTool()
+        self.validator = validate_document_tool.ValidateDocumentTool()
+
+    def _fetch_and_validate(self, document_name: str, user_id: str) -> dict:
+        """서류 하나를 가져온 직후 같은 작업자에서 바로 검증한다"""
+        fetched = json.loads(self.fetcher.execute(document_name=document_name, user_id=user_id))
+        if fetched.get("status") != "success":
+            return {"doc_name": document_name, "doc_token": None, "is_valid": False,
+                    "message": fetched.get("message", "서류 발급 실패")}
+
+        validation = json.loads(self.validator.execute(doc_token=fetched["doc_token"], issue_date_str=fetched["issue_date"]))
+        return {"doc_name": document_name, "doc_token": fetched["doc_token"], "issue_date": fetched["issue_date"],
+                "is_valid": validation.get("is_valid", False), "message": validation.get("message", "")}
+
+    def execute(self, required_docs: list, user_id: str) -> str:
+        documents = list(dict.fromkeys(required_docs or [])) # 중복 서류는 한 번만 요청
+        if not documents:
+            return json.dumps({"status": "error", "message": "required_docs 가 비어 있습니다."}, ensure_ascii=False)
+
+        self._log(f"  [Tool: MCP Batch] 서류 {len(documents)}건을 동시에 요청합니다 (사용자: {user_id})...")
+        started = time.perf_counter()
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(documents))) as pool:
+            futures = {pool.submit(self._fetch_and_validate, doc, user_id): doc for doc in documents}
+            for future in as_completed(futures):
+                doc = futures[future]
+                try:
+                    results[doc] = future.result()
+                except Exception as e:
+                    results[doc] = {"doc_name": doc, "doc_token": None, "is_valid": False, "message": f"처리 중 오류: {e}"}
+                self._log(f"  [Tool: MCP Batch] '{doc}' 처리 완료 (유효: {results[doc]['is_valid']})")
+
+        # 요청한 순서대로 정리
+        ordered = [results[doc] for doc in documents]
+        all_valid = all(r["is_valid"] for r in ordered)
+        elapsed = round(time.perf_counter() - started, 3)
+        self._log(f"  [Tool: MCP Batch] 전체 처리 완료 ({elapsed}초, 모두 유효: {all_valid})")
+
+        return json.dumps({
+            "status": "success" if all_valid else "error",
+            "all_valid": all_valid,
+            "doc_tokens": [r["doc_token"] for r in ordered if r["is_valid"]],
+            "documents": ordered,
+            "elapsed_sec": elapsed,
+            "message": "모든 서류의 수집 및 검증이 완료되었습니다." if all_valid else "일부 서류의 수집 또는 검증에 실패했습니다."
+        }, ensure_ascii=False)
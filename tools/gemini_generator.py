@@ -3,7 +3,8 @@
 import json
 from .base_generator import BaseToolGenerator
 from .utils.SystemUtils import ConfigLoader
-import time
+from .utils.resilience import get_caller
+from .utils.code_validator import format_feedback
 import textwrap
 import re
 
@@ -13,7 +14,7 @@ class GeminiCodeGenerator(BaseToolGenerator):
     def __init__(self):
         self.model = ConfigLoader().get_gemini_model()
 
-    def generate_code(self, tool_spec: dict) -> str:
+    def generate_code(self, tool_spec: dict, feedback: list = None) -> str:
         tool_name = tool_spec.get("name", "UnknownTool")
         class_name = "".join(word.capitalize() for word in tool_name.split('_')) + "Tool"
         
@@ -47,9 +48,19 @@ class GeminiCodeGenerator(BaseToolGenerator):
         ### [도구 명세서]
         {json.dumps(tool_spec, ensure_ascii=False, indent=2)}
         """
+        if feedback:
+            # 직전 시도의 정적 검증 오류만 고치도록 요청
+            prompt += f"""
+        ### [이전 코드의 오류]
+        {format_feedback(feedback)}
+        위 오류만 수정하고 나머지 로직은 유지하세요.
+        """
         
-        time.sleep(31) # API 속도 제한 준수
-        response = self.model.generate_content(prompt)
+        # API 속도 제한은 ConfigLoader 의 공유 rate limiter 가 필요한 만큼만 대기하여 준수한다
+        response = get_caller("gemini").call(
+            lambda timeout: self.model.generate_content(prompt, request_options={"timeout": timeout}),
+            latency_key="codegen"
+        )
         execute_body_raw = response.text.replace("```python", "").replace("```", "").strip()
         
         # AI가 실수로 생성할 수 있는 불필요한 import 구문 제거
@@ -1,6 +1,6 @@
-from openai import OpenAI
 import json
 from .utils.SystemUtils import ConfigLoader
+from .utils.model_router import ModelRouter, TASK_PLAN
 
 # OpenAI 를 이용해서 도구(명세서)를 만드는 class
 
@@ -8,6 +8,7 @@ class OpenAISpecGenerator:
     """OpenAI API를 이용해 사용자 요청에 맞는 도구 명세서를 생성합니다."""
     def __init__(self):
         self.client = ConfigLoader().get_openai_client()
+        self.router = ModelRouter()
 
     def generate_spec(self, user_query: str, existing_tools: list) -> dict | None:
         prompt = f"""
@@ -23,8 +24,10 @@ class OpenAISpecGenerator:
         - 새 도구가 필요 없으면: null
         - 새 도구가 필요하면: 'name', 'description', 'parameters' (JSON Schema 형식)를 포함한 JSON 객체
         """
-        response = self.client.chat.completions.create(
-            model="gpt-4o", messages=[{"role": "user", "content": prompt}],
+        response = self.router.create(
+            self.client, TASK_PLAN,
+            validate=lambda r: isinstance(json.loads(r.choices[0].message.content), (dict, type(None))),
+            messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
         
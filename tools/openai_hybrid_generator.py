@@ -3,6 +3,8 @@
 import json, re, textwrap, ast
 from .base_generator import BaseToolGenerator, sanitize_tool_name, normalize_tool_spec
 from .utils.SystemUtils import ConfigLoader
+from .utils.model_router import ModelRouter, TASK_CODEGEN
+from .utils.code_validator import ALLOWED_IMPORTS, format_feedback
 
 def _normalize_execute_body(raw: str) -> str:
     """
@@ -36,9 +38,10 @@ class OpenAIHybridCodeGenerator(BaseToolGenerator):
 
     def __init__(self):
         self.client = ConfigLoader().get_openai_client()
-        self.model_name = "gpt-4o"
+        self.router = ModelRouter()
+        self.model_name = self.router.model_for(TASK_CODEGEN)
 
-    def _get_execute_body_from_ai(self, tool_spec: dict) -> dict:
+    def _get_execute_body_from_ai(self, tool_spec: dict, feedback: list = None) -> dict:
         print(f"  [Generator-OpenAI] '{tool_spec['name']}' 도구의 '핵심 실행 로직' 생성을 요청합니다...")
 
         simple_params_desc = []
@@ -56,15 +59,24 @@ Based on the [Tool Specification] and [Parameter List] below, write the Python c
 
 [Rules]
 1. Respond with a JSON object containing two keys: "imports_list" and "execute_body".
-2. "imports_list": A list of standard Python libraries needed for your code (e.g., ["datetime"]).
+2. "imports_list": A list of standard Python libraries needed for your code (e.g., ["datetime"]). Allowed: {", ".join(sorted(ALLOWED_IMPORTS))}.
 3. "execute_body": The raw Python code (no leading 'def' line) that should go INSIDE the execute method.
 4. Do NOT include class definitions or any import lines inside the execute_body.
 5. The logic MUST return a JSON string using `json.dumps(..., ensure_ascii=False)`.
 6. Do NOT define nested helper functions inside the body; inline simple logic.
 7. OPTIONAL numeric params can be None; coerce them to 0 before arithmetic.
 """
-        response = self.client.chat.completions.create(
-            model=self.model_name,
+        if feedback:
+            # 직전 시도의 정적 검증 오류만 고치도록 요청
+            prompt += f"""
+[Errors in Your Previous Attempt]
+{format_feedback(feedback)}
+Fix ONLY these problems and keep the rest of the logic.
+"""
+        # 본문이 비어 있거나 JSON 형식이 아니면 상위 모델로 재시도
+        response = self.router.create(
+            self.client, TASK_CODEGEN,
+            validate=lambda r: bool(json.loads(r.choices[0].message.content).get("execute_body")),
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
@@ -75,14 +87,14 @@ Based on the [Tool Specification] and [Parameter List] below, write the Python c
             payload = {"imports_list": [], "execute_body": "result={'status':'error','message':'internal logic gen failed'}\nreturn json.dumps(result, ensure_ascii=False)"}
         return payload
 
-    def generate_code(self, tool_spec: dict) -> str:
+    def generate_code(self, tool_spec: dict, feedback: list = None) -> str:
         # 스펙 정규화
         tool_spec = normalize_tool_spec(tool_spec)
         tool_name = tool_spec["name"]
         class_name = "".join(word.capitalize() for word in tool_name.split('_')) + "Tool"
 
         # AI 본문 + 정규화
-        components = self._get_execute_body_from_ai(tool_spec)
+        components = self._get_execute_body_from_ai(tool_spec, feedback)
         imports = ["import json", "from .base import ToolBase"]
         for lib in components.get("imports_list", []):
             lib = (lib or "").strip()
@@ -167,7 +179,7 @@ class {class_name}(ToolBase):
     {signature}
 {indented2}
 """
-            ast.parse(final_code)  # 실패 시 예외 전파
+            # 남은 구문 오류는 code_validator 가 구조화된 오류로 보고하고 재생성을 요청한다
 
         print(f"  [Code Builder] '{tool_name}'의 최종 코드를 성공적으로 조립했습니다.")
         print(f"  [Code Source]\n'{final_code.strip()}")
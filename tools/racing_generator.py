@@ -0,0 +1,155 @@
+# 파일명: racing_generator.py
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .base_generator import BaseToolGenerator
+from .utils.SystemUtils import ConfigLoader
+
+# 여러 코드 생성기를 동시에 실행하고, 샌드박스 테스트를 가장 먼저 통과한 결과를 사용한다.
+# 한 제공자의 지연 x 재시도 횟수만큼 기다리던 자기 개선 시간을, 가장 빠른 제공자의 시간으로 줄인다.
+# 제공자별 승률/지연을 기록해 다음 경쟁에서 유망한 제공자부터 (max_parallel 개까지) 실행한다.
+
+
+def _create_openai_hybrid():
+    from .openai_hybrid_generator import OpenAIHybridCodeGenerator
+    return OpenAIHybridCodeGenerator()
+
+
+def _create_claude():
+    from .claude_generator import ClaudeCodeGenerator
+    return ClaudeCodeGenerator()
+
+
+def _create_gemini():
+    from .gemini_generator import GeminiCodeGenerator
+    return GeminiCodeGenerator()
+
+
+# app.properties [GENERATORS] providers 에 쓰는 이름
+GENERATOR_FACTORIES = {
+    "openai_hybrid": _create_openai_hybrid,
+    "claude": _create_claude,
+    "gemini": _create_gemini,
+}
+
+
+class RacingCodeGenerator(BaseToolGenerator):
+    """설정된 BaseToolGenerator 구현들을 경쟁시키는 복합 생성기"""
+
+    # 프로세스 전체에서 공유하는 제공자별 기록 {provider: {"runs", "wins", "failures", "avg_latency"}}
+    _stats = {}
+    _stats_lock = threading.Lock()
+    # 에이전트(요청)마다 모든 제공자 클라이언트를 다시 만들지 않도록 프로세스에서 하나를 공유한다
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, providers: list = None, max_parallel: int = None):
+        config = ConfigLoader()
+        if providers is None:
+            providers = config.get_setting('GENERATORS', 'providers', env_key='CODE_GENERATORS', default='openai_hybrid').split(",")
+        if max_parallel is None:
+            max_parallel = int(config.get_setting('GENERATORS', 'max_parallel', env_key='CODE_GENERATORS_PARALLEL', default='2'))
+        self.max_parallel = max(1, max_parallel)
+
+        self.generators = {}
+        for provider in (p.strip() for p in providers):
+            if not provider:
+                continue
+            factory = GENERATOR_FACTORIES.get(provider)
+            if factory is None:
+                print(f"  [Generator-Race] 알 수 없는 생성기 '{provider}' 를 건너뜁니다.")
+                continue
+            try:
+                self.generators[provider] = factory()
+            except Exception as e:
+                # API 키가 없는 제공자 등은 경쟁에서 제외
+                print(f"  [Generator-Race] 생성기 '{provider}' 초기화 실패로 제외합니다: {e}")
+        if not self.generators:
+            raise ValueError("사용 가능한 코드 생성기가 없습니다.")
+
+    @classmethod
+    def shared(cls) -> "RacingCodeGenerator":
+        """기본 설정의 공유 인스턴스. 처음 사용할 때 만들며, 만들 수 없으면 ValueError (다음 호출에서 다시 시도)"""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def provider_stats(cls) -> dict:
+        with cls._stats_lock:
+            return {p: dict(s) for p, s in cls._stats.items()}
+
+    def _score(self, provider: str) -> float:
+        """승률(라플라스 보정) / 평균 지연. 기록이 없는 제공자는 한 번은 앞쪽에서 시도되도록 높게 둔다"""
+        stats = self._stats.get(provider)
+        if not stats or not stats["runs"]:
+            return float("inf")
+        win_rate = (stats["wins"] + 1) / (stats["runs"] + 2)
+        return win_rate / max(stats["avg_latency"], 0.1)
+
+    def ranked_providers(self) -> list:
+        with self._stats_lock:
+            # 동점이면 설정 순서 유지
+            return sorted(self.generators, key=lambda p: -self._score(p))
+
+    def _record(self, provider: str, won: bool, failed: bool, latency: float | None):
+        with self._stats_lock:
+            stats = self._stats.setdefault(provider, {"runs": 0, "wins": 0, "failures": 0, "avg_latency": 0.0})
+            stats["runs"] += 1
+            stats["wins"] += int(won)
+            stats["failures"] += int(failed)
+            if latency is not None:
+                # 완주한 경우의 지연만 이동 평균에 반영
+                stats["avg_latency"] = latency if stats["avg_latency"] == 0.0 else 0.7 * stats["avg_latency"] + 0.3 * latency
+
+    def _record_loser(self, future):
+        """승자가 정해진 뒤 끝난(또는 중단된) 생성기는 패배로만 기록한다"""
+        if not future.cancelled():
+            provider, _, _ = future.result()
+            self._record(provider, won=False, failed=False, latency=None)
+
+    def generate_code(self, tool_spec: dict, feedback: list = None) -> str:
+        # 단일 생성이 필요한 경우 현재 가장 유망한 생성기를 사용
+        return self.generators[self.ranked_providers()[0]].generate_code(tool_spec, feedback=feedback)
+
+    def _build_and_test(self, tool_spec: dict, safe_name: str, tool_directory: str = "tools", should_stop=None) -> dict | None:
+        ranked = self.ranked_providers()
+        print(f"  [Generator-Race] 생성기 경쟁 순서: {ranked} (동시 {self.max_parallel}개)")
+
+        winner = threading.Event()
+        stopped = lambda: winner.is_set() or bool(should_stop and should_stop())
+
+        def attempt(provider):
+            started = time.monotonic()
+            try:
+                result = self.generators[provider]._build_and_test(tool_spec, safe_name, tool_directory, should_stop=stopped)
+            except Exception as e:
+                print(f"  [Generator-Race] '{provider}' 생성 중 오류: {e}")
+                result = None
+            return provider, result, time.monotonic() - started
+
+        executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="codegen-race")
+        try:
+            # 순위대로 제출하므로 max_parallel 개가 먼저 실행되고, 나머지는 앞선 생성기가 실패해야 시작된다
+            futures = [executor.submit(attempt, provider) for provider in ranked]
+            finished = set()
+            for future in as_completed(futures):
+                finished.add(future)
+                provider, result, latency = future.result()
+                if result:
+                    winner.set()
+                    self._record(provider, won=True, failed=False, latency=latency)
+                    print(f"  [Generator-Race] '{provider}' 가 {latency:.1f}초 만에 테스트를 통과하여 채택되었습니다.")
+                    result["provenance"]["race"] = {"winner": provider, "candidates": ranked}
+                    # 아직 시작하지 않은 생성기는 취소하고, 실행 중인 생성기는 다음 단계 진입 전에 중단된다
+                    for other in futures:
+                        if other not in finished and not other.cancel():
+                            other.add_done_callback(self._record_loser)
+                    return result
+                self._record(provider, won=False, failed=True, latency=latency)
+            return None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,5 +1,4 @@
 from .base import ToolBase
-from .utils.hybriddb import VectorDB_hybrid
 import json
 # {"type": "function", "function": {"name": "search_knowledge_base", "description": "사용자 질문과 가장 관련된 정책 정보를 지식 베이스에서 검색합니다.", "parameters": {"type": "object", "properties": {"query": {"type": "string", "description": "사용자의 원본 질문"}}, "required": ["query"]}}},
 
@@ -18,10 +17,9 @@ class SearchKnowledgeBaseTool(ToolBase) :
     def execute(self, query: str) -> str :
         print(f"RAG : {self.rag_system}")
 
-        if(isinstance(self.rag_system.db, VectorDB_hybrid)) :
-            results = self.rag_system.db.hybrid_search(query, k=1)
-        else :
-            results = self.rag_system.db.search(query, k=1)
+        # 모든 VectorDB 가 search(query, k) 를 제공한다 (hybrid 는 의미+키워드 점수 합산)
+        # DB 클래스를 import 해서 isinstance 로 나누면 도구 로드만으로 torch/faiss 를 끌어오게 된다
+        results = self.rag_system.db.search(query, k=1)
 
         if not results: return "관련 정보를 찾지 못했습니다."
         score, doc_id = results[0]
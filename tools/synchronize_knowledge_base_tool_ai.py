@@ -3,6 +3,7 @@
 import json  # <-- [해결 방안] 누락된 json 라이브러리 import 추가
 from .base import ToolBase
 from openai import OpenAI
+from .utils.model_router import ModelRouter, TASK_PLAN
 
 
 class SynchronizeKnowledgeBaseTool_AI(ToolBase):
@@ -47,8 +48,10 @@ class SynchronizeKnowledgeBaseTool_AI(ToolBase):
         위 규칙에 따라 'add' 해야 할 'policy_id' 목록을 JSON 형식으로만 응답하세요.
         """
         
-        response = self.client.chat.completions.create(
-            model="gpt-4o", messages=[{"role": "user", "content": prompt}],
+        response = ModelRouter().create(
+            self.client, TASK_PLAN,
+            validate=lambda r: isinstance(json.loads(r.choices[0].message.content), dict),
+            messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
         sync_plan = json.loads(response.choices[0].message.content)
@@ -1,6 +1,7 @@
 import json
 import sys, os
 import subprocess
+from tools.utils.model_router import ModelRouter, TASK_CODEGEN
 # --- 3. 도구 생성 파이프라인 (tool_generator.py) ---
 
 from tools.utils.log_util import LoggingMixin
@@ -103,8 +104,8 @@ class ToolGenerationPipeline(LoggingMixin):
         ```
         """
         
-        response = self.client.chat.completions.create(
-            model="gpt-4o", messages=[{"role": "user", "content": prompt}], temperature=0.0
+        response = ModelRouter().create(
+            self.client, TASK_CODEGEN, messages=[{"role": "user", "content": prompt}], temperature=0.0
         )
         return response.choices[0].message.content.replace("```python", "").replace("```", "").strip()
 
@@ -1,8 +1,12 @@
 import os
+import json
+import hashlib
 import importlib
 import inspect
 from tools.utils.SystemUtils import ConfigLoader
 from tools.base import ToolBase
+from tools.utils.isolated_tool import IsolatedTool, is_generated_tool_file
+from tools.utils.arg_validator import ArgumentValidator, public_schema
 
 class ToolLoader:
     def __init__(self, rag_system, user_database, tool_directory: str = "tools"):
@@ -11,7 +15,34 @@ class ToolLoader:
             "rag_system": rag_system,
             "user_database": user_database
         }
+        # 생성된 도구(표식이 있는 파일)를 import 하지 않고 샌드박스 worker 에서 실행할지 여부
+        self.isolate_generated = ConfigLoader().get_setting(
+            'TOOL_RUNNER', 'isolate_generated', env_key='TOOL_ISOLATE_GENERATED', default='true'
+        ).strip().lower() in ("1", "true", "yes", "on")
         self.tools = self._load_tools(tool_directory)
+        # 이름순으로 정렬하여 프로세스마다 도구 순서가 달라지지 않도록 한다 (프롬프트 캐싱용)
+        self.tools.sort(key=lambda tool: tool.name)
+        self.registry_version = self._compute_registry_version(self.tools)
+        # 도구별 인자 검증기는 로드 시 한 번만 만든다
+        self.validators = {
+            tool.name: ArgumentValidator(tool.name, tool.parameters, getattr(tool, "context_params", ()))
+            for tool in self.tools
+        }
+
+    @staticmethod
+    def tool_schema(tool) -> dict:
+        """LLM 에 전달할 도구 명세 (키 순서까지 고정된 형태)"""
+        schema = {"type": "function", "function": {
+            "name": tool.name, "description": tool.description,
+            "parameters": public_schema(tool.parameters, getattr(tool, "context_params", ()))
+        }}
+        return json.loads(json.dumps(schema, ensure_ascii=False, sort_keys=True))
+
+    @classmethod
+    def _compute_registry_version(cls, tools) -> str:
+        """도구 명세 전체의 해시. 도구가 추가/변경될 때만 값이 바뀐다"""
+        canonical = json.dumps([cls.tool_schema(tool) for tool in tools], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
 
     def _load_tools(self, tool_directory):
         loaded_tools = []
@@ -22,9 +53,21 @@ class ToolLoader:
 
         print(f"[ToolLoader] '{tool_directory}' 디렉토리에서 도구를 검색합니다...")
 
-        for filename in os.listdir(tool_directory):
+        # os.listdir 순서는 파일시스템마다 다르므로 정렬해서 순회한다
+        for filename in sorted(os.listdir(tool_directory)):
             if filename.endswith("_tool.py"):
                 module_name = f"{tool_directory}.{filename[:-3]}"
+                file_path = os.path.join(tool_directory, filename)
+
+                if self.isolate_generated and is_generated_tool_file(file_path):
+                    proxy = IsolatedTool.from_file(file_path)
+                    if proxy is not None:
+                        loaded_tools.append(proxy)
+                        print(f"    - 생성 도구 등록 완료 (격리 실행): {proxy.name}")
+                        continue
+                    # 생성 도구는 격리 실행이 전제이므로, 정보를 읽을 수 없으면 프로세스 안에서 import 하지 않고 건너뛴다
+                    print(f"[ToolLoader Warning] '{filename}' 의 도구 정보를 읽을 수 없어 로드하지 않습니다.")
+                    continue
 
                 try:
                     module = importlib.import_module(module_name)
@@ -1,9 +1,14 @@
 import re
 import os
 import configparser
-from openai import OpenAI
-import google.generativeai as genai
-import anthropic
+from typing import TYPE_CHECKING
+from .rate_limiter import TokenBucketLimiter, RateLimitedOpenAI, RateLimitedAnthropic, RateLimitedGeminiModel
+
+# 제공자 SDK(openai, google.generativeai, anthropic)는 import 만으로 수백 ms 가 걸리므로
+# ConfigLoader 만 필요한 곳(샌드박스 worker, 도구 모듈 등)이 비용을 치르지 않도록 클라이언트 생성 시점에 import 한다
+if TYPE_CHECKING:
+    from openai import OpenAI
+    import anthropic
 
 # 기본적인 Privacy 를 처리하기 위한 간단Util
 class PrivacyUtils:
@@ -66,28 +71,60 @@ class ConfigLoader:
         except (configparser.NoSectionError, configparser.NoOptionError, ValueError) as e:
             raise ValueError(f"[ConfigLoader] 'API.{key_name}' 로드 중 오류: {e}") from e
 
-    def get_openai_client(self) -> OpenAI:
+    def get_setting(self, section: str, key: str, env_key: str = None, default: str = None) -> str:
+        """
+        일반 설정값 조회. 환경 변수(env_key) > properties 파일([section] key) > default 순으로 확인한다.
+        """
+        if env_key and os.environ.get(env_key):
+            return os.environ[env_key]
+        value = self.config.get(section, key, fallback=None)
+        if value is None or not value.strip():
+            return default
+        return value.strip()
+
+    def get_rate_limiter(self) -> TokenBucketLimiter:
+        """
+        모든 제공자 client 가 공유하는 rate limiter.
+        [RATE_LIMITS] 섹션에 'provider.model = rpm, tpm' 형식으로 한도를 지정하고,
+        RATE_LIMIT_STATE_FILE 을 지정하면 여러 프로세스가 같은 버킷을 공유한다.
+        """
+        if getattr(self, "_rate_limiter", None) is None:
+            limits = {}
+            if self.config.has_section('RATE_LIMITS'):
+                for key, value in self.config.items('RATE_LIMITS'):
+                    rpm, tpm = (int(v.strip()) for v in value.split(","))
+                    limits[key] = (rpm, tpm)
+            state_file = os.environ.get('RATE_LIMIT_STATE_FILE')
+            self._rate_limiter = TokenBucketLimiter(limits=limits, state_file=state_file)
+        return self._rate_limiter
+
+    def get_openai_client(self) -> "OpenAI":
         """OpenAI 클라이언트 생성"""
+        from openai import OpenAI
         # api_key = self.get_api_key('openai.api.key')
         api_key = self._get_priority_key('OPENAI_API_KEY', 'openai.api.key')
 
-        return OpenAI(api_key=api_key)
+        # 재시도는 resilience 계층에서 일괄 관리하므로 SDK 자체 재시도는 끈다
+        return RateLimitedOpenAI(OpenAI(api_key=api_key, max_retries=0), self.get_rate_limiter())
 
     def get_gemini_model(self):
         """Gemini 모델 객체 생성"""
+        import google.generativeai as genai
         # api_key = self.get_api_key('gemini.api.key')
         api_key = self._get_priority_key('GEMINI_API_KEY', 'gemini.api.key')
 
         genai.configure(api_key=api_key)
-        return genai.GenerativeModel('gemini-2.5-flash')
+        model_name = 'gemini-2.5-flash'
+        return RateLimitedGeminiModel(genai.GenerativeModel(model_name), model_name, self.get_rate_limiter())
     
-    def get_claude_client(self) -> anthropic.Anthropic:
+    def get_claude_client(self) -> "anthropic.Anthropic":
         """Anthropic 클라이언트 객체를 생성하여 반환합니다."""
+        import anthropic
         try:
             # api_key = self.get_api_key('claude.api.key')
             api_key = self._get_priority_key('CLAUDE_API_KEY', 'claude.api.key')
 
-            return anthropic.Anthropic(api_key=api_key)
+            return RateLimitedAnthropic(anthropic.Anthropic(api_key=api_key, max_retries=0), self.get_rate_limiter())
         except ValueError as e:
             raise e
 
@@ -0,0 +1,139 @@
+import time
+import asyncio
+from contextlib import asynccontextmanager
+
+# /run-agent 입장 제어(admission control)와 부하 차단(load shedding)
+# 동시 실행 수를 전체/API 키별/사용자별로 제한하고, 초과 요청은 길이가 제한된 대기열에서 deadline 까지만 기다린다.
+# 대기열이 가득 찼거나 deadline 안에 자리가 나지 않으면 Retry-After 와 함께 바로 거절한다.
+# (모든 요청이 한꺼번에 시작해 LLM rate limit 을 같이 소진하고 같이 늦게 끝나는 상황을 막는다)
+
+
+class AdmissionRejected(Exception):
+    """입장 거절. status_code 는 429(키/사용자 한도 초과) 또는 503(서버 전체 용량 초과)"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    asyncio 이벤트 루프 위에서 동작하는 입장 제어기.
+    사용법: async with controller.admit(api_key, user_id): ...
+    """
+
+    def __init__(self, max_concurrent: int = 8, per_key_limit: int = 4, per_user_limit: int = 1,
+                 max_waiting: int = 32, wait_timeout: float = 10.0):
+        self.max_concurrent = max_concurrent
+        self.per_key_limit = per_key_limit
+        self.per_user_limit = per_user_limit
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+
+        self._condition = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._by_key = {}
+        self._by_user = {}
+        self._avg_run_seconds = None # 실행 시간 이동 평균 (Retry-After 추정용)
+        self.counters = {"admitted": 0, "rejected_429": 0, "rejected_503": 0, "completed": 0}
+
+    def _cond(self) -> asyncio.Condition:
+        # 이벤트 루프가 뜬 뒤 처음 사용할 때 생성한다
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _blocker(self, api_key: str, user_id: str) -> str | None:
+        """지금 입장할 수 없는 이유 ('global', 'key', 'user'). 입장 가능하면 None"""
+        if self._by_user.get(user_id, 0) >= self.per_user_limit:
+            return "user"
+        if self._by_key.get(api_key, 0) >= self.per_key_limit:
+            return "key"
+        if self._in_flight >= self.max_concurrent:
+            return "global"
+        return None
+
+    def _retry_after(self) -> int:
+        """대기열 길이와 평균 실행 시간으로 다시 시도할 시점을 추정"""
+        avg = self._avg_run_seconds or self.wait_timeout
+        rounds = (self._waiting // max(self.max_concurrent, 1)) + 1
+        return max(1, int(avg * rounds))
+
+    def _reject(self, blocker: str) -> AdmissionRejected:
+        status_code = 503 if blocker in ("global", "queue") else 429
+        self.counters[f"rejected_{status_code}"] += 1
+        reasons = {
+            "queue": "대기 중인 요청이 너무 많습니다.",
+            "global": "서버가 처리할 수 있는 동시 실행 수를 초과했습니다.",
+            "key": "API 키의 동시 실행 한도를 초과했습니다.",
+            "user": "사용자의 동시 실행 한도를 초과했습니다.",
+        }
+        print(f"   [Admission] 요청 거절 ({blocker}): in_flight={self._in_flight}, waiting={self._waiting}")
+        return AdmissionRejected(status_code, reasons[blocker], self._retry_after())
+
+    @asynccontextmanager
+    async def admit(self, api_key: str, user_id: str):
+        cond = self._cond()
+        async with cond:
+            blocker = self._blocker(api_key, user_id)
+            if blocker is not None:
+                if self._waiting >= self.max_waiting:
+                    raise self._reject("queue")
+                self._waiting += 1
+                deadline = time.monotonic() + self.wait_timeout
+                try:
+                    while blocker is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise self._reject(blocker)
+                        try:
+                            await asyncio.wait_for(cond.wait(), timeout=remaining)
+                        except asyncio.TimeoutError:
+                            pass
+                        blocker = self._blocker(api_key, user_id)
+                finally:
+                    self._waiting -= 1
+
+            self._in_flight += 1
+            self._by_key[api_key] = self._by_key.get(api_key, 0) + 1
+            self._by_user[user_id] = self._by_user.get(user_id, 0) + 1
+            self.counters["admitted"] += 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            async with cond:
+                self._in_flight -= 1
+                self._release(self._by_key, api_key)
+                self._release(self._by_user, user_id)
+                self.counters["completed"] += 1
+                self._avg_run_seconds = elapsed if self._avg_run_seconds is None else 0.8 * self._avg_run_seconds + 0.2 * elapsed
+                cond.notify_all()
+
+    @staticmethod
+    def _release(counts: dict, key: str):
+        counts[key] -= 1
+        if counts[key] <= 0:
+            del counts[key]
+
+    def metrics(self) -> dict:
+        return {
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "per_key_limit": self.per_key_limit,
+                "per_user_limit": self.per_user_limit,
+                "max_waiting": self.max_waiting,
+                "wait_timeout": self.wait_timeout,
+            },
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "active_keys": len(self._by_key),
+            "active_users": len(self._by_user),
+            "avg_run_seconds": round(self._avg_run_seconds, 3) if self._avg_run_seconds is not None else None,
+            **self.counters,
+        }
@@ -0,0 +1,207 @@
+import json
+
+# 도구 호출 인자 검증기
+# LLM 이 만든 arguments 를 그대로 execute(**args) 에 넘기면 누락/타입 오류가 예외로 터지거나
+# 도구가 엉뚱한 결과를 돌려주어 LLM 턴을 낭비한다.
+#  - 도구 등록 시 parameters(JSON Schema) 를 한 번만 해석해 속성별 검사 함수로 만들어 둔다
+#  - 호출마다 타입 강제 변환("3" → 3, "true" → True 등) 후 검증하고, 실패하면 구조화된 오류 목록을 돌려준다
+#  - 도구가 context_params 로 선언한 값(예: user)은 LLM 이 아니라 에이전트 컨텍스트에서 채운다
+# 오류 형식: {"code": 오류 종류, "param": 인자 이름, "message": 설명}
+
+_TRUE = {"true", "1", "yes", "y"}
+_FALSE = {"false", "0", "no", "n"}
+
+
+class _Invalid(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _error(code: str, param: str, message: str) -> dict:
+    return {"code": code, "param": param, "message": message}
+
+
+def _parse_json_text(value, expected_type):
+    """문자열로 감싸진 JSON 배열/객체를 풀어준다"""
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except json.JSONDecodeError:
+            return value
+        if isinstance(parsed, expected_type):
+            return parsed
+    return value
+
+
+def _compile_property(schema: dict):
+    """속성 스키마 하나를 (값 → 변환된 값) 함수로 만든다. 실패 시 _Invalid"""
+    schema = schema or {}
+    kind = schema.get("type")
+    enum = schema.get("enum")
+
+    if kind == "string":
+        def convert(value):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return str(value)
+            if not isinstance(value, str):
+                raise _Invalid("type_mismatch", f"문자열이어야 합니다. (받은 값: {value!r})")
+            return value
+    elif kind == "integer":
+        def convert(value):
+            if isinstance(value, bool):
+                raise _Invalid("type_mismatch", f"정수여야 합니다. (받은 값: {value!r})")
+            if isinstance(value, int):
+                return value
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            if isinstance(value, str):
+                try:
+                    return int(value.strip())
+                except ValueError:
+                    pass
+            raise _Invalid("type_mismatch", f"정수여야 합니다. (받은 값: {value!r})")
+    elif kind == "number":
+        def convert(value):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value
+            if isinstance(value, str):
+                try:
+                    return float(value.strip())
+                except ValueError:
+                    pass
+            raise _Invalid("type_mismatch", f"숫자여야 합니다. (받은 값: {value!r})")
+    elif kind == "boolean":
+        def convert(value):
+            if isinstance(value, bool):
+                return value
+            text = str(value).strip().lower()
+            if text in _TRUE:
+                return True
+            if text in _FALSE:
+                return False
+            raise _Invalid("type_mismatch", f"true/false 여야 합니다. (받은 값: {value!r})")
+    elif kind == "array":
+        item = _compile_property(schema.get("items")) if schema.get("items") else None
+
+        def convert(value):
+            value = _parse_json_text(value, list)
+            if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                value = [value] # 항목 하나만 보낸 경우
+            if not isinstance(value, list):
+                raise _Invalid("type_mismatch", f"배열이어야 합니다. (받은 값: {value!r})")
+            if item is None:
+                return value
+            converted = []
+            for index, element in enumerate(value):
+                try:
+                    converted.append(item(element))
+                except _Invalid as e:
+                    raise _Invalid(e.code, f"[{index}] 번째 항목: {e.message}")
+            return converted
+    elif kind == "object":
+        def convert(value):
+            value = _parse_json_text(value, dict)
+            if not isinstance(value, dict):
+                raise _Invalid("type_mismatch", f"객체여야 합니다. (받은 값: {value!r})")
+            return value
+    else:
+        def convert(value):
+            return value
+
+    if not enum:
+        return convert
+
+    def convert_enum(value):
+        value = convert(value)
+        if value not in enum:
+            raise _Invalid("enum_mismatch", f"{enum} 중 하나여야 합니다. (받은 값: {value!r})")
+        return value
+    return convert_enum
+
+
+def public_schema(parameters: dict, context_params=()) -> dict:
+    """LLM 에 보여줄 parameters. 컨텍스트에서 주입하는 인자는 제외한다"""
+    if not context_params:
+        return parameters
+    parameters = dict(parameters or {})
+    parameters["properties"] = {k: v for k, v in (parameters.get("properties") or {}).items() if k not in context_params}
+    if "required" in parameters:
+        parameters["required"] = [k for k in parameters["required"] if k not in context_params]
+    return parameters
+
+
+class ArgumentValidator:
+    """parameters 스키마를 한 번 컴파일해 두고 호출마다 인자를 검증/변환한다"""
+
+    def __init__(self, tool_name: str, parameters: dict, context_params=()):
+        parameters = parameters or {}
+        self.tool_name = tool_name
+        self.context_params = tuple(context_params or ())
+        properties = parameters.get("properties") or {}
+        self.required = tuple(k for k in parameters.get("required") or [] if k not in self.context_params)
+        self.converters = {k: _compile_property(v) for k, v in properties.items() if k not in self.context_params}
+        # 스키마에 properties 가 없으면 받은 인자를 그대로 넘긴다
+        self.pass_unknown = not properties
+
+    def validate(self, arguments, context: dict = None) -> tuple:
+        """(execute 에 넘길 kwargs, 오류 목록). 오류가 있으면 kwargs 는 사용하지 않는다"""
+        errors = []
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments or "{}")
+            except json.JSONDecodeError as e:
+                return {}, [_error("invalid_json", None, f"arguments 가 올바른 JSON 이 아닙니다: {e.msg}")]
+        if arguments is None:
+            arguments = {}
+        if not isinstance(arguments, dict):
+            return {}, [_error("invalid_json", None, "arguments 는 JSON 객체여야 합니다.")]
+
+        kwargs = {}
+        for name, value in arguments.items():
+            convert = self.converters.get(name)
+            if convert is None:
+                if self.pass_unknown and name not in self.context_params:
+                    kwargs[name] = value
+                continue # 스키마에 없는 인자는 버린다 (execute 의 TypeError 방지)
+            if value is None:
+                continue
+            try:
+                kwargs[name] = convert(value)
+            except _Invalid as e:
+                errors.append(_error(e.code, name, e.message))
+
+        for name in self.required:
+            if name not in kwargs and not any(e["param"] == name for e in errors):
+                errors.append(_error("missing_argument", name, "필수 인자가 없습니다."))
+
+        context = context or {}
+        for name in self.context_params:
+            if context.get(name) is None:
+                errors.append(_error("missing_context", name, "에이전트 컨텍스트에 값이 없습니다."))
+            else:
+                kwargs[name] = context[name]
+        return kwargs, errors
+
+    def error_result(self, errors: list) -> str:
+        """같은 단계에서 LLM 에 돌려줄 tool 메시지 내용"""
+        return json.dumps({
+            "status": "error",
+            "error": "invalid_arguments",
+            "tool": self.tool_name,
+            "errors": errors,
+            "message": "인자를 수정하여 다시 호출하세요.",
+        }, ensure_ascii=False)
+
+
+def unknown_tool_result(tool_name: str, available_tools=()) -> str:
+    """등록되지 않은 도구를 호출했을 때 LLM 에 돌려줄 tool 메시지 내용 (error_result 와 같은 형식)"""
+    return json.dumps({
+        "status": "error",
+        "error": "unknown_tool",
+        "tool": tool_name,
+        "errors": [_error("unknown_tool", None, f"'{tool_name}' 은(는) 등록된 도구가 아닙니다.")],
+        "available_tools": sorted(available_tools),
+        "message": "등록된 도구 중 하나를 다시 호출하세요.",
+    }, ensure_ascii=False)
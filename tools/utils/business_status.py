@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from .nts_client import normalize_business_id
+
+# 사업자 상태 사전검증 결과 저장소
+# 배치 작업(ai_linker_batch_verify.py)이 결과를 기록하고,
+# 에이전트 실행 중에는 유효기간 내의 결과라면 국세청 API 호출을 생략한다
+# 전체 사용자의 결과를 담으므로 JSON 파일 대신 business_id 로 색인된 SQLite(WAL) 에 저장한다.
+#  - 조회는 필요한 사업자번호 한 건만 읽는다 (요청마다 파일 전체를 다시 파싱하지 않음)
+#  - 실시간 조회 결과는 해당 행만 갱신하며, 여러 프로세스가 동시에 써도 안전하다
+
+DEFAULT_STATUS_FILE = "business_status.db"
+LEGACY_STATUS_FILE = "business_status.json" # 이전 버전의 JSON 저장 파일 (DB 가 비어 있으면 한 번 가져온다)
+DEFAULT_TTL_SECONDS = 24 * 60 * 60 # 사전검증 결과는 하루 동안 유효한 것으로 본다
+
+
+class BusinessStatusStore:
+    def __init__(self, filepath: str = DEFAULT_STATUS_FILE, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.filepath = filepath
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local() # sqlite3 연결은 스레드 간 공유하지 않는다
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS business_status (
+                    b_no       TEXT PRIMARY KEY,
+                    status     TEXT NOT NULL,
+                    checked_at REAL NOT NULL
+                )
+            """)
+        self._import_legacy_json()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.filepath, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _import_legacy_json(self):
+        """기존 business_status.json 의 결과를 비어 있는 DB 에 한 번 옮긴다"""
+        legacy_path = os.path.join(os.path.dirname(self.filepath), LEGACY_STATUS_FILE)
+        conn = self._connect()
+        if not os.path.exists(legacy_path) or conn.execute("SELECT 1 FROM business_status LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[BusinessStatusStore Warning] '{legacy_path}' 로드 실패: {e}")
+            return
+        for b_no, record in records.items():
+            self.put_many({b_no: record["status"]}, checked_at=record.get("checked_at"))
+        print(f"[BusinessStatusStore] '{legacy_path}' 의 사전검증 결과 {len(records)}건을 가져왔습니다.")
+
+    def get_fresh(self, business_id: str) -> dict | None:
+        """유효기간(ttl) 내에 검증된 결과가 있으면 반환하고, 없거나 만료되었으면 None"""
+        row = self._connect().execute(
+            "SELECT status, checked_at FROM business_status WHERE b_no = ?", (normalize_business_id(business_id),)
+        ).fetchone()
+        if not row:
+            return None
+        status, checked_at = row
+        if time.time() - checked_at > self.ttl_seconds:
+            return None
+        return {"status": json.loads(status), "checked_at": checked_at}
+
+    def put_many(self, statuses: dict, checked_at: float = None):
+        """{b_no: 국세청 조회 결과} 를 조회 시각과 함께 저장한다 (해당 행만 갱신)"""
+        checked_at = checked_at or time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO business_status (b_no, status, checked_at) VALUES (?, ?, ?)",
+                [(normalize_business_id(b_no), json.dumps(status, ensure_ascii=False), checked_at)
+                 for b_no, status in statuses.items()]
+            )
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def shared_status_store() -> BusinessStatusStore:
+    """요청마다 저장소를 새로 만들지 않도록 프로세스 전체에서 하나의 기본 저장소를 공유한다"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = BusinessStatusStore()
+    return _shared_store
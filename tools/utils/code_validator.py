@@ -0,0 +1,220 @@
+import ast
+import json
+
+# 생성된 도구 코드의 정적 사전 검증 (AST)
+# 샌드박스 실행 전에 구조적인 문제를 마이크로초 단위로 걸러내고,
+# 생성기가 해당 부분만 고쳐 다시 생성할 수 있도록 구조화된 오류 목록을 돌려준다.
+# 오류 형식: {"code": 오류 종류, "message": 설명, "line": 줄 번호(없으면 None)}
+
+# 생성 코드에서 허용하는 import (표준 라이브러리 중 부작용이 없는 모듈)
+ALLOWED_IMPORTS = frozenset({
+    "json", "re", "math", "random", "datetime", "time", "uuid", "hashlib", "string",
+    "collections", "itertools", "functools", "decimal", "statistics", "typing",
+    "textwrap", "base64", "calendar", "copy", "dataclasses", "enum", "operator",
+})
+# ToolBase 가져오기용 import
+_TOOLBASE_MODULES = ("tools.base", "base")
+# execute 안에서 호출을 금지하는 내장 함수
+FORBIDDEN_CALLS = frozenset({"eval", "exec", "compile", "open", "__import__", "input", "breakpoint"})
+# execute 인자 타입 힌트로 허용하는 이름
+ALLOWED_ANNOTATIONS = frozenset({"str", "int", "float", "bool", "list", "dict", "Any", "Optional", "List", "Dict", "None"})
+
+
+def _error(code: str, message: str, node=None) -> dict:
+    return {"code": code, "message": message, "line": getattr(node, "lineno", None)}
+
+
+def _is_toolbase(base) -> bool:
+    return (isinstance(base, ast.Name) and base.id == "ToolBase") or \
+           (isinstance(base, ast.Attribute) and base.attr == "ToolBase")
+
+
+def _is_json_dumps(node) -> bool:
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and \
+           node.func.attr == "dumps" and isinstance(node.func.value, ast.Name) and node.func.value.id == "json"
+
+
+def _literal(node, source: str):
+    """클래스 속성 값을 Python literal 또는 JSON 으로 해석 (생성기가 json.dumps 로 넣는 경우 대비)"""
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, SyntaxError, TypeError):
+        pass
+    try:
+        return json.loads(ast.get_source_segment(source, node) or "")
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def _own_nodes(func: ast.FunctionDef):
+    """중첩 함수/람다/클래스 내부를 제외한 execute 본문의 노드"""
+    stack = list(func.body)
+    while stack:
+        node = stack.pop()
+        yield node
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+                stack.append(child)
+
+
+def _check_imports(tree: ast.Module, allowed: frozenset) -> list:
+    errors = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            if module in _TOOLBASE_MODULES and [a.name for a in node.names] == ["ToolBase"]:
+                continue
+            modules = [("." * node.level) + module]
+        else:
+            continue
+        for module in modules:
+            if module.split(".")[0] not in allowed:
+                errors.append(_error("disallowed_import", f"'{module}' 은(는) 허용되지 않는 import 입니다. 허용 모듈: {', '.join(sorted(allowed))}", node))
+    return errors
+
+
+def _check_class_attributes(cls: ast.ClassDef, tool_spec: dict, source: str) -> list:
+    errors = []
+    attrs = {}
+    for node in cls.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            attrs[node.targets[0].id] = node
+
+    for attr in ("name", "description", "parameters"):
+        if attr not in attrs:
+            errors.append(_error("missing_attribute", f"클래스 속성 '{attr}' 이(가) 클래스 레벨에 정의되어 있지 않습니다.", cls))
+
+    if "name" in attrs:
+        value = _literal(attrs["name"].value, source)
+        if value != tool_spec.get("name"):
+            errors.append(_error("name_mismatch", f"name 은 '{tool_spec.get('name')}' 이어야 합니다. (현재: {value!r})", attrs["name"]))
+
+    if "parameters" in attrs:
+        value = _literal(attrs["parameters"].value, source)
+        expected = tool_spec.get("parameters") or {}
+        if not isinstance(value, dict):
+            errors.append(_error("parameters_mismatch", "parameters 는 JSON Schema dict literal 이어야 합니다.", attrs["parameters"]))
+        else:
+            got_props = set((value.get("properties") or {}).keys())
+            want_props = set((expected.get("properties") or {}).keys())
+            if got_props != want_props:
+                errors.append(_error("parameters_mismatch", f"parameters.properties 는 {sorted(want_props)} 이어야 합니다. (현재: {sorted(got_props)})", attrs["parameters"]))
+            if set(value.get("required") or []) != set(expected.get("required") or []):
+                errors.append(_error("parameters_mismatch", f"parameters.required 는 {sorted(expected.get('required') or [])} 이어야 합니다.", attrs["parameters"]))
+    return errors
+
+
+def _check_execute(func: ast.FunctionDef, tool_spec: dict) -> list:
+    errors = []
+    params = tool_spec.get("parameters") or {}
+    props = set((params.get("properties") or {}).keys())
+
+    args = func.args
+    positional = args.posonlyargs + args.args
+    if not positional or positional[0].arg != "self":
+        errors.append(_error("signature_mismatch", "execute 의 첫 번째 인자는 self 여야 합니다.", func))
+    named = positional[1:] + args.kwonlyargs
+    names = {a.arg for a in named}
+
+    missing = sorted(props - names) if args.kwarg is None else []
+    if missing:
+        errors.append(_error("signature_mismatch", f"execute 가 파라미터 {missing} 을(를) 받지 않습니다.", func))
+
+    # 스펙에 없는데 기본값이 없는 인자는 호출 시 TypeError 가 된다
+    defaults_start = len(positional) - len(args.defaults)
+    no_default = {a.arg for i, a in enumerate(positional) if i >= 1 and i < defaults_start}
+    no_default |= {a.arg for a, d in zip(args.kwonlyargs, args.kw_defaults) if d is None}
+    extra = sorted(no_default - props)
+    if extra:
+        errors.append(_error("signature_mismatch", f"execute 에 스펙에 없는 필수 인자 {extra} 가 있습니다.", func))
+
+    for a in named:
+        annotation = a.annotation
+        if isinstance(annotation, ast.Name) and annotation.id not in ALLOWED_ANNOTATIONS:
+            errors.append(_error("invalid_annotation", f"인자 '{a.arg}' 의 타입 힌트 '{annotation.id}' 는 파이썬 타입이 아닙니다. (str, int, float, bool, list, dict 사용)", func))
+
+    # 반환값: json.dumps(...) 이거나 json.dumps 결과만 대입된 변수
+    dumps_vars, other_vars = set(), set()
+    returns = []
+    for node in _own_nodes(func):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    (dumps_vars if _is_json_dumps(node.value) else other_vars).add(target.id)
+        elif isinstance(node, ast.Return):
+            returns.append(node)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FORBIDDEN_CALLS:
+            errors.append(_error("forbidden_call", f"execute 안에서 '{node.func.id}()' 를 호출할 수 없습니다.", node))
+
+    if not returns:
+        errors.append(_error("missing_return", "execute 는 json.dumps(...) 결과를 return 해야 합니다.", func))
+    for node in returns:
+        value = node.value
+        if _is_json_dumps(value):
+            continue
+        if isinstance(value, ast.Name) and value.id in dumps_vars and value.id not in other_vars:
+            continue
+        errors.append(_error("non_json_return", "return 값은 json.dumps(..., ensure_ascii=False) 로 만든 문자열이어야 합니다.", node))
+    return errors
+
+
+def validate_tool_code(code: str, tool_spec: dict, allowed_imports: frozenset = ALLOWED_IMPORTS) -> list:
+    """생성된 도구 코드를 정적으로 검사하고 오류 목록을 반환 (비어 있으면 통과)"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return [{"code": "syntax_error", "message": f"구문 오류: {e.msg}", "line": e.lineno}]
+
+    errors = _check_imports(tree, allowed_imports)
+
+    classes = [n for n in tree.body if isinstance(n, ast.ClassDef) and any(_is_toolbase(b) for b in n.bases)]
+    if not classes:
+        errors.append(_error("missing_tool_class", "ToolBase 를 상속한 클래스가 없습니다."))
+        return errors
+    if len(classes) > 1:
+        errors.append(_error("multiple_tool_classes", "ToolBase 를 상속한 클래스는 하나만 정의해야 합니다.", classes[1]))
+    cls = classes[0]
+
+    errors.extend(_check_class_attributes(cls, tool_spec, code))
+
+    execute = next((n for n in cls.body if isinstance(n, ast.FunctionDef) and n.name == "execute"), None)
+    if execute is None:
+        errors.append(_error("missing_execute", "execute 메소드가 없습니다.", cls))
+    else:
+        errors.extend(_check_execute(execute, tool_spec))
+    return errors
+
+
+def extract_tool_metadata(code: str) -> dict | None:
+    """
+    모듈을 import 하지 않고 도구 클래스의 name/description/parameters 를 읽는다.
+    셋 중 하나라도 literal 로 해석되지 않으면 None
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    cls = next((n for n in tree.body if isinstance(n, ast.ClassDef) and any(_is_toolbase(b) for b in n.bases)), None)
+    if cls is None:
+        return None
+    meta = {}
+    for node in cls.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            if node.targets[0].id in ("name", "description", "parameters"):
+                meta[node.targets[0].id] = _literal(node.value, code)
+    if not isinstance(meta.get("name"), str) or not isinstance(meta.get("description"), str) \
+            or not isinstance(meta.get("parameters"), dict):
+        return None
+    meta["class_name"] = cls.name
+    return meta
+
+
+def format_feedback(errors: list) -> str:
+    """생성기 프롬프트에 붙일 오류 요약"""
+    lines = []
+    for e in errors:
+        where = f" (line {e['line']})" if e.get("line") else ""
+        lines.append(f"- [{e['code']}]{where} {e['message']}")
+    return "\n".join(lines)
@@ -0,0 +1,103 @@
+import re
+import json
+
+# 에이전트 메시지 목록의 토큰 예산 관리
+# 매 단계마다 전체 messages 를 다시 보내므로, 도구 원문 출력(정책 content, JSON payload)이 쌓이면
+# 프롬프트 토큰이 단계 수의 제곱으로 늘어난다.
+# 예산을 넘으면 오래된 도구 출력부터 핵심 사실(doc_token, id, 상태 등)만 남긴 요약으로 바꾼다.
+
+# 요약 시 남겨둘 필드 (이후 단계의 도구 호출에 필요한 값들)
+FACT_KEYS = (
+    "status", "is_valid", "all_valid", "message",
+    "doc_token", "doc_tokens", "doc_name", "issue_date",
+    "business_id", "taxpayer_status",
+    "application_id", "submission_status",
+    "required_docs", "destination", "policy_code", "source",
+)
+COMPACTED_PREFIX = "[요약된 도구 결과] "
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def count_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 근사치: 한글은 글자당 1토큰, 그 외는 4글자당 1토큰"""
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul) // 4 + 1
+
+
+def _message_text(message) -> str:
+    if hasattr(message, "model_dump"):
+        message = message.model_dump(exclude_none=True)
+    if isinstance(message, dict):
+        return json.dumps(message, ensure_ascii=False, default=str)
+    return str(message)
+
+
+def extract_facts(payload, max_message_chars: int = 120):
+    """JSON 도구 출력에서 FACT_KEYS 만 재귀적으로 추려낸다"""
+    if isinstance(payload, dict):
+        facts = {}
+        for key, value in payload.items():
+            if key in FACT_KEYS:
+                if isinstance(value, str) and len(value) > max_message_chars:
+                    value = value[:max_message_chars] + "..."
+                facts[key] = value
+            elif isinstance(value, (dict, list)):
+                nested = extract_facts(value, max_message_chars)
+                if nested:
+                    facts[key] = nested
+        return facts
+    if isinstance(payload, list):
+        items = [extract_facts(item, max_message_chars) if isinstance(item, (dict, list)) else item for item in payload]
+        return [item for item in items if item not in ({}, [])]
+    return payload
+
+
+class ContextManager:
+    def __init__(self, token_budget: int = 8000, keep_recent_tool_outputs: int = 1, max_plain_chars: int = 300):
+        self.token_budget = token_budget
+        self.keep_recent_tool_outputs = keep_recent_tool_outputs
+        self.max_plain_chars = max_plain_chars
+
+    def total_tokens(self, messages: list) -> int:
+        return sum(count_tokens(_message_text(m)) for m in messages)
+
+    def _compact_content(self, content: str) -> str:
+        if not isinstance(content, str) or content.startswith(COMPACTED_PREFIX):
+            return content
+        try:
+            facts = extract_facts(json.loads(content))
+            return COMPACTED_PREFIX + json.dumps(facts, ensure_ascii=False)
+        except (json.JSONDecodeError, TypeError):
+            if len(content) <= self.max_plain_chars:
+                return content
+            return COMPACTED_PREFIX + content[:self.max_plain_chars] + "..."
+
+    def compact(self, messages: list) -> list:
+        """
+        예산을 넘는 동안 오래된 도구 출력부터 요약한다.
+        가장 최근 keep_recent_tool_outputs 개는 모델이 바로 다음 판단에 쓰므로, 그래도 넘칠 때만 요약한다.
+        원본 메시지 dict 는 수정하지 않고 새 목록을 반환한다 (시스템 메시지 등 공유 객체 보호).
+        """
+        total = self.total_tokens(messages)
+        if total <= self.token_budget:
+            return messages
+
+        compacted = list(messages)
+        tool_indexes = [i for i, m in enumerate(compacted) if isinstance(m, dict) and m.get("role") == "tool"]
+        recent = tool_indexes[-self.keep_recent_tool_outputs:] if self.keep_recent_tool_outputs else []
+        ordered = [i for i in tool_indexes if i not in recent] + recent
+
+        for i in ordered:
+            if total <= self.token_budget:
+                break
+            original = compacted[i]
+            new_content = self._compact_content(original.get("content"))
+            if new_content == original.get("content"):
+                continue
+            compacted[i] = {**original, "content": new_content}
+            total += count_tokens(_message_text(compacted[i])) - count_tokens(_message_text(original))
+
+        print(f"   [Context] 메시지 토큰 추정치 {self.total_tokens(messages)} → {total} (예산 {self.token_budget})")
+        return compacted
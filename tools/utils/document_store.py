@@ -0,0 +1,157 @@
+import time
+import uuid
+import threading
+from datetime import date, datetime, timedelta
+
+# 사용자별 서류 토큰 저장소
+# 같은 사용자가 다른 정책에 신청할 때 이미 발급받은 유효한 서류(예: 사업자등록증명원)를 재사용하여
+# 기관 재요청과 재검증을 생략한다. (user_id, 서류명) 단위로 관리한다.
+
+# 서류 유효성 검증 규칙
+# - min_issue_date : 이 날짜 이후에 발급된 서류만 유효
+# - max_age_days   : 발급일로부터 유효한 기간(일). None 이면 발급일 기준 기간 제한 없음
+DOCUMENT_VALIDITY_RULES = {
+    "default": {"min_issue_date": "2025-07-01", "max_age_days": None},
+}
+
+# 기간 제한이 없는 서류라도 캐시된 토큰은 이 시간을 넘겨 재사용하지 않는다
+DEFAULT_CACHE_TTL_SECONDS = 24 * 60 * 60
+# 만료된 항목은 조회 시점뿐 아니라 주기적으로도 정리하고, 항목 수가 상한을 넘으면 만료가 가까운 것부터 제거한다
+DEFAULT_SWEEP_INTERVAL_SECONDS = 60
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def get_validity_rule(doc_name: str = None) -> dict:
+    return DOCUMENT_VALIDITY_RULES.get(doc_name) or DOCUMENT_VALIDITY_RULES["default"]
+
+
+def check_document_validity(issue_date_str: str, doc_name: str = None, today: date = None) -> tuple[bool, str]:
+    """검증 규칙에 따라 (유효 여부, 메시지) 를 반환한다"""
+    rule = get_validity_rule(doc_name)
+    if issue_date_str < rule["min_issue_date"]:
+        return False, "서류 유효기간이 만료되었습니다."
+
+    if rule.get("max_age_days") is not None:
+        try:
+            issue_date = datetime.strptime(issue_date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return False, "서류 발급일자 형식이 올바르지 않습니다."
+        if (today or date.today()) > issue_date + timedelta(days=rule["max_age_days"]):
+            return False, "서류 유효기간이 만료되었습니다."
+
+    return True, "최신 서류로 확인되어 유효합니다."
+
+
+def compute_valid_until(issue_date_str: str, doc_name: str = None, now: float = None,
+                        cache_ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS) -> float:
+    """검증 규칙으로부터 캐시된 토큰을 재사용할 수 있는 마지막 시각(epoch)을 계산한다"""
+    now = now or time.time()
+    valid_until = now + cache_ttl_seconds
+
+    rule = get_validity_rule(doc_name)
+    if rule.get("max_age_days") is not None:
+        try:
+            issue_date = datetime.strptime(issue_date_str, "%Y-%m-%d")
+            expiry = (issue_date + timedelta(days=rule["max_age_days"] + 1)).timestamp()
+            valid_until = min(valid_until, expiry)
+        except ValueError:
+            return now # 발급일을 해석할 수 없으면 재사용하지 않는다
+    return valid_until
+
+
+class DocumentTokenStore:
+    """프로세스 전역에서 공유되는 서류 토큰 저장소 (도구는 요청마다 새로 생성되므로 싱글톤으로 둔다)"""
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls, cache_ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+                sweep_interval_seconds: float = DEFAULT_SWEEP_INTERVAL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(DocumentTokenStore, cls).__new__(cls)
+                cls._instance._init_store(cache_ttl_seconds, sweep_interval_seconds, max_entries)
+        return cls._instance
+
+    def _init_store(self, cache_ttl_seconds, sweep_interval_seconds, max_entries):
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {} # {(user_id, doc_name): entry}
+        self._token_index = {} # {doc_token: (user_id, doc_name)}
+        self._last_sweep = time.time()
+
+    @staticmethod
+    def new_token() -> str:
+        """사용자 간에 겹치지 않는 서류 토큰 (겹치면 다른 사용자의 서류를 덮어쓰게 된다)"""
+        return f"TOKEN_{uuid.uuid4().hex}"
+
+    def _evict(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._token_index.pop(entry["doc_token"], None)
+
+    def _sweep(self, now: float):
+        """주기가 지났거나 항목 수가 상한을 넘으면 만료/무효 항목을 제거한다 (self._lock 안에서 호출)"""
+        if now - self._last_sweep < self.sweep_interval_seconds and len(self._entries) < self.max_entries:
+            return
+        self._last_sweep = now
+        for key in [k for k, e in self._entries.items() if now >= e["valid_until"] or e.get("is_valid") is False]:
+            self._evict(key)
+        # 만료 전 항목만으로도 상한을 넘으면 만료가 가장 가까운 것부터 제거한다
+        overflow = len(self._entries) - self.max_entries + 1
+        if overflow > 0:
+            for key in sorted(self._entries, key=lambda k: self._entries[k]["valid_until"])[:overflow]:
+                self._evict(key)
+
+    def get_valid(self, user_id: str, doc_name: str) -> dict | None:
+        """아직 유효한 토큰이 있으면 반환하고, 만료된 항목은 이 시점에 제거한다"""
+        key = (user_id, doc_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            if time.time() >= entry["valid_until"] or entry.get("is_valid") is False:
+                self._evict(key)
+                return None
+            return dict(entry)
+
+    def put(self, user_id: str, doc_name: str, doc_token: str, issue_date: str) -> dict:
+        entry = {
+            "user_id": user_id, "doc_name": doc_name, "doc_token": doc_token, "issue_date": issue_date,
+            "valid_until": compute_valid_until(issue_date, doc_name, cache_ttl_seconds=self.cache_ttl_seconds),
+            "is_valid": None, "validation_message": None
+        }
+        key = (user_id, doc_name)
+        with self._lock:
+            owner = self._token_index.get(doc_token)
+            if owner is not None and owner != key:
+                raise ValueError(f"이미 다른 서류에 발급된 토큰입니다: {doc_token}")
+            self._sweep(time.time())
+            self._evict(key)
+            self._entries[key] = entry
+            self._token_index[doc_token] = key
+        return dict(entry)
+
+    def get_by_token(self, doc_token: str) -> dict | None:
+        with self._lock:
+            key = self._token_index.get(doc_token)
+            if key is None:
+                return None
+            entry = self._entries.get(key)
+            if not entry or time.time() >= entry["valid_until"]:
+                self._evict(key)
+                return None
+            return dict(entry)
+
+    def mark_validated(self, doc_token: str, is_valid: bool, message: str):
+        """검증 결과를 기록한다. 무효로 판정된 토큰은 재사용하지 않도록 즉시 제거한다"""
+        with self._lock:
+            key = self._token_index.get(doc_token)
+            if key is None:
+                return
+            if not is_valid:
+                self._evict(key)
+                return
+            self._entries[key]["is_valid"] = True
+            self._entries[key]["validation_message"] = message
@@ -0,0 +1,130 @@
+import numpy as np
+from .SystemUtils import ConfigLoader
+
+# RAG DB 용 임베딩 인코더 백엔드
+# 배포 환경은 GPU 가 없어 SentenceTransformer 를 fp32 / 기본 스레드 설정으로 CPU 에서 실행한다.
+#  - fp32 : 기존과 같은 SentenceTransformer (GPU 가 있으면 GPU 사용)
+#  - int8 : Linear 계층을 동적 int8 양자화한 CPU 모델 (가중치 메모리 감소, 행렬 곱 가속)
+# 공통으로 torch 스레드 수, 배치 크기, 길이 기반 배치(토큰 수가 비슷한 문장끼리 묶어 padding 낭비 감소)를 설정할 수 있다.
+# 모든 백엔드는 SentenceTransformer.encode 와 같은 형태로 호출되고, 같은 차원의 정규화된 float32 벡터를 돌려주므로
+# 기존 FAISS(IndexFlatIP) 인덱스와 그대로 호환된다. (백엔드를 바꾸면 문서 벡터는 다시 인코딩해야 한다)
+
+DEFAULT_MODEL_NAME = "jhgan/ko-sroberta-multitask"
+
+
+class TorchEncoder:
+    """SentenceTransformer fp32 백엔드"""
+
+    backend = "fp32"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, threads: int = 0, batch_size: int = 32,
+                 bucket_by_length: bool = True, device: str = None):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if threads > 0:
+            # 프로세스 전역 설정이므로 마지막으로 만든 인코더의 값이 적용된다
+            torch.set_num_threads(threads)
+        if device is None:
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.bucket_by_length = bucket_by_length
+        self.model = self._prepare(SentenceTransformer(model_name, device=device))
+
+    def _prepare(self, model):
+        return model
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def _token_lengths(self, texts: list) -> list:
+        tokenizer = getattr(self.model, "tokenizer", None)
+        max_len = getattr(self.model, "max_seq_length", None) or 512
+        if tokenizer is None:
+            return [min(len(t), max_len) for t in texts]
+        encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_len)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def _batches(self, texts: list) -> list:
+        """
+        원래 순서의 인덱스 묶음 목록.
+        길이순으로 정렬한 뒤 (문장 수 x 가장 긴 문장의 토큰 수) 가 batch_size x 128 토큰을 넘지 않게 묶는다.
+        짧은 문장은 더 큰 배치로, 긴 문장은 더 작은 배치로 실행된다.
+        """
+        if not self.bucket_by_length or len(texts) <= 1:
+            return [list(range(i, min(i + self.batch_size, len(texts)))) for i in range(0, len(texts), self.batch_size)]
+        lengths = self._token_lengths(texts)
+        order = sorted(range(len(texts)), key=lambda i: lengths[i])
+        token_budget = self.batch_size * 128
+        batches, current = [], []
+        for i in order:
+            # 길이 오름차순이므로 새 항목이 배치에서 가장 길다
+            if current and (len(current) + 1) * lengths[i] > token_budget:
+                batches.append(current)
+                current = []
+            current.append(i)
+        if current:
+            batches.append(current)
+        return batches
+
+    def encode(self, sentences, convert_to_tensor: bool = False, normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        """SentenceTransformer.encode 호환. 항상 (문장 수, 차원) float32 numpy 배열을 반환"""
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        sentences = list(sentences)
+        dimension = self.get_sentence_embedding_dimension()
+        vectors = np.zeros((len(sentences), dimension), dtype='float32')
+        for batch in self._batches(sentences):
+            encoded = self.model.encode(
+                [sentences[i] for i in batch], batch_size=len(batch), convert_to_tensor=False,
+                normalize_embeddings=normalize_embeddings, show_progress_bar=False
+            )
+            vectors[batch] = np.asarray(encoded, dtype='float32')
+        return vectors
+
+
+class QuantizedTorchEncoder(TorchEncoder):
+    """Linear 계층을 동적 int8 양자화한 CPU 백엔드"""
+
+    backend = "int8"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, threads: int = 0, batch_size: int = 32,
+                 bucket_by_length: bool = True, device: str = None):
+        # 동적 양자화 커널은 CPU 전용
+        super().__init__(model_name, threads, batch_size, bucket_by_length, device="cpu")
+
+    def _prepare(self, model):
+        import torch
+        model.eval()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+# app.properties [EMBEDDING] backend 에 쓰는 이름
+ENCODER_BACKENDS = {
+    "fp32": TorchEncoder,
+    "int8": QuantizedTorchEncoder,
+}
+
+
+def create_encoder(model_name: str = None, backend: str = None, threads: int = None, batch_size: int = None,
+                   bucket_by_length: bool = None):
+    """[EMBEDDING] 설정(인자로 덮어쓰기 가능)으로 인코더 생성"""
+    config = ConfigLoader()
+    if model_name is None:
+        model_name = config.get_setting('EMBEDDING', 'model_name', env_key='EMBEDDING_MODEL', default=DEFAULT_MODEL_NAME)
+    if backend is None:
+        backend = config.get_setting('EMBEDDING', 'backend', env_key='EMBEDDING_BACKEND', default='fp32')
+    if threads is None:
+        threads = int(config.get_setting('EMBEDDING', 'threads', env_key='EMBEDDING_THREADS', default='0'))
+    if batch_size is None:
+        batch_size = int(config.get_setting('EMBEDDING', 'batch_size', env_key='EMBEDDING_BATCH_SIZE', default='32'))
+    if bucket_by_length is None:
+        bucket_by_length = config.get_setting('EMBEDDING', 'bucket_by_length', env_key='EMBEDDING_BUCKET_BY_LENGTH',
+                                              default='true').strip().lower() in ("1", "true", "yes", "on")
+
+    encoder_cls = ENCODER_BACKENDS.get(backend.strip().lower())
+    if encoder_cls is None:
+        raise ValueError(f"알 수 없는 임베딩 백엔드 '{backend}' 입니다. (사용 가능: {', '.join(ENCODER_BACKENDS)})")
+    print(f"  [Encoder] '{model_name}' 로드 중... (backend={encoder_cls.backend}, threads={threads or 'default'}, batch_size={batch_size})")
+    return encoder_cls(model_name, threads=threads, batch_size=max(1, batch_size), bucket_by_length=bucket_by_length)
@@ -0,0 +1,111 @@
+import json
+import time
+import asyncio
+import threading
+
+# 에이전트 진행 이벤트 스트림 (Server-Sent Events)
+# 에이전트는 별도 스레드에서 emit() 으로 구조화된 이벤트를 넣고, HTTP 응답은 sse() 로 이벤트를 꺼내 보낸다.
+# 이벤트는 loop.call_soon_threadsafe 로 이벤트 루프의 asyncio.Queue 에 넣으므로,
+# 연결된 클라이언트가 많아도 대기용 스레드를 차지하지 않는다.
+# 느린 클라이언트 대응(backpressure):
+#  - 큐에 쌓인 이벤트 수는 maxsize 로 제한되고, 가득 차면 일반 이벤트는 put_timeout 동안 에이전트 스레드를 기다리게 한다
+#  - 'token' 이벤트는 버리지 않고 합쳐 두었다가 자리가 나면 한 번에 보낸다
+#  - 클라이언트 연결이 끊기면 이후 이벤트는 버린다 (에이전트 실행 자체는 끝까지 진행)
+
+TOKEN_EVENT = "token"
+_CLOSED = object()
+
+
+class AgentEventStream:
+    def __init__(self, maxsize: int = 256, put_timeout: float = 5.0, heartbeat_seconds: float = 15.0, loop=None):
+        """이벤트 루프 안에서 생성한다 (loop 를 주지 않으면 현재 실행 중인 루프 사용)"""
+        self._loop = loop or asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        # 큐에 들어간(아직 보내지 않은) 이벤트 수 제한. 생산자(에이전트 스레드)만 기다린다
+        self._slots = threading.BoundedSemaphore(maxsize)
+        self.put_timeout = put_timeout
+        self.heartbeat_seconds = heartbeat_seconds
+        self._lock = threading.Lock()
+        self._pending_tokens = []
+        self.disconnected = False
+        self.dropped_events = 0
+
+    def _put(self, item, timeout: float) -> bool:
+        acquired = self._slots.acquire(timeout=timeout) if timeout else self._slots.acquire(blocking=False)
+        if not acquired:
+            return False
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힘 (서버 종료 등)
+            self._slots.release()
+            self.disconnected = True
+            return False
+        return True
+
+    def _flush_tokens(self, timeout: float = 0) -> bool:
+        with self._lock:
+            if not self._pending_tokens:
+                return True
+            text = "".join(self._pending_tokens)
+            self._pending_tokens = []
+        if self._put((TOKEN_EVENT, {"text": text}), timeout):
+            return True
+        with self._lock:
+            self._pending_tokens.insert(0, text)
+        return False
+
+    def emit(self, event: str, data: dict = None):
+        """에이전트 쪽(생산자)에서 호출. 예외를 던지지 않는다"""
+        if self.disconnected:
+            return
+        data = dict(data or {})
+        data.setdefault("ts", round(time.time(), 3))
+
+        if event == TOKEN_EVENT:
+            with self._lock:
+                self._pending_tokens.append(data.get("text", ""))
+            self._flush_tokens()
+            return
+
+        # 순서 보장을 위해 밀린 token 을 먼저 보낸다
+        self._flush_tokens(self.put_timeout)
+        if not self._put((event, data), self.put_timeout):
+            self.dropped_events += 1
+            print(f"   [EventStream] 클라이언트가 느려 '{event}' 이벤트를 버렸습니다. (누적 {self.dropped_events})")
+
+    def close(self):
+        """생산이 끝났음을 알림. 마지막 token 까지 보낸 뒤 종료 표시를 넣는다"""
+        if self.disconnected:
+            return
+        self._flush_tokens(self.put_timeout)
+        if not self._put(_CLOSED, self.put_timeout):
+            self.disconnected = True
+
+    @staticmethod
+    def format_sse(event: str, data: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+    async def sse(self, http_request=None):
+        """StreamingResponse 에 넘길 async generator. http_request 가 있으면 연결 종료를 감지한다"""
+        last_sent = time.monotonic()
+        try:
+            while True:
+                if http_request is not None and await http_request.is_disconnected():
+                    print("   [EventStream] 클라이언트 연결이 끊어졌습니다.")
+                    return
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    if time.monotonic() - last_sent >= self.heartbeat_seconds:
+                        last_sent = time.monotonic()
+                        yield ": keep-alive\n\n"
+                    continue
+                self._slots.release()
+                if item is _CLOSED:
+                    return
+                event, data = item
+                last_sent = time.monotonic()
+                yield self.format_sse(event, data)
+        finally:
+            self.disconnected = True
@@ -1,21 +1,19 @@
 import numpy as np
-import faiss
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
-import torch
+from .encoders import create_encoder
 
 # 하이브리드(tfidf + semantic) 검색을 위한 dual-index VectorDB
 # 시멘틱 기법은 문장의 의미에만 집중하므로, 정확한 의도 파악이 어려울 수 있다
 # 시멘틱 검색으로 문장 단위의 해석 수행하고, tfidf 로 사용자가 필요로 하는 키워드를 탐색
 class VectorDB_hybrid:
-    def __init__(self, model_name='jhgan/ko-sroberta-multitask'):
+    def __init__(self, model_name=None, encoder=None):
+        # faiss/sklearn 은 import 에 시간이 걸리므로 모듈 import 시점이 아니라 DB 를 만들 때 가져온다
+        import faiss
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
         # 1. 의미 기반 검색 엔진
-        print(f"  [VectorDB] 시맨틱 검색 모델 '{model_name}' 로드 중...")
-        # GPU(or CPU) 설정
-        device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        
-        self.semantic_model = SentenceTransformer(model_name, device=device)
+        # 인코더 백엔드(fp32 / int8 양자화, 스레드 수, 배치 크기)는 [EMBEDDING] 설정을 따른다
+        print("  [VectorDB] 시맨틱 검색 모델 로드 중...")
+        self.semantic_model = encoder or create_encoder(model_name)
         self.faiss_index = faiss.IndexIDMap(faiss.IndexFlatIP(self.semantic_model.get_sentence_embedding_dimension()))
 
         # 2. 키워드 기반 검색 엔진
@@ -54,7 +52,20 @@ class VectorDB_hybrid:
     def keyword_search(self, query: str, k: int) -> list[tuple[float, str]]:
         """키워드가 일치하는 문서를 검색"""
         if self.tfidf_matrix is None: return []
+        from sklearn.metrics.pairwise import cosine_similarity
         query_vector = self.keyword_vectorizer.transform([query])
         scores = cosine_similarity(query_vector, self.tfidf_matrix).flatten()
         top_k_indices = scores.argsort()[-k:][::-1]
         return [(scores[i], self.doc_ids[i]) for i in top_k_indices if scores[i] > 0]
+
+    def search(self, query: str, k: int = 1, semantic_weight: float = 0.5) -> list[tuple[float, str]]:
+        """의미 점수와 키워드 점수를 가중 합산한 하이브리드 검색 (다른 VectorDB 와 같은 search 인터페이스)"""
+        if not self.doc_ids: return []
+        candidates = min(len(self.doc_ids), max(k * 4, 10))
+        scores = {}
+        for score, doc_id in self.semantic_search(query, candidates):
+            scores[doc_id] = semantic_weight * float(score)
+        for score, doc_id in self.keyword_search(query, candidates):
+            scores[doc_id] = scores.get(doc_id, 0.0) + (1 - semantic_weight) * float(score)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(score, doc_id) for doc_id, score in ranked]
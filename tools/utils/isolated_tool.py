@@ -0,0 +1,81 @@
+import os
+import json
+from tools.base import ToolBase
+from .code_validator import extract_tool_metadata
+from .sandbox_pool import get_sandbox_pool
+
+# 생성된 도구의 격리 실행
+# LLM 이 만든 *_tool.py 를 서버 프로세스에 import 하면 무한 루프, 메모리 폭주, 전역 상태 변경이
+# 그대로 에이전트 서버에 영향을 준다. 생성 도구 파일에는 표식을 남기고,
+# ToolLoader 는 표식이 있는 파일을 import 하지 않고 IsolatedTool 프록시로 등록한다.
+#  - 메타데이터(name/description/parameters)는 AST 로 정적으로 읽는다
+#  - execute 는 [TOOL_RUNNER] 샌드박스 풀의 worker 에서 실행되고 인자/결과는 pipe 로 JSON 을 주고받는다
+#  - 시간 초과, 결과 크기 초과, 예외는 JSON 오류 문자열로 돌려주어 에이전트가 계속 진행할 수 있게 한다
+# 직접 작성한 도구(표식 없음)는 기존처럼 프로세스 안에서 실행한다.
+
+GENERATED_TOOL_MARKER = "# ai-linker: generated-tool"
+
+
+def mark_generated(code: str) -> str:
+    """생성된 도구 코드의 첫 줄에 표식을 붙인다 (이미 있으면 그대로)"""
+    if code.startswith(GENERATED_TOOL_MARKER):
+        return code
+    return f"{GENERATED_TOOL_MARKER}\n{code}"
+
+
+def write_generated_tool(plugin_path: str, code: str) -> str:
+    with open(plugin_path, 'w', encoding='utf-8') as f:
+        f.write(mark_generated(code))
+    return plugin_path
+
+
+def is_generated_tool_file(path: str) -> bool:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.readline().strip() == GENERATED_TOOL_MARKER
+    except OSError:
+        return False
+
+
+class IsolatedTool(ToolBase):
+    """생성된 도구 파일을 샌드박스 worker 에서 실행하는 프록시"""
+
+    def __init__(self, module_name: str, metadata: dict, pool_section: str = "TOOL_RUNNER"):
+        self.module_name = module_name
+        self._metadata = metadata
+        self.pool_section = pool_section
+
+    @classmethod
+    def from_file(cls, path: str, pool_section: str = "TOOL_RUNNER"):
+        """도구 파일에서 프록시 생성. 메타데이터를 정적으로 읽을 수 없으면 None"""
+        with open(path, 'r', encoding='utf-8') as f:
+            metadata = extract_tool_metadata(f.read())
+        if metadata is None:
+            return None
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        return cls(module_name, metadata, pool_section)
+
+    @property
+    def name(self) -> str:
+        return self._metadata["name"]
+
+    @property
+    def description(self) -> str:
+        return self._metadata["description"]
+
+    @property
+    def parameters(self) -> dict:
+        return self._metadata["parameters"]
+
+    def execute(self, **kwargs) -> str:
+        try:
+            # 인자는 JSON 으로 전달되므로 직렬화할 수 없는 값은 여기서 걸러낸다
+            kwargs = json.loads(json.dumps(kwargs, ensure_ascii=False))
+            result = get_sandbox_pool(self.pool_section).run_tool_execute(self.module_name, kwargs)
+        except Exception as e:
+            result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+        if result.get("ok"):
+            return result["output"]
+        print(f"  [IsolatedTool] '{self.name}' 실행 실패: {result.get('error')}")
+        return json.dumps({"error": f"도구 '{self.name}' 실행 실패", "detail": result.get("error")}, ensure_ascii=False)
@@ -0,0 +1,283 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+import requests
+
+# 비동기 작업(Job) 큐
+# 오래 걸리는 에이전트 실행을 HTTP 연결과 분리한다.
+#  - submit() 은 작업을 SQLite 에 기록하고 job_id 를 바로 반환한다
+#  - 고정 개수의 worker 스레드가 queued 작업을 하나씩 가져가 실행한다 (동시 실행 수 상한)
+#  - running 작업에는 실행 중인 worker(owner)와 lease 만료 시각을 기록하고, 주기적으로 lease 를 갱신한다
+#    lease 가 만료된(= 실행하던 프로세스가 죽은) 작업만 다시 queued 로 돌리므로,
+#    여러 프로세스가 같은 jobs.db 를 쓰거나 재시작해도 다른 곳에서 실행 중인 작업을 중복 실행하지 않는다
+#  - max_attempts 번 시도해도 끝나지 못한 작업(worker 를 죽이는 작업 등)은 failed 로 처리한다
+#  - webhook_url 이 있으면 완료(성공/실패) 시 결과를 POST 로 알린다
+
+DEFAULT_JOB_DB_PATH = "jobs.db"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """대기 중인 작업 수가 상한에 도달함"""
+
+
+class SQLiteJobStore:
+    """작업 상태를 저장하는 SQLite(WAL) 저장소"""
+
+    def __init__(self, db_path: str = DEFAULT_JOB_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local() # sqlite3 연결은 스레드 간 공유하지 않는다
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # 작업 가져가기(claim)를 BEGIN IMMEDIATE 로 직접 묶기 위해 autocommit 모드로 연다
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id         TEXT PRIMARY KEY,
+                user_id        TEXT NOT NULL,
+                query          TEXT NOT NULL,
+                webhook_url    TEXT,
+                status         TEXT NOT NULL,
+                result         TEXT,
+                error          TEXT,
+                attempts       INTEGER NOT NULL DEFAULT 0,
+                webhook_status TEXT,
+                owner          TEXT,
+                lease_until    REAL,
+                created_at     REAL NOT NULL,
+                started_at     REAL,
+                finished_at    REAL
+            )
+        """)
+        # 이전 스키마로 만든 jobs.db 에 lease 컬럼 추가
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column in ("owner TEXT", "lease_until REAL"):
+            if column.split()[0] not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)")
+
+    @staticmethod
+    def _to_job(row) -> dict:
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, user_id: str, query: str, webhook_url: str = None) -> dict:
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (job_id, user_id, query, webhook_url, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, user_id, query, webhook_url, JOB_QUEUED, time.time())
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict | None:
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def count(self, status: str) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def claim_next(self, owner: str, lease_seconds: float) -> dict | None:
+        """가장 오래된 queued 작업 하나를 owner 의 running 으로 바꾸고 반환 (여러 worker/프로세스가 동시에 호출해도 안전)"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (JOB_QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_until = ?, started_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+                (JOB_RUNNING, owner, now + lease_seconds, now, row["job_id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["job_id"])
+
+    def finish(self, job_id: str, status: str, result: dict = None, error: str = None, owner: str = None) -> bool:
+        """
+        작업 완료 기록. owner 를 주면 그 worker 가 아직 작업을 가지고 있을 때만 기록한다
+        (lease 를 잃어 다른 worker 가 다시 가져간 작업의 결과를 덮어쓰지 않도록)
+        """
+        sql = "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL WHERE job_id = ?"
+        params = [status, json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                  error, time.time(), job_id]
+        if owner is not None:
+            sql += " AND owner = ? AND status = ?"
+            params += [owner, JOB_RUNNING]
+        return self._connect().execute(sql, params).rowcount > 0
+
+    def set_webhook_status(self, job_id: str, webhook_status: str):
+        self._connect().execute("UPDATE jobs SET webhook_status = ? WHERE job_id = ?", (webhook_status, job_id))
+
+    def renew_leases(self, owner: str, lease_seconds: float) -> int:
+        """owner 가 실행 중인 작업들의 lease 연장 (heartbeat)"""
+        return self._connect().execute(
+            "UPDATE jobs SET lease_until = ? WHERE status = ? AND owner = ?",
+            (time.time() + lease_seconds, JOB_RUNNING, owner)
+        ).rowcount
+
+    def requeue_expired(self, max_attempts: int) -> tuple:
+        """
+        lease 가 만료된 running 작업을 정리한다. (다시 queued 로 돌린 수, failed 로 처리한 수)
+        lease 정보가 없는 running 작업은 이전 버전이 남긴 것으로 보고 만료된 것으로 취급한다.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = "status = ? AND (lease_until IS NULL OR lease_until < ?)"
+            failed = conn.execute(
+                f"UPDATE jobs SET status = ?, error = ?, finished_at = ?, owner = NULL, lease_until = NULL "
+                f"WHERE {expired} AND attempts >= ?",
+                (JOB_FAILED, f"작업이 {max_attempts}회 시도 모두 완료되지 못했습니다. (worker 중단)", now,
+                 JOB_RUNNING, now, max_attempts)
+            ).rowcount
+            requeued = conn.execute(
+                f"UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL, started_at = NULL WHERE {expired}",
+                (JOB_QUEUED, JOB_RUNNING, now)
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return requeued, failed
+
+
+class JobQueue:
+    """
+    고정 크기 worker 풀로 작업을 처리한다.
+    runner(job) 는 작업 dict 를 받아 결과 dict 를 반환하는 함수 (예: 에이전트 실행).
+    """
+
+    def __init__(self, store: SQLiteJobStore, runner, workers: int = 4, max_queued: int = 1000,
+                 webhook_timeout: float = 10.0, webhook_retries: int = 3,
+                 lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # 이 프로세스의 JobQueue 를 식별하는 lease owner
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.webhook_timeout = webhook_timeout
+        self.webhook_retries = webhook_retries
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._reap_expired()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        print(f"[JobQueue] worker {self.workers}개 시작 (owner={self.worker_id}, 대기 작업 {self.store.count(JOB_QUEUED)}건)")
+
+    def _reap_expired(self):
+        try:
+            requeued, failed = self.store.requeue_expired(self.max_attempts)
+        except sqlite3.Error as e:
+            print(f"[JobQueue] 만료된 작업 정리 실패: {e}")
+            return
+        if requeued:
+            print(f"[JobQueue] lease 가 만료된 작업 {requeued}건을 다시 대기열에 넣었습니다.")
+        if failed:
+            print(f"[JobQueue] 최대 시도 횟수({self.max_attempts})를 넘은 작업 {failed}건을 실패 처리했습니다.")
+
+    def _heartbeat_loop(self):
+        """실행 중인 작업의 lease 를 연장하고, 다른 프로세스가 남긴 만료 작업을 정리한다"""
+        while not self._stopping.wait(timeout=self.lease_seconds / 3):
+            try:
+                self.store.renew_leases(self.worker_id, self.lease_seconds)
+            except sqlite3.Error as e:
+                print(f"[JobQueue] lease 갱신 실패: {e}")
+            self._reap_expired()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, user_id: str, query: str, webhook_url: str = None) -> dict:
+        if self.store.count(JOB_QUEUED) >= self.max_queued:
+            raise JobQueueFull(f"대기 중인 작업이 {self.max_queued}건을 넘었습니다.")
+        job = self.store.create(user_id, query, webhook_url)
+        self._wakeup.set()
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        return self.store.get(job_id)
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = self.store.claim_next(self.worker_id, self.lease_seconds)
+            except sqlite3.Error as e:
+                print(f"[JobQueue] 작업 조회 실패: {e}")
+                job = None
+            if job is None:
+                # 새 작업 알림 또는 다른 프로세스가 넣은 작업을 위해 주기적으로 다시 확인
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job: dict):
+        print(f"[JobQueue] 작업 시작: {job['job_id']} (user_id={job['user_id']})")
+        try:
+            result = self.runner(job)
+            recorded = self.store.finish(job["job_id"], JOB_SUCCEEDED, result=result, owner=self.worker_id)
+        except Exception as e:
+            print(f"[JobQueue] 작업 실패: {job['job_id']} ({e})")
+            recorded = self.store.finish(job["job_id"], JOB_FAILED, error=str(e), owner=self.worker_id)
+
+        if not recorded:
+            print(f"[JobQueue] 작업 {job['job_id']} 의 lease 를 잃어 결과를 기록하지 않았습니다.")
+            return
+        if job.get("webhook_url"):
+            self._notify(self.store.get(job["job_id"]))
+
+    def _notify(self, job: dict):
+        payload = {key: job[key] for key in ("job_id", "user_id", "status", "result", "error", "finished_at")}
+        for attempt in range(1, self.webhook_retries + 1):
+            try:
+                response = requests.post(job["webhook_url"], json=payload, timeout=self.webhook_timeout)
+                if response.status_code < 500:
+                    self.store.set_webhook_status(job["job_id"], f"delivered:{response.status_code}")
+                    return
+                error = f"HTTP {response.status_code}"
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+            print(f"[JobQueue] webhook 전송 실패 ({attempt}/{self.webhook_retries}): {error}")
+            time.sleep(min(2 ** attempt, 10))
+        self.store.set_webhook_status(job["job_id"], "failed")
@@ -0,0 +1,170 @@
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+# LLM 호출 응답 캐시
+# 비슷한 질문("소상공인 대출 신청하고 싶어요")이 반복될 때 같은 검색/계획 단계를 다시 호출하지 않도록
+# client.chat.completions.create 를 감싸서 응답을 재사용한다.
+#  - 정확히 같은 요청 : 정규화한 messages/tools 의 해시로 매칭
+#  - 거의 같은 요청   : 마지막 user 발화를 제외한 문맥이 같을 때, user 발화의 임베딩 유사도로 매칭
+#  - 지식 베이스 버전이 바뀌면 이전 응답은 매칭되지 않는다
+#  - 도구 출력이나 사용자 ID 가 포함된 요청은 해당 사용자 범위(scope)에서만 재사용한다
+
+SHARED_SCOPE = "__shared__"
+_WHITESPACE = re.compile(r"\s+")
+
+# 응답 내용에 영향을 주는 요청 파라미터 (그 외 timeout 등은 키에 포함하지 않는다)
+_KEY_PARAMS = ("model", "temperature", "max_tokens", "tool_choice", "response_format", "top_p", "logprobs", "top_logprobs")
+
+
+def _normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _normalize_message(message) -> dict:
+    """dict 또는 SDK 메시지 객체를 공백까지 정규화한 dict 로 변환"""
+    if hasattr(message, "model_dump"):
+        message = message.model_dump(exclude_none=True)
+    message = dict(message)
+    if isinstance(message.get("content"), str):
+        message["content"] = _normalize_text(message["content"])
+    return message
+
+
+def _digest(payload) -> str:
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def make_embed_fn(rag_system):
+    """RAG DB 가 시맨틱 모델을 가지고 있으면 그 모델로 임베딩 함수를 만든다 (없으면 None → 정확 매칭만 사용)"""
+    model = getattr(rag_system.db, "semantic_model", None) or getattr(rag_system.db, "model", None)
+    if model is None or not hasattr(model, "encode"):
+        return None
+    return lambda text: [float(x) for x in model.encode([text], convert_to_tensor=False, normalize_embeddings=True)[0]]
+
+
+class LLMResponseCache:
+    """TTL + LRU 로 관리되는 프로세스 전역 응답 캐시"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600,
+                 similarity_threshold: float = 0.95, embed_fn=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.embed_fn = embed_fn
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # {exact_key: entry}
+        self._buckets = {} # {semantic_bucket: set(exact_key)}
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            bucket = self._buckets.get(entry["bucket"])
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[entry["bucket"]]
+
+    def _is_expired(self, entry) -> bool:
+        return time.time() - entry["created_at"] > self.ttl_seconds
+
+    def lookup(self, exact_key: str, bucket: str, semantic_text: str = None):
+        with self._lock:
+            entry = self._entries.get(exact_key)
+            if entry and not self._is_expired(entry):
+                self._entries.move_to_end(exact_key)
+                self.stats["exact_hits"] += 1
+                return entry["response"]
+            if entry:
+                self._remove(exact_key)
+            candidates = [(k, self._entries[k]) for k in self._buckets.get(bucket, ())]
+
+        # 임베딩 계산은 락 밖에서 수행
+        if self.embed_fn and semantic_text and candidates:
+            vector = self.embed_fn(semantic_text)
+            best_key, best_score = None, self.similarity_threshold
+            for key, entry in candidates:
+                if entry["vector"] is None or self._is_expired(entry):
+                    continue
+                score = sum(a * b for a, b in zip(vector, entry["vector"]))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is not None:
+                with self._lock:
+                    entry = self._entries.get(best_key)
+                    if entry:
+                        self._entries.move_to_end(best_key)
+                        self.stats["semantic_hits"] += 1
+                        return entry["response"]
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def store(self, exact_key: str, bucket: str, response, semantic_text: str = None):
+        vector = self.embed_fn(semantic_text) if (self.embed_fn and semantic_text) else None
+        with self._lock:
+            self._remove(exact_key)
+            self._entries[exact_key] = {"response": response, "created_at": time.time(), "bucket": bucket, "vector": vector}
+            self._buckets.setdefault(bucket, set()).add(exact_key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+
+class CachedChatClient:
+    """
+    OpenAI client 를 감싸 chat.completions.create 호출에 캐시를 적용한다.
+    기존 client 자리에 그대로 넣어 쓸 수 있으며, 나머지 속성은 원래 client 로 위임한다.
+    """
+
+    def __init__(self, client, cache: LLMResponseCache, user_id: str, kb_version_fn=None):
+        self._client = client
+        self._cache = cache
+        self._user_id = user_id
+        self._kb_version_fn = kb_version_fn or (lambda: None)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _scope(self, messages: list) -> str:
+        """도구 출력 또는 사용자 ID 가 들어간 요청은 해당 사용자에게만 재사용한다"""
+        for message in messages:
+            if message.get("role") == "tool":
+                return self._user_id
+            if self._user_id and self._user_id in json.dumps(message, ensure_ascii=False, default=str):
+                return self._user_id
+        return SHARED_SCOPE
+
+    def _create(self, **kwargs):
+        if kwargs.get("stream") or kwargs.get("n", 1) != 1:
+            return self._client.chat.completions.create(**kwargs)
+
+        messages = [_normalize_message(m) for m in kwargs.get("messages", [])]
+        params = {k: kwargs.get(k) for k in _KEY_PARAMS if k in kwargs}
+        tools = kwargs.get("tools")
+        scope = self._scope(messages)
+        kb_version = self._kb_version_fn()
+
+        # 마지막 user 발화를 분리하여, 나머지 문맥이 같은 요청끼리만 유사도 비교를 한다
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=None)
+        semantic_text = messages[last_user].get("content") if last_user is not None else None
+        context = [m for i, m in enumerate(messages) if i != last_user]
+
+        exact_key = _digest({"scope": scope, "kb": kb_version, "params": params, "tools": tools, "messages": messages})
+        bucket = _digest({"scope": scope, "kb": kb_version, "params": params, "tools": tools, "context": context})
+
+        cached = self._cache.lookup(exact_key, bucket, semantic_text if isinstance(semantic_text, str) else None)
+        if cached is not None:
+            print(f"   [LLM Cache] 캐시된 응답을 사용합니다. (scope={'shared' if scope == SHARED_SCOPE else 'user'})")
+            return cached
+
+        response = self._client.chat.completions.create(**kwargs)
+        self._cache.store(exact_key, bucket, response, semantic_text if isinstance(semantic_text, str) else None)
+        return response
@@ -0,0 +1,91 @@
+import math
+from .SystemUtils import ConfigLoader
+from .resilience import get_caller
+
+# 호출 유형(task class)별 모델 라우팅
+# 모든 LLM 호출이 gpt-4o 를 쓰던 것을, 호출 위치마다 작업 유형을 선언하고 설정된 모델을 받도록 바꾼다.
+# 작은 모델의 응답이 신뢰도가 낮거나 검증에 실패하면 상위 모델(escalation)로 한 번 더 호출한다.
+
+TASK_CLASSIFY = "classify"     # 짧은 분류 (예: gatekeeper)
+TASK_PLAN = "plan"             # 도구 선택/계획 수립 (에이전트 단계, 스펙 생성, 동기화 계획)
+TASK_CODEGEN = "codegen"       # 코드 생성
+TASK_SUMMARIZE = "summarize"   # 요약/분석
+
+DEFAULT_MODELS = {
+    TASK_CLASSIFY: "gpt-4o-mini",
+    TASK_PLAN: "gpt-4o",
+    TASK_CODEGEN: "gpt-4o",
+    TASK_SUMMARIZE: "gpt-4o-mini",
+    "escalation": "gpt-4o",
+}
+
+
+def first_token_confidence(response) -> float | None:
+    """logprobs 가 요청된 응답에서 첫 토큰의 확률을 계산한다 (분류 응답의 신뢰도로 사용)"""
+    try:
+        return math.exp(response.choices[0].logprobs.content[0].logprob)
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+
+class ModelRouter:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ModelRouter, cls).__new__(cls)
+            cls._instance._init_routes()
+        return cls._instance
+
+    def _init_routes(self):
+        config = ConfigLoader()
+        self.models = {
+            task: config.get_setting('MODELS', task, env_key=f"MODEL_{task.upper()}", default=default)
+            for task, default in DEFAULT_MODELS.items()
+        }
+        print(f"[ModelRouter] 모델 라우팅: {self.models}")
+
+    def model_for(self, task: str) -> str:
+        return self.models.get(task) or self.models["escalation"]
+
+    def create(self, client, task: str, validate=None, min_confidence: float = None, **kwargs):
+        """
+        task 에 설정된 모델로 client.chat.completions.create 를 호출한다.
+          - validate(response) -> bool : False 이거나 예외가 나면 상위 모델로 재호출
+          - min_confidence            : 첫 토큰 확률이 이보다 낮으면 상위 모델로 재호출 (logprobs 자동 요청)
+        """
+        model = self.model_for(task)
+        if min_confidence is not None:
+            kwargs["logprobs"] = True
+
+        response = self._call(client, model, kwargs, task)
+
+        escalation_model = self.models["escalation"]
+        if model == escalation_model:
+            return response
+
+        reason = None
+        if validate is not None:
+            try:
+                if not validate(response):
+                    reason = "검증 실패"
+            except Exception as e:
+                reason = f"검증 오류: {e}"
+        if reason is None and min_confidence is not None:
+            confidence = first_token_confidence(response)
+            if confidence is not None and confidence < min_confidence:
+                reason = f"낮은 신뢰도({confidence:.2f})"
+
+        if reason is None:
+            return response
+
+        print(f"   [ModelRouter] {task}: '{model}' 응답 {reason} → '{escalation_model}' 로 재시도합니다.")
+        return self._call(client, escalation_model, kwargs, task)
+
+    @staticmethod
+    def _call(client, model: str, kwargs: dict, task: str = None):
+        """timeout/재시도/hedging/circuit breaker 가 적용된 호출 (hedging 기준 p95 는 모델/작업별)"""
+        return get_caller("openai").call(
+            lambda timeout: client.chat.completions.create(model=model, timeout=timeout, **kwargs),
+            latency_key=f"{model}:{task}"
+        )
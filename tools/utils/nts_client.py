@@ -0,0 +1,44 @@
+import requests
+from .SystemUtils import ConfigLoader
+
+# 국세청(NTS) 사업자등록 상태조회 API 클라이언트
+# 도구(verify_business_registration)와 배치 사전검증 작업이 같은 호출 로직을 공유한다
+
+NTS_STATUS_URL = "https://api.odcloud.kr/api/nts-businessman/v1/status"
+NTS_MAX_BATCH = 100 # 국세청 API 는 한 번에 최대 100개의 사업자번호를 조회할 수 있다
+
+
+def normalize_business_id(business_id: str) -> str:
+    """사업자번호에서 하이픈/공백을 제거하여 국세청 API 형식(숫자 10자리)으로 맞춘다"""
+    return (business_id or "").replace("-", "").strip()
+
+
+class NtsBusinessClient:
+    def __init__(self, service_key: str = None, timeout: float = 10.0):
+        self.service_key = service_key or ConfigLoader()._get_priority_key('GOV_API_KEY', 'govdata.api.key')
+        self.timeout = timeout
+
+    def fetch_status(self, business_ids: list) -> dict:
+        """
+        사업자번호 목록의 상태를 조회한다.
+        NTS_MAX_BATCH 단위로 나누어 호출하며, {정규화된 사업자번호: 조회 결과} 를 반환한다.
+        네트워크 오류(requests.exceptions.RequestException)는 호출자에게 그대로 전달한다.
+        """
+        b_nos = [normalize_business_id(b) for b in business_ids if normalize_business_id(b)]
+        results = {}
+
+        for start in range(0, len(b_nos), NTS_MAX_BATCH):
+            chunk = b_nos[start:start + NTS_MAX_BATCH]
+            response = requests.post(
+                f"{NTS_STATUS_URL}?serviceKey={self.service_key}",
+                json={"b_no": chunk},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            for status in data.get("data") or []:
+                if status.get("b_no"):
+                    results[status["b_no"]] = status
+
+        return results
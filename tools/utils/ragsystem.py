@@ -1,14 +1,21 @@
 
 from .tfidfdb import VectorDB_tfidf
 import json
+import bisect
+
+# 문서 조회 시 선택할 수 있는 필드 (doc_id 는 항상 포함)
+DOCUMENT_FIELDS = ("content", "metadata")
 
 # LLM에 쓰일 RAG 를 정의한다
 class RAG_System:
     def __init__(self):
         # 기본은 tf-idf 이용
         self.db = VectorDB_tfidf()
+        # 문서가 추가/삭제될 때마다 증가하는 지식 베이스 버전
+        self.version = 0
+        self._sorted_ids_cache = (None, [])
 
-    def set_database(db) :
+    def set_database(self, db) :
         """RAG 시스템에 쓰일 데이터베이스를 설정한다"""
         self.db = db
 
@@ -17,6 +24,7 @@ class RAG_System:
         print(f"  [Knowledge Base] ADD: '{doc_id}' 문서 추가")
         self.db.documents[doc_id] = content
         self.db.metadata_store[doc_id] = metadata
+        self.version += 1
         if build_index: self.db.build_index()
 
     def delete_document(self, doc_id: str, build_index: bool = True):
@@ -25,6 +33,7 @@ class RAG_System:
             print(f"  [Knowledge Base] DELETE: '{doc_id}' 문서 삭제")
             del self.db.documents[doc_id]
             del self.db.metadata_store[doc_id]
+            self.version += 1
             if build_index: self.db.build_index()
 
     def print_documents(self):
@@ -38,6 +47,61 @@ class RAG_System:
             print(f"  [Metadata] - {json.dumps(self.db.metadata_store.get(doc_id, {}), ensure_ascii=False)}")
         print("\n" + "="*64)
 
+    def _sorted_doc_ids(self) -> list[str]:
+        """doc_id 정렬 목록 (지식 베이스 버전이 바뀔 때만 다시 정렬)"""
+        version, doc_ids = self._sorted_ids_cache
+        if version != self.version:
+            doc_ids = sorted(self.db.documents.keys())
+            self._sorted_ids_cache = (self.version, doc_ids)
+        return doc_ids
+
+    @staticmethod
+    def _match_filters(metadata: dict, filters: dict) -> bool:
+        """metadata 가 모든 필터 조건을 만족하는지 확인 (리스트 값은 포함 여부로 비교)"""
+        for key, expected in (filters or {}).items():
+            value = metadata.get(key)
+            if isinstance(value, list):
+                if expected not in value:
+                    return False
+            elif value != expected:
+                return False
+        return True
+
+    def iter_documents(self, fields: tuple = DOCUMENT_FIELDS, filters: dict = None, after: str = None):
+        """
+        doc_id 순으로 문서를 하나씩 반환하는 generator.
+        fields 로 반환할 필드를 고르고(빈 값이면 doc_id 만), filters 로 metadata 조건을 건다.
+        after 가 주어지면 그 doc_id 다음 문서부터 반환한다.
+        """
+        doc_ids = self._sorted_doc_ids()
+        start = bisect.bisect_right(doc_ids, after) if after else 0
+
+        for doc_id in doc_ids[start:]:
+            # 순회 중 동기화로 삭제된 문서는 건너뛴다
+            content = self.db.documents.get(doc_id)
+            if content is None:
+                continue
+            metadata = self.db.metadata_store.get(doc_id, {})
+            if filters and not self._match_filters(metadata, filters):
+                continue
+
+            item = {"doc_id": doc_id}
+            if "content" in fields:
+                item["content"] = content
+            if "metadata" in fields:
+                item["metadata"] = metadata
+            yield item
+
+    def list_documents(self, cursor: str = None, limit: int = 50, fields: tuple = DOCUMENT_FIELDS,
+                       filters: dict = None) -> tuple[list[dict], str | None]:
+        """cursor(마지막으로 받은 doc_id) 다음부터 limit 개를 반환. (documents, next_cursor)"""
+        documents = []
+        for item in self.iter_documents(fields=fields, filters=filters, after=cursor):
+            if len(documents) == limit:
+                return documents, documents[-1]["doc_id"]
+            documents.append(item)
+        return documents, None
+
     # hybrid 검색엔진 이용을 위한 함수 정의
     def hybrid_search(self, query: str, k: int = 5) -> list[str]:
         """ VectorDB 의 두개의 index 검색 결과를 조합하여 최종 순위를 매기는 하이브리드 검색"""
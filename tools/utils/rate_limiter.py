@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+try:
+    import fcntl # 프로세스 간 공유 모드(파일 잠금)에서만 사용, Windows 에는 없다
+except ImportError:
+    fcntl = None
+
+# 제공자/모델별 토큰 버킷 rate limiter
+# 고정 시간 sleep 대신, 분당 요청 수(RPM)와 분당 토큰 수(TPM) 버킷에서 필요한 만큼만 기다린다.
+# state_file 을 지정하면 같은 머신의 여러 worker 프로세스가 파일 잠금으로 버킷을 공유한다.
+
+# {provider.model 또는 provider.default: (rpm, tpm)}
+DEFAULT_LIMITS = {
+    "openai.default": (500, 30000),
+    "openai.gpt-4o-mini": (500, 200000),
+    "anthropic.default": (50, 40000),
+    "gemini.default": (2, 250000), # 기존 31초 대기와 같은 수준의 분당 2회
+}
+
+
+def estimate_tokens(payload, max_output_tokens: int = None) -> int:
+    """요청 크기로 사용할 토큰 수를 대략 추정한다 (응답 후 실제 사용량으로 보정)"""
+    text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False, default=str)
+    return len(text) // 3 + (max_output_tokens or 512)
+
+
+class TokenBucketLimiter:
+    def __init__(self, limits: dict = None, state_file: str = None):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.state_file = state_file if (state_file and fcntl) else None
+        self._lock = threading.Lock()
+        self._state = {} # {key: {"req": 남은 요청 수, "tok": 남은 토큰 수, "ts": 마지막 갱신 시각}}
+
+    def _limit_for(self, provider: str, model: str) -> tuple:
+        key = f"{provider}.{model}"
+        if key in self.limits:
+            return key, self.limits[key]
+        return f"{provider}.default", self.limits.get(f"{provider}.default", (60, 100000))
+
+    @contextmanager
+    def _locked_state(self):
+        """프로세스 내 잠금 + (설정 시) 파일 잠금을 잡고 버킷 상태를 읽고 쓴다"""
+        with self._lock:
+            if not self.state_file:
+                yield self._state
+                return
+            with open(self.state_file, "a+", encoding="utf-8") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    raw = f.read()
+                    state = json.loads(raw) if raw.strip() else {}
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _reserve(self, provider: str, model: str, requests: int, tokens: int) -> float:
+        """버킷에서 미리 차감(음수 허용)하고, 잔량이 0 이상이 될 때까지 기다려야 하는 시간을 반환"""
+        key, (rpm, tpm) = self._limit_for(provider, model)
+        now = time.time()
+        with self._locked_state() as state:
+            bucket = state.get(key) or {"req": rpm, "tok": tpm, "ts": now}
+            elapsed = max(0.0, now - bucket["ts"])
+            # 반환(음수 차감) 시에도 버킷 용량을 넘지 않도록 한 번 더 상한을 둔다
+            bucket["req"] = min(rpm, min(rpm, bucket["req"] + elapsed * rpm / 60.0) - requests)
+            bucket["tok"] = min(tpm, min(tpm, bucket["tok"] + elapsed * tpm / 60.0) - min(tokens, tpm))
+            bucket["ts"] = now
+            state[key] = bucket
+
+            wait_req = -bucket["req"] * 60.0 / rpm if bucket["req"] < 0 else 0.0
+            wait_tok = -bucket["tok"] * 60.0 / tpm if bucket["tok"] < 0 else 0.0
+        return max(wait_req, wait_tok)
+
+    def acquire(self, provider: str, model: str, tokens: int, max_wait: float = None) -> float:
+        """
+        토큰을 예약하고 필요한 만큼 기다린 뒤, 기다린 시간(초)을 반환한다.
+        대기 시간이 max_wait(호출 timeout) 또는 요청 deadline 의 남은 예산보다 길면
+        예약을 되돌리고 DeadlineExceeded 를 던진다. (SDK timeout 은 대기가 끝난 뒤에야 적용되므로)
+        """
+        from .resilience import remaining_budget, DeadlineExceeded # resilience → SystemUtils → rate_limiter 순환 import 방지
+
+        wait = self._reserve(provider, model, 1, tokens)
+        if wait <= 0:
+            return 0.0
+        limit = max_wait
+        budget = remaining_budget()
+        if budget is not None:
+            limit = budget if limit is None else min(limit, budget)
+        if limit is not None and wait > limit:
+            self._reserve(provider, model, -1, -tokens)
+            raise DeadlineExceeded(f"[RateLimiter] {provider}/{model}: 필요한 대기 {wait:.1f}초가 남은 시간 {max(limit, 0):.1f}초를 넘습니다.")
+        print(f"   [RateLimiter] {provider}/{model}: {wait:.2f}초 대기")
+        time.sleep(wait)
+        return wait
+
+    def adjust(self, provider: str, model: str, estimated: int, actual: int | None):
+        """응답의 실제 토큰 사용량으로 추정치를 보정 (남으면 반환, 모자라면 추가 차감)"""
+        if actual is None or actual == estimated:
+            return
+        self._reserve(provider, model, 0, actual - estimated)
+
+
+def _shorten_timeout(kwargs: dict, key: str, waited: float):
+    """rate limit 대기에 쓴 시간만큼 호출 timeout 을 줄인다"""
+    if waited > 0 and isinstance(kwargs.get(key), (int, float)):
+        kwargs[key] = max(kwargs[key] - waited, 1.0)
+
+
+class RateLimitedOpenAI:
+    """OpenAI client 의 chat.completions.create 호출 전에 rate limiter 를 거치게 한다"""
+
+    def __init__(self, client, limiter: TokenBucketLimiter):
+        self._client = client
+        self._limiter = limiter
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _create(self, **kwargs):
+        model = kwargs.get("model", "default")
+        estimated = estimate_tokens([kwargs.get("messages"), kwargs.get("tools")], kwargs.get("max_tokens"))
+        waited = self._limiter.acquire("openai", model, estimated, max_wait=kwargs.get("timeout"))
+        _shorten_timeout(kwargs, "timeout", waited)
+        response = self._client.chat.completions.create(**kwargs)
+        usage = getattr(response, "usage", None)
+        self._limiter.adjust("openai", model, estimated, getattr(usage, "total_tokens", None))
+        return response
+
+
+class RateLimitedAnthropic:
+    """Anthropic client 의 messages.create 호출 전에 rate limiter 를 거치게 한다"""
+
+    def __init__(self, client, limiter: TokenBucketLimiter):
+        self._client = client
+        self._limiter = limiter
+        self.messages = SimpleNamespace(create=self._create)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _create(self, **kwargs):
+        model = kwargs.get("model", "default")
+        estimated = estimate_tokens(kwargs.get("messages"), kwargs.get("max_tokens"))
+        waited = self._limiter.acquire("anthropic", model, estimated, max_wait=kwargs.get("timeout"))
+        _shorten_timeout(kwargs, "timeout", waited)
+        response = self._client.messages.create(**kwargs)
+        usage = getattr(response, "usage", None)
+        actual = (usage.input_tokens + usage.output_tokens) if usage else None
+        self._limiter.adjust("anthropic", model, estimated, actual)
+        return response
+
+
+class RateLimitedGeminiModel:
+    """Gemini GenerativeModel 의 generate_content 호출 전에 rate limiter 를 거치게 한다"""
+
+    def __init__(self, model, model_name: str, limiter: TokenBucketLimiter):
+        self._model = model
+        self._model_name = model_name
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def generate_content(self, contents, **kwargs):
+        estimated = estimate_tokens(contents)
+        request_options = kwargs.get("request_options")
+        request_options = dict(request_options) if isinstance(request_options, dict) else None
+        waited = self._limiter.acquire("gemini", self._model_name, estimated,
+                                       max_wait=request_options.get("timeout") if request_options else None)
+        if request_options:
+            _shorten_timeout(request_options, "timeout", waited)
+            kwargs["request_options"] = request_options
+        response = self._model.generate_content(contents, **kwargs)
+        usage = getattr(response, "usage_metadata", None)
+        self._limiter.adjust("gemini", self._model_name, estimated, getattr(usage, "total_token_count", None))
+        return response
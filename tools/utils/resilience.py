@@ -0,0 +1,274 @@
+import time
+import random
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .SystemUtils import ConfigLoader
+
+# LLM 호출 안정화 계층
+#  - 호출당 timeout 과 요청 전체 deadline 예산
+#  - 429/5xx/네트워크 오류에 대한 jitter backoff 재시도
+#  - p95 지연을 넘기면 같은 요청을 한 번 더 보내는 hedged request (먼저 끝난 응답 사용)
+#  - 제공자 장애 시 즉시 실패시키는 circuit breaker
+
+
+class DeadlineExceeded(Exception):
+    """요청 전체 deadline 예산을 모두 사용함"""
+
+
+class CircuitOpenError(Exception):
+    """제공자가 장애 상태로 판단되어 호출을 차단함"""
+
+
+# 요청(에이전트 실행) 단위 deadline. 같은 실행 흐름의 모든 LLM 호출이 공유한다
+_request_deadline = contextvars.ContextVar("ai_linker_request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: float):
+    """with request_deadline(120): agent.run(...) 처럼 요청 전체의 시간 예산을 설정한다"""
+    token = _request_deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def remaining_budget() -> float | None:
+    """남은 요청 예산(초). deadline 이 없으면 None"""
+    deadline = _request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _status_code(error) -> int | None:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error) -> bool:
+    """429/5xx 와 timeout/연결 오류만 재시도한다 (제공자 SDK 에 의존하지 않도록 이름으로 판별)"""
+    if isinstance(error, (DeadlineExceeded, CircuitOpenError)):
+        # 이 계층(예산/rate limiter/circuit)이 스스로 거절한 것이므로 재시도하지 않는다
+        return False
+    code = _status_code(error)
+    if code is not None:
+        return code == 429 or code >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name or "ServiceUnavailable" in name or "DeadlineExceeded" in name
+
+
+def _retry_after(error) -> float | None:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """연속 실패가 threshold 를 넘으면 reset_timeout 동안 열림(open) → 이후 한 번 시험 호출(half-open)"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def acquire(self) -> str | None:
+        """호출을 허용하면 그 시점의 상태("closed" / "half-open"), 차단하면 None.
+        "half-open" 을 받은 호출자는 시험 호출 담당이므로 record_* 또는 release_probe 로 반드시 반납해야 한다"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return state
+            if state == "half-open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return state
+            return None
+
+    def allow(self) -> bool:
+        return self.acquire() is not None
+
+    def release_probe(self):
+        """성공/실패를 기록하지 않고 시험 호출 자리만 반납한다 (deadline 초과 등 제공자와 무관하게 끝난 경우)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class ResilientCaller:
+    """제공자별 호출 정책. call(fn) 의 fn 은 timeout(초)을 인자로 받아 실제 API 를 호출해야 한다"""
+
+    def __init__(self, provider: str, call_timeout: float = 30.0, max_retries: int = 3,
+                 base_backoff: float = 0.5, max_backoff: float = 8.0, hedge: bool = True,
+                 hedge_min_samples: int = 20, breaker: CircuitBreaker = None):
+        self.provider = provider
+        self.call_timeout = call_timeout
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        # 모델/작업 종류별 지연 기록 {latency_key: deque}. 분류(짧은 응답)와 코드 생성(긴 응답)을 섞으면 p95 가 의미 없다
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix=f"hedge-{provider}")
+
+    def p95_latency(self, latency_key: str = None) -> float | None:
+        with self._lock:
+            latencies = self._latencies.get(latency_key)
+            if latencies is None or len(latencies) < self.hedge_min_samples:
+                return None
+            samples = sorted(latencies)
+        return samples[int(len(samples) * 0.95) - 1]
+
+    def _record_latency(self, latency_key: str, seconds: float):
+        with self._lock:
+            self._latencies.setdefault(latency_key, deque(maxlen=200)).append(seconds)
+
+    def _submit(self, fn, *args):
+        # executor 스레드에서도 요청 deadline(contextvar)이 보이도록 현재 context 를 복사해 실행
+        return self._executor.submit(contextvars.copy_context().run, fn, *args)
+
+    def _attempt_timeout(self) -> float:
+        budget = remaining_budget()
+        if budget is None:
+            return self.call_timeout
+        if budget <= 0:
+            raise DeadlineExceeded(f"[{self.provider}] 요청 deadline 을 초과했습니다.")
+        return min(self.call_timeout, budget)
+
+    def _invoke(self, fn, timeout: float, latency_key: str = None):
+        """한 번의 시도. 같은 모델/작업의 p95 를 넘기면 hedged request 를 추가로 보내 먼저 끝난 쪽을 사용한다"""
+        p95 = self.p95_latency(latency_key) if self.hedge else None
+        if p95 is None or p95 >= timeout:
+            return fn(timeout)
+
+        started = time.monotonic()
+        primary = self._submit(fn, timeout)
+        done, _ = wait([primary], timeout=p95)
+        if done:
+            return primary.result()
+
+        print(f"   [Resilience] {self.provider}: 응답이 p95({p95:.1f}s, {latency_key})를 넘어 hedged request 를 보냅니다.")
+        hedged = self._submit(fn, max(timeout - p95, 1.0))
+        pending = {primary, hedged}
+        error = None
+        while pending:
+            # 시도 전체가 timeout 을 넘지 않도록, 이미 기다린 시간(p95 포함)을 빼고 남은 만큼만 기다린다
+            remaining = timeout - (time.monotonic() - started)
+            budget = remaining_budget()
+            if budget is not None:
+                remaining = min(remaining, budget)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error or TimeoutError(f"[{self.provider}] hedged request 가 모두 시간 내에 끝나지 않았습니다.")
+
+    def call(self, fn, latency_key: str = None):
+        """latency_key: hedging 기준 p95 를 따로 관리할 단위 (예: '모델:작업')"""
+        # 예산이 이미 없으면 breaker 의 시험 호출 자리를 잡기 전에 끝낸다
+        self._attempt_timeout()
+        granted = self.breaker.acquire()
+        if granted is None:
+            raise CircuitOpenError(f"[{self.provider}] 제공자 장애로 호출을 차단 중입니다. (circuit open)")
+        # 시험 호출(half-open) 자리를 잡은 상태에서 결과를 기록하지 못하고 끝나면 finally 에서 반납한다
+        # (반납하지 않으면 이후 모든 호출이 CircuitOpenError 로 막힌다)
+        holding_probe = granted == "half-open"
+
+        try:
+            attempt = 0
+            while True:
+                timeout = self._attempt_timeout()
+                started = time.monotonic()
+                try:
+                    result = self._invoke(fn, timeout, latency_key)
+                except (DeadlineExceeded, CircuitOpenError):
+                    # 예산 초과나 rate limiter 의 대기 거절은 제공자 상태와 무관하므로 breaker 에 기록하지 않는다
+                    raise
+                except Exception as e:
+                    if not is_retryable(e):
+                        # 4xx 등은 제공자가 정상 응답한 것이므로 장애로 세지 않는다
+                        self.breaker.record_success()
+                        holding_probe = False
+                        raise
+                    self.breaker.record_failure()
+                    holding_probe = False
+                    attempt += 1
+                    if attempt > self.max_retries:
+                        raise
+                    granted = self.breaker.acquire()
+                    if granted is None:
+                        raise
+                    holding_probe = granted == "half-open"
+
+                    delay = _retry_after(e) or random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+                    budget = remaining_budget()
+                    if budget is not None and delay >= budget:
+                        raise DeadlineExceeded(f"[{self.provider}] 재시도 대기 시간이 남은 예산을 초과합니다.") from e
+                    print(f"   [Resilience] {self.provider}: {type(e).__name__} → {delay:.2f}초 후 재시도 ({attempt}/{self.max_retries})")
+                    time.sleep(delay)
+                    continue
+
+                self._record_latency(latency_key, time.monotonic() - started)
+                self.breaker.record_success()
+                holding_probe = False
+                return result
+        finally:
+            if holding_probe:
+                self.breaker.release_probe()
+
+
+_callers = {}
+_callers_lock = threading.Lock()
+
+
+def get_caller(provider: str) -> ResilientCaller:
+    """제공자별로 하나씩 공유되는 ResilientCaller (설정은 app.properties 의 [RESILIENCE])"""
+    with _callers_lock:
+        caller = _callers.get(provider)
+        if caller is None:
+            config = ConfigLoader()
+            caller = ResilientCaller(
+                provider,
+                call_timeout=float(config.get_setting('RESILIENCE', 'call_timeout', env_key='LLM_CALL_TIMEOUT', default='30')),
+                max_retries=int(config.get_setting('RESILIENCE', 'max_retries', env_key='LLM_MAX_RETRIES', default='3')),
+                hedge=config.get_setting('RESILIENCE', 'hedge', env_key='LLM_HEDGE', default='true').lower() == 'true',
+            )
+            _callers[provider] = caller
+        return caller
@@ -0,0 +1,424 @@
+import io
+import os
+import sys
+import json
+import time
+import types
+import queue
+import atexit
+import select
+import argparse
+import threading
+import traceback
+import subprocess
+import importlib
+from contextlib import redirect_stdout, redirect_stderr
+
+try:
+    import resource # CPU/메모리 제한 (Unix 전용)
+except ImportError:
+    resource = None
+
+# 생성된 도구 코드 테스트용 샌드박스 worker 풀
+# 후보 코드마다 새 인터프리터를 띄우면 시작 비용 + tools.base/numpy 등 import 비용을 매번 치르고,
+# execute 가 멈추면 영원히 기다리게 된다.
+#  - worker 프로세스는 공통 모듈을 미리 import 해 두고 pipe(stdin/stdout) 로 코드를 받는다
+#  - 실행마다 worker 가 fork 한 자식에서 CPU/메모리 제한을 걸고 실행한다 (worker 상태는 오염되지 않음)
+#  - 자식이 wall-clock 제한을 넘기면 종료시키고, worker 는 max_runs 회 사용 후 새로 띄운다
+#  - fork 가 없는 환경(Windows)에서는 worker 안에서 직접 실행하고, 시간 초과 시 worker 를 통째로 교체한다
+# 같은 구조로 생성된 도구의 실제 실행(execute)도 서버 프로세스 밖에서 처리한다. (ToolLoader 의 격리 실행 모드)
+#  - worker 가 도구 모듈을 한 번 import 해 두고, 호출마다 fork 한 자식에서 execute(**kwargs) 를 실행한다
+#  - 결과 크기가 max_result_bytes 를 넘으면 오류로 처리한다
+
+DEFAULT_PRELOAD = ("json", "datetime", "re", "random", "numpy", "requests")
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# ---------------------------------------------------------------------------
+# worker 프로세스 쪽
+# ---------------------------------------------------------------------------
+
+def _default_for(prop: dict):
+    t = (prop or {}).get("type")
+    if t == "string": return ""
+    if t == "number": return 0.0
+    if t == "integer": return 0
+    if t == "boolean": return False
+    if t == "array": return []
+    if t == "object": return {}
+    return None
+
+
+def _load_module(code: str, module_name: str) -> types.ModuleType:
+    """코드를 'tools.{module_name}' 모듈로 메모리에 올린다"""
+    module = types.ModuleType(f"tools.{module_name}")
+    module.__file__ = os.path.join(_PROJECT_ROOT, "tools", f"{module_name}.py")
+    module.__package__ = "tools"
+    sys.modules[module.__name__] = module
+    exec(compile(code, module.__file__, "exec"), module.__dict__)
+    return module
+
+
+def _find_tool_class(module):
+    from tools.base import ToolBase
+
+    for name in dir(module):
+        obj = getattr(module, name)
+        if isinstance(obj, type) and issubclass(obj, ToolBase) and obj is not ToolBase:
+            return obj
+    raise RuntimeError("Tool class not found")
+
+
+# 실행 모드에서 worker 가 import 해 둔 도구 모듈 {module_name: 파일 수정 시각}
+_loaded_tool_mtimes = {}
+
+
+def _ensure_tool_module(module_name: str):
+    """tools/{module_name}.py 를 import (파일이 바뀌었으면 다시 로드). fork 전에 호출하면 자식이 그대로 물려받는다"""
+    path = os.path.join(_PROJECT_ROOT, "tools", f"{module_name}.py")
+    mtime = os.path.getmtime(path)
+    if _loaded_tool_mtimes.get(module_name) == mtime and f"tools.{module_name}" in sys.modules:
+        return sys.modules[f"tools.{module_name}"]
+    with open(path, "r", encoding="utf-8") as f:
+        module = _load_module(f.read(), module_name)
+    _loaded_tool_mtimes[module_name] = mtime
+    return module
+
+
+def run_tool_execute(module_name: str, kwargs: dict, max_result_bytes: int) -> str:
+    """생성된 도구 모듈의 execute(**kwargs) 를 실행하고 결과 문자열을 반환"""
+    tool = _find_tool_class(_ensure_tool_module(module_name))()
+    output = tool.execute(**kwargs)
+    if not isinstance(output, str):
+        raise TypeError(f"execute 는 문자열을 반환해야 합니다. (반환 타입: {type(output).__name__})")
+    if max_result_bytes and len(output.encode("utf-8")) > max_result_bytes:
+        raise ValueError(f"결과 크기가 제한({max_result_bytes} bytes)을 초과했습니다.")
+    return output
+
+
+def run_tool_test(code: str, module_name: str, tool_spec: dict) -> str:
+    """
+    코드를 'tools.{module_name}' 모듈로 메모리에 올리고, ToolBase 서브클래스를 찾아
+    tool_spec 기반 더미 인자로 execute() 를 호출한 뒤 결과가 JSON 인지 확인한다.
+    """
+    tool = _find_tool_class(_load_module(code, module_name))()
+    params = (tool_spec.get("parameters") or {})
+    props = (params.get("properties") or {})
+    required = (params.get("required") or [])
+
+    kwargs = {}
+    # 필수 먼저
+    for k in required:
+        if k in props:
+            kwargs[k] = _default_for(props.get(k))
+    # 선택도 채움
+    for k, v in props.items():
+        if k not in kwargs:
+            kwargs[k] = _default_for(v)
+
+    out = tool.execute(**kwargs) if kwargs else tool.execute()
+    json.loads(out)
+    return out
+
+
+def _execute_job(job: dict) -> dict:
+    """실제 실행 + 출력 캡처. 예외는 결과 dict 로 바꿔 반환한다"""
+    captured = io.StringIO()
+    try:
+        with redirect_stdout(captured), redirect_stderr(captured):
+            if job.get("kind") == "execute":
+                output = run_tool_execute(job["module_name"], job.get("kwargs") or {}, job.get("max_result_bytes"))
+            else:
+                output = run_tool_test(job["code"], job["module_name"], job.get("tool_spec") or {})[:2000]
+        return {"ok": True, "output": output, "log": captured.getvalue()[-2000:]}
+    except BaseException as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}",
+                "traceback": traceback.format_exc()[-4000:], "log": captured.getvalue()[-2000:]}
+
+
+def _current_vm_bytes() -> int:
+    """현재 프로세스의 가상 메모리 크기 (Linux 의 /proc 이 없으면 0)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _apply_limits(cpu_seconds: int, memory_mb: int):
+    if resource is None:
+        return
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_mb:
+        # 미리 import 한 모듈이 이미 차지한 주소 공간 위에 memory_mb 만큼만 더 허용한다
+        limit = _current_vm_bytes() + memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _run_forked(job: dict) -> dict:
+    """fork 한 자식에서 제한을 걸고 실행. 결과는 pipe 로 받는다"""
+    wall_timeout = job.get("wall_timeout", 10)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # 자식: 제한 적용 → 실행 → 결과 전송 → 즉시 종료 (atexit/finally 를 실행하지 않음)
+        os.close(read_fd)
+        try:
+            _apply_limits(job.get("cpu_seconds"), job.get("memory_mb"))
+            result = _execute_job(job)
+        except BaseException as e:
+            result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        try:
+            with os.fdopen(write_fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(result, ensure_ascii=False, default=str))
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    # 결과가 pipe 버퍼보다 클 수 있으므로 자식이 끝나기를 기다리는 동안 계속 읽는다
+    read_limit = (job.get("max_result_bytes") or 0) * 2 + 64 * 1024
+    deadline = time.monotonic() + wall_timeout
+    chunks, size, error = [], 0, None
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            error = f"TimeoutError: 실행 시간 {wall_timeout}초를 초과했습니다."
+            break
+        ready, _, _ = select.select([read_fd], [], [], min(remaining, 0.5))
+        if not ready:
+            continue
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > read_limit:
+            error = "ValueError: 결과 크기가 제한을 초과했습니다."
+            break
+    os.close(read_fd)
+
+    if error:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+        return {"ok": False, "error": error}
+    _, status = os.waitpid(pid, 0)
+
+    raw = b"".join(chunks).decode("utf-8")
+    if raw:
+        return json.loads(raw)
+    if os.WIFSIGNALED(status):
+        # RLIMIT_CPU 초과는 SIGXCPU, 메모리 초과는 보통 MemoryError 또는 SIGKILL/SIGSEGV
+        return {"ok": False, "error": f"자원 제한으로 종료되었습니다. (signal {os.WTERMSIG(status)})"}
+    return {"ok": False, "error": "결과 없이 종료되었습니다."}
+
+
+def worker_main(preload: list):
+    """stdin 으로 한 줄짜리 JSON 작업을 받고, 결과를 전용 fd 로 한 줄씩 돌려준다"""
+    # 생성 코드의 print 가 응답 채널을 깨지 않도록 원래 stdout 은 응답 전용으로 빼 둔다
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    sys.path.insert(0, _PROJECT_ROOT)
+    for module_name in ["tools.base"] + list(preload):
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            pass
+
+    can_fork = hasattr(os, "fork")
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        if job.get("kind") == "execute" and can_fork:
+            # 도구 모듈은 worker 에 한 번만 import 해 두고 fork 로 물려준다
+            try:
+                _ensure_tool_module(job["module_name"])
+            except Exception as e:
+                channel.write(json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"}, ensure_ascii=False) + "\n")
+                continue
+        result = _run_forked(job) if can_fork else _execute_job(job)
+        if job.get("kind") != "execute":
+            sys.modules.pop(f"tools.{job['module_name']}", None)
+        channel.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# 서버(생성기) 쪽
+# ---------------------------------------------------------------------------
+
+class SandboxWorker:
+    def __init__(self, preload: tuple):
+        self.runs = 0
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "tools.utils.sandbox_pool", "--worker", "--preload", ",".join(preload)],
+            cwd=_PROJECT_ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            # fork 전에 BLAS 스레드가 생기지 않도록 단일 스레드로 고정
+            env={**os.environ, "OPENBLAS_NUM_THREADS": "1", "OMP_NUM_THREADS": "1", "MKL_NUM_THREADS": "1"},
+            text=True,
+            encoding="utf-8",
+        )
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, job: dict, timeout: float) -> dict:
+        """작업 하나를 보내고 응답을 기다린다. timeout 을 넘기면 TimeoutError"""
+        self.runs += 1
+        self.process.stdin.write(json.dumps(job, ensure_ascii=False) + "\n")
+        self.process.stdin.flush()
+
+        box = {}
+        reader = threading.Thread(target=lambda: box.setdefault("line", self.process.stdout.readline()), daemon=True)
+        reader.start()
+        reader.join(timeout)
+        if reader.is_alive() or not box.get("line"):
+            raise TimeoutError(f"샌드박스 worker 가 {timeout:.0f}초 안에 응답하지 않았습니다.")
+        return json.loads(box["line"])
+
+    def close(self):
+        try:
+            self.process.kill()
+            self.process.wait(timeout=5)
+        except Exception:
+            pass
+
+
+class SandboxPool:
+    """
+    미리 띄워둔 샌드박스 worker 풀.
+    run_tool_test() 는 worker 하나를 빌려 코드를 실행하고, 결과 dict ({ok, output|error, ...}) 를 반환한다.
+    """
+
+    def __init__(self, size: int = 2, max_runs: int = 50, wall_timeout: float = 10.0,
+                 cpu_seconds: int = 5, memory_mb: int = 512, preload: tuple = DEFAULT_PRELOAD,
+                 max_result_bytes: int = 256 * 1024):
+        self.size = size
+        self.max_result_bytes = max_result_bytes
+        self.max_runs = max_runs
+        self.wall_timeout = wall_timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.preload = tuple(preload)
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._spawned = 0
+        self._closed = False
+
+    def warm_up(self):
+        """worker 를 size 개까지 미리 띄운다"""
+        with self._lock:
+            while self._spawned < self.size:
+                self._idle.put(SandboxWorker(self.preload))
+                self._spawned += 1
+
+    def _acquire(self) -> SandboxWorker:
+        """유휴 worker 를 빌린다. 모두 사용 중이면 wall_timeout(요청 deadline 이 더 짧으면 남은 예산)까지만 기다린다"""
+        from .resilience import remaining_budget # worker 프로세스 시작 시에는 필요 없으므로 지연 import
+        with self._lock:
+            if self._idle.empty() and self._spawned < self.size:
+                self._spawned += 1
+                return SandboxWorker(self.preload)
+        timeout = self.wall_timeout
+        budget = remaining_budget()
+        if budget is not None:
+            timeout = max(0.0, min(timeout, budget))
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"{timeout:.1f}초 안에 사용 가능한 샌드박스 worker 가 없습니다.")
+
+    def _release(self, worker: SandboxWorker, healthy: bool):
+        if healthy and worker.alive() and worker.runs < self.max_runs and not self._closed:
+            self._idle.put(worker)
+            return
+        # 오염되었거나 사용 횟수를 채운 worker 는 교체한다
+        worker.close()
+        with self._lock:
+            self._spawned -= 1
+        if not self._closed:
+            self.warm_up()
+
+    def run_tool_test(self, code: str, module_name: str, tool_spec: dict) -> dict:
+        return self._submit({"kind": "test", "code": code, "module_name": module_name, "tool_spec": tool_spec})
+
+    def run_tool_execute(self, module_name: str, kwargs: dict) -> dict:
+        """tools/{module_name}.py 의 도구를 worker 에서 실행. 결과 dict ({ok, output|error, ...})"""
+        return self._submit({"kind": "execute", "module_name": module_name, "kwargs": kwargs})
+
+    def _submit(self, job: dict) -> dict:
+        job.update({
+            "wall_timeout": self.wall_timeout,
+            "cpu_seconds": self.cpu_seconds,
+            "memory_mb": self.memory_mb,
+            "max_result_bytes": self.max_result_bytes,
+        })
+        started = time.monotonic()
+        try:
+            worker = self._acquire()
+        except TimeoutError as e:
+            return {"ok": False, "error": f"TimeoutError: {e}", "duration": round(time.monotonic() - started, 3)}
+        healthy = False
+        try:
+            # worker 내부에서도 wall_timeout 을 지키므로, 여기서는 여유를 두고 기다린다
+            result = worker.request(job, timeout=self.wall_timeout + 5)
+            healthy = True
+        except (TimeoutError, OSError, ValueError) as e:
+            result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            self._release(worker, healthy)
+        result["duration"] = round(time.monotonic() - started, 3)
+        return result
+
+    def shutdown(self):
+        self._closed = True
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+_pools = {}
+_pool_lock = threading.Lock()
+
+# 풀 용도별 기본값. [SANDBOX] 는 생성 코드 테스트, [TOOL_RUNNER] 는 생성 도구의 실제 실행
+_POOL_DEFAULTS = {
+    "SANDBOX": {"workers": "2", "max_runs": "50", "wall_timeout": "10", "cpu_seconds": "5", "memory_mb": "512", "max_result_bytes": "262144"},
+    "TOOL_RUNNER": {"workers": "2", "max_runs": "200", "wall_timeout": "30", "cpu_seconds": "20", "memory_mb": "512", "max_result_bytes": "262144"},
+}
+
+
+def get_sandbox_pool(section: str = "SANDBOX") -> SandboxPool:
+    """프로세스 전체에서 공유하는 용도별 샌드박스 풀 (설정은 app.properties 의 [section])"""
+    with _pool_lock:
+        pool = _pools.get(section)
+        if pool is None:
+            from .SystemUtils import ConfigLoader
+            config = ConfigLoader()
+            defaults = _POOL_DEFAULTS.get(section, _POOL_DEFAULTS["SANDBOX"])
+            setting = lambda key, default: config.get_setting(section, key, env_key=f"{section}_{key.upper()}", default=default)
+            preload = setting('preload', ",".join(DEFAULT_PRELOAD))
+            pool = SandboxPool(
+                size=int(setting('workers', defaults['workers'])),
+                max_runs=int(setting('max_runs', defaults['max_runs'])),
+                wall_timeout=float(setting('wall_timeout', defaults['wall_timeout'])),
+                cpu_seconds=int(setting('cpu_seconds', defaults['cpu_seconds'])),
+                memory_mb=int(setting('memory_mb', defaults['memory_mb'])),
+                max_result_bytes=int(setting('max_result_bytes', defaults['max_result_bytes'])),
+                preload=tuple(m.strip() for m in preload.split(",") if m.strip()),
+            )
+            atexit.register(pool.shutdown)
+            _pools[section] = pool
+        return pool
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="생성 도구 테스트용 샌드박스 worker")
+    parser.add_argument("--worker", action="store_true", help="worker 모드로 실행 (SandboxPool 이 사용)")
+    parser.add_argument("--preload", default=",".join(DEFAULT_PRELOAD), help="미리 import 할 모듈 (쉼표 구분)")
+    args = parser.parse_args()
+    if args.worker:
+        worker_main([m for m in args.preload.split(",") if m])
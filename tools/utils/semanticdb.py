@@ -1,7 +1,5 @@
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-import torch
+from .encoders import create_encoder
 
 # SentenceTransformer를 이용한 개선된 시맨틱 벡터DB
 # 단순 tfIdf 기법은 단어 유사도만 파악하므로 시멘틱으로 단어/문장 의미를 파악
@@ -9,11 +7,11 @@ class VectorDB_semantic :
     # 'distiluse-base-multilingual-cased-v1' 모델은 범용 문장 이해 능력이 탁월하나, 일반적인 단어 의미에 집중한다(일반화의 함정)
     # ex) 소상공인 정책자금 대출 : '대출', '정책' 에 높은 가중치, '혁신성장 지원평가 대출' 은 '기술평가' 보다 '대출'에 높은 연관성을 주게 됨
     # def __init__(self, model_name='distiluse-base-multilingual-cased-v1'):
-    def __init__(self, model_name='jhgan/ko-sroberta-multitask'):
-        # GPU(or CPU) 설정
-        device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        # TfidfVectorizer 대신, 의미를 이해하는 언어 모델 로드
-        self.model = SentenceTransformer(model_name, device=device)
+    def __init__(self, model_name=None, encoder=None):
+        # faiss 는 import 에 시간이 걸리므로 DB 를 만들 때 가져온다
+        import faiss
+        # TfidfVectorizer 대신, 의미를 이해하는 언어 모델 로드 (백엔드는 [EMBEDDING] 설정)
+        self.model = encoder or create_encoder(model_name)
         self.documents = {}  # {doc_id: content}
         self.metadata_store = {}  # {doc_id: metadata}
         self.doc_vectors = None
@@ -25,6 +23,7 @@ class VectorDB_semantic :
         """저장된 모든 문서를 시맨틱 벡터로 변환하여 FAISS 인덱스에 추가"""
 
         if not self.documents:
+            import faiss
             # 인덱스 초기화
             self.index = faiss.IndexIDMap(faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension()))
             self.doc_ids = []
@@ -0,0 +1,87 @@
+import re
+import time
+import asyncio
+import unicodedata
+from collections import OrderedDict
+
+# 중복 요청 병합(single-flight)과 Idempotency-Key 재응답
+# 더블 클릭, 모바일 재시도로 같은 (user_id, query) 가 동시에 들어오면 에이전트가 여러 번 실행되어
+# 문서를 다시 가져오고 submit_application 까지 중복 호출될 수 있다.
+#  - 같은 키로 진행 중인 실행이 있으면 새 실행을 시작하지 않고 그 결과를 함께 기다린다 (follower)
+#  - Idempotency-Key 로 완료된 결과는 replay_ttl 동안 저장해 두었다가 그대로 다시 돌려준다
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCT = re.compile(r"[\s.?!。？！~]+$")
+
+
+def normalize_query(query: str) -> str:
+    """공백/대소문자/전각 문자/끝 문장부호 차이만 있는 질문을 같은 키로 본다"""
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING_PUNCT.sub("", text)
+
+
+class IdempotencyConflict(Exception):
+    """같은 Idempotency-Key 가 다른 요청 내용으로 재사용됨"""
+
+
+class SingleFlight:
+    """asyncio 이벤트 루프 위에서 키별로 실행을 하나로 합친다"""
+
+    def __init__(self, replay_ttl: float = 300.0, max_entries: int = 10000):
+        self.replay_ttl = replay_ttl
+        self.max_entries = max_entries
+        self._inflight = {}             # {key: (fingerprint, asyncio.Task)}
+        self._completed = OrderedDict() # {key: (fingerprint, 만료 시각, 결과)}
+        self.stats = {"leaders": 0, "followers": 0, "replays": 0}
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        while self._completed:
+            key, (_, expires_at, _) = next(iter(self._completed.items()))
+            if expires_at > now:
+                break
+            self._completed.popitem(last=False)
+
+    def get_replay(self, key, fingerprint):
+        """replay_ttl 안에 완료된 결과가 있으면 반환, 없으면 None"""
+        self._purge_expired()
+        entry = self._completed.get(key)
+        if entry is None:
+            return None
+        if entry[0] != fingerprint:
+            raise IdempotencyConflict("같은 Idempotency-Key 로 다른 요청이 들어왔습니다.")
+        self.stats["replays"] += 1
+        return entry[2]
+
+    def _remember(self, key, fingerprint, result):
+        self._completed[key] = (fingerprint, time.monotonic() + self.replay_ttl, result)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_entries:
+            self._completed.popitem(last=False)
+
+    async def run(self, key, fingerprint, fn, remember: bool = False):
+        """
+        fn (인자 없는 coroutine 함수) 을 키당 하나만 실행하고 결과를 반환한다. (결과, follower 여부)
+        remember=True 면 성공한 결과를 replay_ttl 동안 보관한다 (Idempotency-Key 용).
+        호출자 중 하나가 취소되어도 실행 자체는 끝까지 진행되도록 shield 로 기다린다.
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if inflight[0] != fingerprint:
+                raise IdempotencyConflict("같은 Idempotency-Key 로 다른 요청이 처리 중입니다.")
+            self.stats["followers"] += 1
+            print(f"   [SingleFlight] 진행 중인 동일 요청의 결과를 기다립니다. ({key[0]})")
+            return await asyncio.shield(inflight[1]), True
+
+        self.stats["leaders"] += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = (fingerprint, task)
+
+        def _done(t):
+            self._inflight.pop(key, None)
+            if remember and not t.cancelled() and t.exception() is None:
+                self._remember(key, fingerprint, t.result())
+
+        task.add_done_callback(_done)
+        return await asyncio.shield(task), False
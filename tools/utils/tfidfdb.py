@@ -1,11 +1,11 @@
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
 # 벡터DB를 정의한다
 # Tf-idf 기반
 class VectorDB_tfidf:
     def __init__(self):
+        # sklearn 은 import 비용이 크므로 DB 를 만들 때 가져온다
+        from sklearn.feature_extraction.text import TfidfVectorizer
         self.vectorizer = TfidfVectorizer()
         self.documents = {} # {doc_id: content}
         self.metadata_store = {} # {doc_id: metadata}
@@ -25,6 +25,7 @@ class VectorDB_tfidf:
     def search(self, query: str, k: int = 1) -> list[tuple[float, dict]]:
         if self.doc_vectors is None or self.doc_vectors.shape[0] == 0:
             return []
+        from sklearn.metrics.pairwise import cosine_similarity
         query_vector = self.vectorizer.transform([query])
         scores = cosine_similarity(query_vector, self.doc_vectors).flatten()
         top_k_indices = scores.argsort()[-k:][::-1]
@@ -0,0 +1,187 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from .SystemUtils import ConfigLoader
+from .single_flight import normalize_query
+from .isolated_tool import write_generated_tool
+
+# 생성된 도구의 content-addressed 캐시
+# 도구가 없을 때마다 명세서 생성 → 코드 생성 → 샌드박스 테스트를 새로 하면 LLM 호출과 테스트 비용이 반복된다.
+#  - 정규화된 스펙(name + parameters) 의 해시를 키로, 테스트를 통과한 코드를 SQLite 에 저장한다
+#  - 해시가 달라도 파라미터 구성이 같고 설명이 거의 같으면 기존 도구를 재사용한다
+#    (잘못된 도구를 재사용하는 것보다 다시 생성하는 편이 안전하므로 기준을 높게 둔다)
+#  - 항목마다 출처(생성기, 모델, 원본 스펙)와 테스트 결과를 함께 남긴다
+# 명세서 생성 판단(새 도구 불필요 / 도구 X 생성)도 (정규화된 질문, 도구 레지스트리 버전) 단위로 저장해
+# 같은 질문이 다시 오면 명세서 생성과 코드 생성 호출을 모두 건너뛴다.
+
+DEFAULT_TOOL_CACHE_PATH = "generated_tools.db"
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def spec_key(spec: dict) -> str:
+    """정규화된 스펙의 인터페이스(name, parameters) 해시. 설명 문구 차이는 유사도 검색에서 다룬다"""
+    params = spec.get("parameters") or {}
+    canonical = {
+        "name": spec.get("name"),
+        "properties": params.get("properties") or {},
+        "required": sorted(params.get("required") or []),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _signature(spec: dict) -> str:
+    """파라미터 이름/타입/필수 여부. 이것이 같아야 에이전트가 같은 인자로 호출할 수 있다"""
+    params = spec.get("parameters") or {}
+    props = params.get("properties") or {}
+    shape = {k: (v or {}).get("type") for k, v in props.items()}
+    return json.dumps({"props": shape, "required": sorted(params.get("required") or [])}, sort_keys=True)
+
+
+def _shingles(text: str) -> set:
+    """한글/영문 모두 다루기 위한 문자 bigram 집합"""
+    text = _NON_WORD.sub(" ", (text or "").lower()).strip()
+    return {text[i:i + 2] for i in range(len(text) - 1)} if len(text) > 1 else {text}
+
+
+def description_similarity(a: str, b: str) -> float:
+    sa, sb = _shingles(a), _shingles(b)
+    if not sa or not sb:
+        return 0.0
+    return len(sa & sb) / len(sa | sb)
+
+
+class GeneratedToolCache:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(GeneratedToolCache, cls).__new__(cls)
+                cls._instance._init_cache()
+        return cls._instance
+
+    def _init_cache(self):
+        config = ConfigLoader()
+        self.db_path = config.get_setting('TOOL_CACHE', 'db_path', env_key='TOOL_CACHE_PATH', default=DEFAULT_TOOL_CACHE_PATH)
+        self.similarity_threshold = float(config.get_setting('TOOL_CACHE', 'similarity_threshold', env_key='TOOL_CACHE_SIMILARITY', default='0.75'))
+        self.decision_ttl_seconds = float(config.get_setting('TOOL_CACHE', 'decision_ttl_seconds', env_key='TOOL_DECISION_TTL', default='604800'))
+        self._local = threading.local() # sqlite3 연결은 스레드 간 공유하지 않는다
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS generated_tools (
+                    spec_hash    TEXT PRIMARY KEY,
+                    name         TEXT NOT NULL,
+                    description  TEXT,
+                    signature    TEXT NOT NULL,
+                    spec         TEXT NOT NULL,
+                    code         TEXT NOT NULL,
+                    provenance   TEXT,
+                    test_result  TEXT,
+                    hits         INTEGER NOT NULL DEFAULT 0,
+                    created_at   REAL NOT NULL,
+                    last_used_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_generated_tools_signature ON generated_tools(signature)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS spec_decisions (
+                    query_key        TEXT NOT NULL,
+                    registry_version TEXT NOT NULL,
+                    spec             TEXT,
+                    created_at       REAL NOT NULL,
+                    PRIMARY KEY (query_key, registry_version)
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_entry(row) -> dict:
+        entry = dict(row)
+        for key in ("spec", "provenance", "test_result"):
+            entry[key] = json.loads(entry[key]) if entry[key] else None
+        return entry
+
+    def lookup(self, spec: dict) -> dict | None:
+        """
+        정규화된 스펙으로 테스트 통과한 도구를 찾는다.
+        1) 해시 일치  2) 파라미터 구성이 같은 항목 중 설명 유사도가 가장 높은 항목 (threshold 이상)
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM generated_tools WHERE spec_hash = ?", (spec_key(spec),)).fetchone()
+        match = "exact"
+        if row is None:
+            best, best_score = None, 0.0
+            for candidate in conn.execute("SELECT * FROM generated_tools WHERE signature = ?", (_signature(spec),)):
+                score = description_similarity(spec.get("description", ""), candidate["description"])
+                if score > best_score:
+                    best, best_score = candidate, score
+            if best is None or best_score < self.similarity_threshold:
+                return None
+            row, match = best, f"similar({best_score:.2f})"
+
+        with conn:
+            conn.execute("UPDATE generated_tools SET hits = hits + 1, last_used_at = ? WHERE spec_hash = ?",
+                         (time.time(), row["spec_hash"]))
+        entry = self._to_entry(row)
+        entry["match"] = match
+        print(f"  [ToolCache] 캐시된 도구 '{entry['name']}' 재사용 ({match})")
+        return entry
+
+    def put(self, spec: dict, code: str, provenance: dict, test_result: dict):
+        """테스트를 통과한 도구만 저장한다"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO generated_tools "
+                "(spec_hash, name, description, signature, spec, code, provenance, test_result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (spec_key(spec), spec.get("name"), spec.get("description", ""), _signature(spec),
+                 json.dumps(spec, ensure_ascii=False), code,
+                 json.dumps(provenance, ensure_ascii=False, default=str),
+                 json.dumps(test_result, ensure_ascii=False, default=str), time.time())
+            )
+        print(f"  [ToolCache] 도구 '{spec.get('name')}' 을(를) 캐시에 저장했습니다.")
+
+    @staticmethod
+    def _query_key(query: str) -> str:
+        return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+    def get_decision(self, query: str, registry_version: str) -> dict | None:
+        """
+        저장된 명세서 생성 판단. 없으면 None, 있으면 {"spec": 도구 스펙 또는 None}
+        (spec 이 None 이면 '새 도구 불필요' 로 판단했던 질문)
+        """
+        row = self._connect().execute(
+            "SELECT spec, created_at FROM spec_decisions WHERE query_key = ? AND registry_version = ?",
+            (self._query_key(query), registry_version)
+        ).fetchone()
+        if row is None or time.time() - row["created_at"] > self.decision_ttl_seconds:
+            return None
+        return {"spec": json.loads(row["spec"]) if row["spec"] else None}
+
+    def put_decision(self, query: str, registry_version: str, spec: dict | None):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO spec_decisions (query_key, registry_version, spec, created_at) VALUES (?, ?, ?, ?)",
+                (self._query_key(query), registry_version,
+                 json.dumps(spec, ensure_ascii=False) if spec else None, time.time())
+            )
+
+    def install(self, entry: dict, tool_directory: str = "tools") -> str:
+        """캐시 항목의 코드를 {name}_tool.py 로 기록 (ToolLoader 가 다음 로드 때 장착)"""
+        return write_generated_tool(os.path.join(tool_directory, f"{entry['name']}_tool.py"), entry["code"])
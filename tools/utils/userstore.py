@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import argparse
+from abc import ABC, abstractmethod
+from .nts_client import normalize_business_id
+
+# 사용자 DB 저장소
+# user_data.json 을 통째로 메모리에 올리는 대신, 색인된 영속 저장소에서 필요한 사용자만 조회한다.
+# 기존 코드가 dict 처럼 사용하던 부분(get, in, items)은 그대로 동작하도록 맞춰둔다.
+
+DEFAULT_USER_DB_PATH = "user_data.db"
+
+
+class UserStore(ABC):
+    """사용자 저장소 공통 인터페이스"""
+
+    @abstractmethod
+    def get(self, user_id: str, default=None) -> dict | None:
+        """user_id 로 사용자 한 명을 조회 (반환값에는 user_id 가 포함된다)"""
+        pass
+
+    @abstractmethod
+    def get_by_business_id(self, business_id: str) -> dict | None:
+        """사업자번호로 사용자 한 명을 조회"""
+        pass
+
+    @abstractmethod
+    def list_user_ids(self, cursor: str = None, limit: int = 100) -> tuple[list, str | None]:
+        """user_id 순으로 cursor 다음부터 limit 개를 반환. (user_ids, next_cursor)"""
+        pass
+
+    @abstractmethod
+    def upsert_many(self, users: dict):
+        """{user_id: 사용자 정보} 를 추가하거나 갱신"""
+        pass
+
+    @abstractmethod
+    def is_empty(self) -> bool:
+        pass
+
+    def upsert(self, user_id: str, user: dict):
+        self.upsert_many({user_id: user})
+
+    def __contains__(self, user_id) -> bool:
+        return self.get(user_id) is not None
+
+    def items(self, page_size: int = 1000):
+        """전체 사용자를 페이지 단위로 순회 (메모리 사용량은 page_size 에만 비례)"""
+        cursor = None
+        while True:
+            user_ids, cursor = self.list_user_ids(cursor=cursor, limit=page_size)
+            for user_id in user_ids:
+                user = self.get(user_id)
+                if user is not None:
+                    yield user_id, user
+            if cursor is None:
+                return
+
+    def import_json(self, filepath: str, chunk_size: int = 5000) -> int:
+        """기존 user_data.json ({user_id: {...}}) 을 일괄 등록"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            users = json.load(f)
+
+        user_ids = list(users.keys())
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            self.upsert_many({user_id: users[user_id] for user_id in chunk})
+        print(f"[UserStore] '{filepath}' 에서 사용자 {len(user_ids)}명을 등록했습니다.")
+        return len(user_ids)
+
+
+class SQLiteUserStore(UserStore):
+    """
+    SQLite(WAL) 기반 사용자 저장소.
+    여러 worker 프로세스가 같은 파일을 공유하며, 갱신 내용은 재시작 없이 다음 조회부터 반영된다.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_USER_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local() # sqlite3 연결은 스레드 간 공유하지 않는다
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id     TEXT PRIMARY KEY,
+                    business_id TEXT,
+                    data        TEXT NOT NULL,
+                    updated_at  REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_users_business_id ON users(business_id)")
+
+    @staticmethod
+    def _to_user(row) -> dict:
+        user = json.loads(row["data"])
+        user["user_id"] = row["user_id"]
+        return user
+
+    def get(self, user_id: str, default=None) -> dict | None:
+        row = self._connect().execute("SELECT user_id, data FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return self._to_user(row) if row else default
+
+    def get_by_business_id(self, business_id: str) -> dict | None:
+        b_no = normalize_business_id(business_id)
+        if not b_no:
+            return None
+        row = self._connect().execute("SELECT user_id, data FROM users WHERE business_id = ? LIMIT 1", (b_no,)).fetchone()
+        return self._to_user(row) if row else None
+
+    def list_user_ids(self, cursor: str = None, limit: int = 100) -> tuple[list, str | None]:
+        # OFFSET 대신 keyset 방식으로 조회하여 뒤쪽 페이지도 일정한 비용으로 가져온다
+        rows = self._connect().execute(
+            "SELECT user_id FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?",
+            (cursor or "", limit + 1)
+        ).fetchall()
+        user_ids = [row["user_id"] for row in rows[:limit]]
+        next_cursor = user_ids[-1] if len(rows) > limit else None
+        return user_ids, next_cursor
+
+    def items(self, page_size: int = 1000):
+        # 페이지 조회와 본문 조회를 한 번의 쿼리로 처리
+        cursor = ""
+        while True:
+            rows = self._connect().execute(
+                "SELECT user_id, data FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                (cursor, page_size)
+            ).fetchall()
+            for row in rows:
+                yield row["user_id"], self._to_user(row)
+            if len(rows) < page_size:
+                return
+            cursor = rows[-1]["user_id"]
+
+    def upsert_many(self, users: dict):
+        now = time.time()
+        rows = []
+        for user_id, user in users.items():
+            data = {k: v for k, v in (user or {}).items() if k != "user_id"}
+            rows.append((user_id, normalize_business_id(data.get("business_id")) or None,
+                         json.dumps(data, ensure_ascii=False), now))
+
+        conn = self._connect()
+        with conn:
+            conn.executemany("""
+                INSERT INTO users (user_id, business_id, data, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    business_id = excluded.business_id, data = excluded.data, updated_at = excluded.updated_at
+            """, rows)
+
+    def is_empty(self) -> bool:
+        return self._connect().execute("SELECT 1 FROM users LIMIT 1").fetchone() is None
+
+
+# 사용 예) python -m tools.utils.userstore --import user_data.json
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI-Linker 사용자 DB 관리")
+    parser.add_argument("--db", default=os.environ.get("USER_DB_PATH", DEFAULT_USER_DB_PATH), help="SQLite 사용자 DB 경로")
+    parser.add_argument("--import", dest="import_path", required=True, help="일괄 등록할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    SQLiteUserStore(args.db).import_json(args.import_path)
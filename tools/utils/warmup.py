@@ -0,0 +1,107 @@
+import time
+import threading
+
+# 서버 시작 직후 warm-up
+# 배포/오토스케일 직후 첫 요청이 임베딩 모델 초기화, torch 커널 준비, LLM 제공자 연결 수립 비용을 모두 떠안아
+# p99 가 튀는 것을 막기 위해, 서버가 요청을 받기 전에 단계별로 미리 실행해 둔다.
+#  - 단계는 백그라운드 스레드에서 순서대로 실행되고, 그동안에도 /healthz(liveness) 는 응답한다
+#  - 필수 단계가 모두 성공해야 ready 가 되며, /readyz 는 그 전까지 503 을 돌려준다
+#  - 선택 단계(제공자 연결 등)는 실패해도 ready 를 막지 않고 상태에만 기록한다
+
+STEP_PENDING = "pending"
+STEP_RUNNING = "running"
+STEP_OK = "ok"
+STEP_FAILED = "failed"
+STEP_SKIPPED = "skipped"
+
+# 임베딩 모델 warm-up 용 문장 (길이가 다른 입력으로 여러 shape 을 미리 실행)
+_DUMMY_TEXTS = (
+    "소상공인",
+    "소상공인 정책자금 대출 신청 자격",
+    "사업자등록증명원과 부가가치세 과세표준증명원을 제출해야 하는 혁신성장 지원 정책의 신청 절차와 필요 서류를 알려주세요.",
+)
+
+
+class WarmupSkipped(Exception):
+    """해당 단계를 실행할 대상이 없음 (예: 시맨틱 모델이 없는 DB)"""
+
+
+class WarmupTracker:
+    def __init__(self):
+        self._steps = [] # [(name, fn, required)]
+        self._status = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._ready = False
+        self.started_at = None
+        self.finished_at = None
+
+    def add_step(self, name: str, fn, required: bool = True):
+        """fn: 인자 없는 함수. WarmupSkipped 를 던지면 건너뜀으로 기록"""
+        self._steps.append((name, fn, required))
+        self._status[name] = {"status": STEP_PENDING, "required": required, "duration_ms": None, "error": None}
+
+    def start(self):
+        self.started_at = time.time()
+        threading.Thread(target=self._run, name="warmup", daemon=True).start()
+
+    def _run(self):
+        failed_required = False
+        for name, fn, required in self._steps:
+            self._update(name, status=STEP_RUNNING)
+            started = time.perf_counter()
+            try:
+                fn()
+                status, error = STEP_OK, None
+            except WarmupSkipped as e:
+                status, error = STEP_SKIPPED, str(e) or None
+            except Exception as e:
+                status, error = STEP_FAILED, f"{type(e).__name__}: {e}"
+                failed_required = failed_required or required
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            self._update(name, status=status, duration_ms=duration_ms, error=error)
+            print(f"[Warmup] {name}: {status} ({duration_ms} ms){' - ' + error if error else ''}")
+
+        self.finished_at = time.time()
+        self._ready = not failed_required
+        self._done.set()
+        if self._ready:
+            print(f"[Warmup] 완료. ({self.finished_at - self.started_at:.1f}초)")
+        else:
+            print("[Warmup] 필수 단계가 실패하여 ready 상태가 되지 않습니다.")
+
+    def _update(self, name: str, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and self._ready
+
+    def wait(self, timeout: float = None) -> bool:
+        self._done.wait(timeout)
+        return self.ready
+
+    def status(self) -> dict:
+        with self._lock:
+            steps = {name: dict(step) for name, step in self._status.items()}
+        return {"ready": self.ready, "done": self._done.is_set(), "steps": steps}
+
+
+def warm_embedding_model(db, batch_size: int = 8, rounds: int = 2):
+    """RAG DB 의 시맨틱 모델로 더미 배치를 인코딩하고, 검색 경로(FAISS/TF-IDF)를 한 번 실행한다"""
+    model = getattr(db, "semantic_model", None) or getattr(db, "model", None)
+    if model is None or not hasattr(model, "encode"):
+        raise WarmupSkipped("시맨틱 모델이 없는 DB 입니다.")
+    batch = [_DUMMY_TEXTS[i % len(_DUMMY_TEXTS)] for i in range(batch_size)]
+    for _ in range(rounds):
+        # 단건(검색 질의)과 배치(문서 색인) 두 가지 형태를 모두 실행
+        model.encode(batch[:1], convert_to_tensor=False, normalize_embeddings=True)
+        model.encode(batch, convert_to_tensor=False, normalize_embeddings=True)
+    if getattr(db, "documents", None):
+        db.search(_DUMMY_TEXTS[1], k=1)
+
+
+def open_provider_connection(client):
+    """가벼운 API 호출로 제공자와의 TLS 연결을 미리 열어 둔다 (SDK 의 connection pool 에 유지됨)"""
+    client.models.list()
@@ -1,5 +1,6 @@
 from .base import ToolBase
 import time, json
+from .utils.document_store import DocumentTokenStore, check_document_validity
 # {"type": "function", "function": {"name": "validate_document", "description": "가져온 서류가 유효한지(예: 유효기간) 검증합니다.", "parameters": {"type": "object", "properties": {"doc_token": {"type": "string", "description": "검증할 서류의 확인 토큰"}, "issue_date_str": {"type": "string", "description": "서류의 발급일자(YYYY-MM-DD 형식)"}}, "required": ["doc_token", "issue_date_str"]}}},
 
 class ValidateDocumentTool(ToolBase) :
@@ -11,14 +12,22 @@ class ValidateDocumentTool(ToolBase) :
         "required": ["doc_token", "issue_date_str"]
     }
 
+    def __init__(self) :
+        self.token_store = DocumentTokenStore()
+
     def execute(self, doc_token: str, issue_date_str: str) -> str:
+        # 이미 검증을 통과했고 아직 유효기간 내인 토큰이라면 재검증하지 않는다
+        cached = self.token_store.get_by_token(doc_token)
+        if cached and cached["is_valid"] and cached["issue_date"] == issue_date_str:
+            print(f"  [Tool: Validator] '{doc_token}' 기존 검증 결과를 사용합니다.")
+            return json.dumps({"is_valid": True, "message": cached["validation_message"]})
+
         # 임의로 Mocking 한 서비스
         print(f"  [Tool: Validator] '{doc_token}' 유효성 검증 시작 (발급일: {issue_date_str})...")
 
         time.sleep(1)
 
-        # 시나리오: 발급일이 2025-07-01 이후여야 유효하다고 가정
-        if issue_date_str >= "2025-07-01":
-            return json.dumps({"is_valid": True, "message": "최신 서류로 확인되어 유효합니다."})
-        else:
-            return json.dumps({"is_valid": False, "message": "서류 유효기간이 만료되었습니다."})
\ No newline at end of file
+        # 시나리오: 발급일이 2025-07-01 이후여야 유효하다고 가정 (규칙은 document_store.DOCUMENT_VALIDITY_RULES)
+        is_valid, message = check_document_validity(issue_date_str, cached["doc_name"] if cached else None)
+        self.token_store.mark_validated(doc_token, is_valid, message)
+        return json.dumps({"is_valid": is_valid, "message": message})
\ No newline at end of file
@@ -4,7 +4,8 @@ from .base import ToolBase
 import requests
 import json
 from .utils.SystemUtils import PrivacyUtils
-from .utils.SystemUtils import ConfigLoader
+from .utils.nts_client import NtsBusinessClient, normalize_business_id
+from .utils.business_status import shared_status_store
 
 from tools.utils.log_util import LoggingMixin
 # self._log 는 'print'와 logging 을 포함하는 함수이다.
@@ -19,10 +20,14 @@ class VerifyBusinessRegistrationTool(LoggingMixin, ToolBase):
         "properties": {"user": {"type": "object"}},
         "required": ["user"]
     }
+    # user 는 LLM 이 아니라 에이전트가 현재 사용자 정보로 채운다
+    context_params = ("user",)
 
     def __init__(self) : 
         # self.gov_api_key = ConfigLoader().get_api_key('govdata.api.key')
-        self.gov_api_key = ConfigLoader()._get_priority_key('GOV_API_KEY', 'govdata.api.key')
+        self.nts_client = NtsBusinessClient()
+        # 배치 사전검증 결과 (ai_linker_batch_verify.py 가 생성, 프로세스 전체에서 공유)
+        self.status_store = shared_status_store()
 
     # [추가] 실제 작동하는 국세청 API 연동 도구(사업자등록번호 상태조회)
     def execute(self, user: dict) -> str:
@@ -35,23 +40,30 @@ class VerifyBusinessRegistrationTool(LoggingMixin, ToolBase):
 
         PrivacyUtils.log_securely(f"  [Internal] Securely retrieved business_id: {business_id} for user_id: {user_id}")
 
-        # 2. 조회된 실제 정보로 외부 API 호출
-        api_url = f"https://api.odcloud.kr/api/nts-businessman/v1/status?serviceKey={self.gov_api_key}"
-        payload = {"b_no": [business_id.replace("-", "")]}
+        # 1. 사전검증 결과가 유효하면 국세청 API 호출을 생략한다
+        cached = self.status_store.get_fresh(business_id)
+        if cached:
+            self._log(f"  [Tool: 국세청 API] 사전검증 결과를 사용합니다. (검증 시각: {cached.get('checked_at')})")
+            return self._format_status(cached["status"], source="precomputed")
 
+        # 2. 조회된 실제 정보로 외부 API 호출
         try:
-            response = requests.post(api_url, json=payload)
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("data") and len(data["data"]) > 0:
-                status = data["data"][0]
-                tax_type = status.get("tax_type", "정보 없음")
-                return json.dumps({
-                    "status": "success", "business_id": status.get("b_no"),
-                    "taxpayer_status": tax_type, "message": f"조회 성공: {tax_type}"
-                }, ensure_ascii=False)
+            statuses = self.nts_client.fetch_status([business_id])
+            status = statuses.get(normalize_business_id(business_id))
+
+            if status:
+                # 다음 호출을 위해 결과를 저장 (write-through)
+                self.status_store.put_many({status["b_no"]: status})
+                return self._format_status(status, source="live")
             else:
-                return json.dumps({"status": "error", "message": data.get("message", "유효하지 않거나 정보가 없는 사업자번호입니다.")})
+                return json.dumps({"status": "error", "message": "유효하지 않거나 정보가 없는 사업자번호입니다."})
         except requests.exceptions.RequestException as e:
-            return json.dumps({"status": "error", "message": f"API 호출 중 네트워크 오류 발생: {e}"})
\ No newline at end of file
+            return json.dumps({"status": "error", "message": f"API 호출 중 네트워크 오류 발생: {e}"})
+
+    def _format_status(self, status: dict, source: str) -> str:
+        tax_type = status.get("tax_type", "정보 없음")
+        return json.dumps({
+            "status": "success", "business_id": status.get("b_no"),
+            "taxpayer_status": tax_type, "message": f"조회 성공: {tax_type}",
+            "source": source
+        }, ensure_ascii=False)